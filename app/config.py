@@ -9,8 +9,81 @@ class Settings(BaseSettings):
     BLOGGER_DB_HOST: str = "database"
     BLOGGER_DB_PORT: str = "5432"
 
+    # Connection pools (the app's async pool, the scripts' blocking pool). A checkout waits up to
+    # TIMEOUT seconds for a free connection (then 503s); MIN are opened at startup; connections are
+    # replaced after MAX_LIFETIME seconds and checked with SELECT 1 when unused for CHECK_IDLE seconds.
+    BLOGGER_DB_POOL_MIN: int = 2
+    BLOGGER_DB_POOL_MAX: int = 10
+    BLOGGER_DB_POOL_TIMEOUT: float = 10.0
+    BLOGGER_DB_POOL_MAX_LIFETIME: float = 3600.0
+    BLOGGER_DB_POOL_CHECK_IDLE: float = 30.0
+
+    # Read replicas as comma-separated conninfo strings ("host=replica1,host=replica2 port=5433");
+    # fields left out are the primary's. Reads go round-robin to them, falling back to the primary;
+    # a replica that fails (or keeps a checkout waiting REPLICA_TIMEOUT seconds) is skipped for
+    # REPLICA_RETRY seconds. Writes, and every read for READ_YOUR_WRITES seconds after one, use the primary.
+    BLOGGER_DB_REPLICAS: str = ""
+    BLOGGER_DB_REPLICA_TIMEOUT: float = 1.0
+    BLOGGER_DB_REPLICA_RETRY: float = 30.0
+    BLOGGER_DB_READ_YOUR_WRITES: float = 5.0
+
+    # Hot reads run as prepared inline statements instead of the fn_get_* functions.
+    BLOGGER_DB_PREPARED: bool = True
+
+    # Listing and by-id JSON is encoded straight from repository rows (orjson when installed).
+    BLOGGER_FAST_JSON: bool = True
+
     BLOGGER_IS_ADMIN: bool = False
-    #BLOGGER_CONTENT_DIR: str = "/app/data/blogs"
+    BLOGGER_CONTENT_DIR: str = ".blogger/_blogs"
+    BLOGGER_SYNC_MANIFEST: str = ".blogger/_sync_manifest.json"
+
+    # "memory" serves metadata reads from an in-process index (see app/repositories/memory.py),
+    # loaded from "postgres" or a "snapshot" file and reloaded every BLOGGER_MEMORY_REFRESH seconds.
+    BLOGGER_REPOSITORY: str = "postgres"
+    BLOGGER_MEMORY_SOURCE: str = "postgres"
+    BLOGGER_MEMORY_SNAPSHOT: str = ".blogger/_snapshot.json"
+    BLOGGER_MEMORY_REFRESH: float = 60.0
+
+    # Rows by id/permalink, invalidated across workers through NOTIFY; 0 disables.
+    BLOGGER_METADATA_CACHE_SIZE: int = 10000
+    BLOGGER_METADATA_CACHE_TTL: float = 30.0
+
+    BLOGGER_RENDER_CACHE_BYTES: int = 64 * 1024 * 1024
+    BLOGGER_RENDER_CACHE_DIR: str = ".blogger/_cache/renders"
+
+    # Rendered listing and post responses (HTML and JSON), dropped on admin writes; 0 entries disables.
+    BLOGGER_PAGE_CACHE_SIZE: int = 1000
+    BLOGGER_PAGE_CACHE_BYTES: int = 32 * 1024 * 1024
+    BLOGGER_PAGE_CACHE_TTL: float = 30.0
+
+    # /feed.xml and /atom.xml list the newest FEED_SIZE posts; /sitemap.xml indexes one sitemap per
+    # publication month, split every SITEMAP_SHARD_SIZE urls. Kept as bytes and only rebuilt when the
+    # posts they list change (checked after each write, or every FEED_TTL seconds).
+    BLOGGER_SITE_TITLE: str = "cipherat.com"
+    BLOGGER_FEED_SIZE: int = 20
+    BLOGGER_SITEMAP_SHARD_SIZE: int = 10000
+    BLOGGER_FEED_CACHE_BYTES: int = 64 * 1024 * 1024
+    BLOGGER_FEED_TTL: float = 300.0
+
+    # Cached pages and feeds keep a gzip (plus br/zstd when brotli/zstandard are installed) copy made
+    # once when cached, sent per Accept-Encoding; bodies under COMPRESS_MIN_SIZE bytes go out as they are.
+    BLOGGER_COMPRESSION: bool = True
+    BLOGGER_COMPRESS_MIN_SIZE: int = 1024
+
+    # Static files get content-hashed names (used by url_for in the templates) and precompressed
+    # variants, built into STATIC_BUILD_DIR at startup or by build_static.py. Hashed URLs are
+    # served as immutable for STATIC_MAX_AGE seconds.
+    BLOGGER_STATIC_DIR: str = "static"
+    BLOGGER_STATIC_BUILD_DIR: str = ".blogger/_cache/static"
+    BLOGGER_STATIC_MAX_AGE: int = 31536000
+
+    # Per-stage and per-route timings for /metrics, and a Server-Timing header on every response.
+    BLOGGER_METRICS: bool = True
+    BLOGGER_SERVER_TIMING: bool = True
+
+    BLOGGER_CACHE_CONTROL: str = "public, max-age=0, must-revalidate"
+    BLOGGER_VALIDATOR_CACHE_SIZE: int = 10000
+    BLOGGER_VALIDATOR_CACHE_TTL: float = 30.0
 
     class Config:
         env_file = ".env"
@@ -0,0 +1,85 @@
+from typing import Optional
+
+from app.config import Settings
+from app.gateways.postgres.async_client import AsyncPostgresClient
+from app.models.blog import AsyncBlog
+from app.repositories.blog import AsyncBlogRepository
+from app.repositories.cached import CachedBlogRepository
+from app.repositories.memory import BlogIndex, InMemoryBlogRepository
+from app.services.blog import AsyncBlogService
+from app.services.feeds import FeedService
+from app.utils.metrics import REGISTRY
+
+
+class Container:
+    """
+    The app's long-lived objects, built once in main.lifespan and kept on
+    app.state.container. The repository, model and service hold no
+    per-request state (the pool, caches and index do their own locking), so
+    one instance of each serves every request and the dependency providers
+    (get_blog_model, get_blog_service, get_feed_service) only hand them out.
+    The providers are async only so FastAPI calls them inline instead of
+    through its threadpool.
+    """
+
+    def __init__(self, settings: Settings):
+        self.settings = settings
+        self.db_client = AsyncPostgresClient(
+            dbname=settings.BLOGGER_DB_NAME,
+            user=settings.BLOGGER_DB_USER,
+            password=settings.BLOGGER_DB_PASS,
+            host=settings.BLOGGER_DB_HOST,
+            port=settings.BLOGGER_DB_PORT,
+        )
+        self.blog_index: Optional[BlogIndex] = None
+        if settings.BLOGGER_REPOSITORY == "memory":
+            self.blog_index = BlogIndex.from_settings(settings)
+
+        self.blog_repository = self._blog_repository()
+        self.blog_model = AsyncBlog(self.blog_repository)
+        self.blog_service = AsyncBlogService(self.blog_model)
+        self.feed_service = FeedService(self.blog_model)
+
+    def _blog_repository(self) -> AsyncBlogRepository:
+        if self.blog_index is not None:
+            return InMemoryBlogRepository(self.db_client, self.blog_index)
+        if self.settings.BLOGGER_METADATA_CACHE_SIZE > 0:
+            return CachedBlogRepository(self.db_client)
+        return AsyncBlogRepository(self.db_client)
+
+    def _pool_metrics(self):
+        pools = self.db_client.all_pool_stats()
+        routing = self.db_client.routing_stats()
+
+        def per_pool(key):
+            return [({"pool": name}, stats[key]) for name, stats in pools.items()]
+
+        return [
+            ("blogger_db_pool_connections", "gauge", "Pooled connections by state.", [
+                ({"pool": name, "state": state}, stats[state]) for name, stats in pools.items() for state in ("in_use", "idle")
+            ]),
+            ("blogger_db_pool_max", "gauge", "Upper bound on pooled connections.", per_pool("max")),
+            ("blogger_db_pool_waiting", "gauge", "Requests waiting for a pooled connection.", per_pool("waiting")),
+            ("blogger_db_pool_requests_total", "counter", "Connection checkouts.", per_pool("requests")),
+            ("blogger_db_pool_timeouts_total", "counter", "Checkouts that gave up after BLOGGER_DB_POOL_TIMEOUT.", per_pool("timeouts")),
+            ("blogger_db_pool_replaced_total", "counter", "Broken connections discarded and replaced.", per_pool("replaced")),
+            ("blogger_db_pool_wait_seconds_total", "counter", "Time spent waiting for connections.", per_pool("wait_seconds")),
+            ("blogger_db_reads_total", "counter", "Reads served, by the server that answered.", [
+                ({"target": "replica"}, routing["replica_reads"]),
+                ({"target": "primary"}, routing["primary_reads"]),
+            ]),
+            ("blogger_db_replica_failovers_total", "counter", "Reads retried elsewhere after a replica failed.", [({}, routing["failovers"])]),
+            ("blogger_db_replicas_down", "gauge", "Replicas currently skipped after a failure.", [({}, routing["replicas_down"])]),
+        ]
+
+    async def start(self) -> None:
+        await self.db_client.open()
+        REGISTRY.register_collector("db_pool", self._pool_metrics)
+        if self.blog_index is not None:
+            # Loaded straight from Postgres, not through the repository it backs.
+            await self.blog_index.start(AsyncBlogRepository(self.db_client))
+
+    async def stop(self) -> None:
+        if self.blog_index is not None:
+            await self.blog_index.stop()
+        await self.db_client.close_all()
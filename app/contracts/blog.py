@@ -18,12 +18,34 @@ class GetBlogsResponse(BaseResponse):
 
 class GetPageBlogsResponse(BaseResponse):
     blogs: List[Blog.Schema] = Field(default_factory=list, description="List of paged blogs.")
-    total_count: int
-    page: int
+    total_count: Optional[int] = Field(None, description="Omitted in cursor mode unless requested.")
+    page: Optional[int] = Field(None, description="Page number, offset mode only.")
     limit: int
-    total_pages: int
+    total_pages: Optional[int] = None
     has_next: bool
     has_previous: bool
+    next_cursor: Optional[str] = Field(None, description="Opaque cursor of the following page.")
+    prev_cursor: Optional[str] = Field(None, description="Opaque cursor of the preceding page.")
+
+class SearchHit(BaseModel):
+    blog: Blog.Schema
+    rank: float = Field(..., description="Relevance, higher is better.")
+    snippet: str = Field(..., description="Matching excerpt of the post, terms wrapped in <mark>.")
+
+class SearchBlogsResponse(BaseResponse):
+    query: str
+    hits: List[SearchHit] = Field(default_factory=list)
+    limit: int
+    has_next: bool
+    next_cursor: Optional[str] = Field(None, description="Opaque cursor of the following results.")
+
+class FacetCount(BaseModel):
+    name: str
+    count: int = Field(..., description="Published posts in this category or tagged with this keyword.")
+
+class FacetsResponse(BaseResponse):
+    categories: List[FacetCount] = Field(default_factory=list, description="Largest first.")
+    keywords: List[FacetCount] = Field(default_factory=list, description="Largest first.")
 
 class RegisterBlogRequest(BaseModel):
     title: str = Field(..., max_length=255)
@@ -37,6 +59,20 @@ class RegisterBlogRequest(BaseModel):
 class RegisterBlogResponse(BaseResponse):
     id: Optional[str] = Field(None, description="The unique ID of the registered blog.")
 
+class BulkRowResult(BaseModel):
+    line: int = Field(..., description="Line of the row in the submitted manifest.")
+    id: Optional[str] = None
+    status: str = Field(..., description="inserted, duplicate or error.")
+    message: Optional[str] = None
+
+class BulkRegisterResponse(BaseResponse):
+    inserted: int
+    duplicates: int
+    failed: int
+    elapsed: float = Field(..., description="Seconds spent validating and loading the manifest.")
+    rows_per_second: float
+    results: List[BulkRowResult] = Field(default_factory=list)
+
 class UpdateBlogRequest(BaseModel):
     title: str
     category: str
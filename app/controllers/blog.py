@@ -1,22 +1,59 @@
-from typing import Optional, List
-from datetime import date
+import asyncio
+from typing import Any, Awaitable, Callable, Dict, Literal, Optional, List, Tuple
+from datetime import date, datetime, timezone
 
-from fastapi import APIRouter, Form, Depends, Request, HTTPException, status, Query
+from fastapi import APIRouter, Form, Depends, Request, Response, HTTPException, status, Query
 from fastapi.templating import Jinja2Templates
-from fastapi.responses import HTMLResponse, RedirectResponse
+from fastapi.responses import HTMLResponse, RedirectResponse, StreamingResponse
 from pydantic import ValidationError
 
-from app.services.blog import BlogService, get_blog_service
+from app.config import get_settings
+from app.services.blog import AsyncBlogService, get_blog_service
 from app.contracts.blog import (
     GetBlogResponse,
     GetPageBlogsResponse,
+    SearchBlogsResponse,
+    FacetsResponse,
     RegisterBlogRequest,
     RegisterBlogResponse,
     UpdateBlogRequest,
+    BulkRegisterResponse,
     ActionResponse
 )
 from app.enums.enums import BlogState
-from app.utils.markdown import MarkdownRenderer
+from app.utils.http_cache import (
+    get_validator_cache,
+    is_not_modified,
+    make_etag,
+    make_validator,
+    not_modified,
+    source_stat,
+    validator_headers,
+)
+from app.utils.fast_json import blog_response_payload, json_response, page_payload
+from app.utils.invalidation import notify_write
+from app.utils.metrics import timed
+from app.utils.page_cache import get_page_cache, page_response
+from app.utils.static_assets import install_url_for
+from app.utils.manifest import EXPORT_MEDIA_TYPES, parse_manifest
+
+
+EPOCH = datetime(1970, 1, 1, tzinfo=timezone.utc)
+
+
+def _version(blog: Any) -> Tuple[str, datetime]:
+    # A Blog.Schema, or the repository row itself on the fast JSON path.
+    if isinstance(blog, dict):
+        return blog['id'], blog['dates']['last_update']
+    return blog.id, blog.dates.last_update
+
+
+async def invalidate_on_write(request: Request):
+    try:
+        yield
+    finally:
+        if request.method not in ("GET", "HEAD"):
+            notify_write()
 
 
 public = APIRouter(
@@ -27,30 +64,160 @@ public = APIRouter(
 admin = APIRouter(
     prefix="/blogs",
     tags=["Blog Management (Admin)"],
+    # "function" scope: caches are dropped before the response goes out, not after it was sent.
+    dependencies=[Depends(invalidate_on_write, scope="function")],
 )
 
 templates = Jinja2Templates(directory="templates")
+install_url_for(templates)
+
+
+def render_template(name: str, context: dict, **kwargs) -> Response:
+    with timed("template", name):
+        return templates.TemplateResponse(name, context, **kwargs)
 
 
 @public.get("/", name="page_blogs")
 async def get_page_blogs(
     request: Request,
+    response: Response,
     page: int = Query(1, ge=1),
     limit: int = Query(7, ge=1, le=100),
     state: Optional[BlogState] = BlogState.PUBLISHED,
-    service: BlogService = Depends(get_blog_service),
+    cursor: Optional[str] = Query(None, description="Opaque keyset cursor, an empty value starts from the first page."),
+    include_total: bool = Query(False, description="Also count all matching blogs in cursor mode."),
+    service: AsyncBlogService = Depends(get_blog_service),
+):
+    return await _listing(
+        request, response, (page, limit, state, cursor, include_total),
+        lambda validate: service.get_page(page, limit, state=state, cursor=cursor, include_total=include_total, validate=validate),
+        current_page=page,
+    )
+
+
+# Declared before "/{blog_id}", which would otherwise capture "search".
+@public.get("/search", response_model=SearchBlogsResponse, name="search_blogs")
+async def search_blogs(
+    q: str = Query(..., min_length=1, max_length=256, description="Web-search syntax: words, \"phrases\", OR, -exclusions."),
+    limit: int = Query(10, ge=1, le=50),
+    cursor: Optional[str] = Query(None, description="Opaque cursor from a previous next_cursor."),
+    service: AsyncBlogService = Depends(get_blog_service),
+):
+    try:
+        result = await service.search(q, limit, state=BlogState.PUBLISHED, cursor=cursor)
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+
+    return SearchBlogsResponse(**result)
+
+
+@public.get("/facets", response_model=FacetsResponse, name="blog_facets")
+async def get_blog_facets(
+    limit: int = Query(100, ge=1, le=1000, description="Most used categories and keywords to return, of each."),
+    service: AsyncBlogService = Depends(get_blog_service),
+):
+    # Counts are kept in blog_facets by triggers, so this never scans blogs.
+    result = await service.facets(limit)
+    return FacetsResponse(**result)
+
+
+@public.get("/category/{name}", response_model=GetPageBlogsResponse, name="category_blogs")
+async def get_category_blogs(
+    name: str,
+    request: Request,
+    response: Response,
+    limit: int = Query(7, ge=1, le=100),
+    cursor: Optional[str] = Query(None, description="Opaque keyset cursor from next_cursor or prev_cursor."),
+    service: AsyncBlogService = Depends(get_blog_service),
+):
+    # Published posts of one category, keyset-paged and cached like the index.
+    return await _listing(
+        request, response, (name, limit, cursor),
+        lambda validate: service.browse(limit, state=BlogState.PUBLISHED, cursor=cursor, category=name, validate=validate),
+        route="category_blogs", path_params={"name": name},
+    )
+
+
+@public.get("/tag/{keyword}", response_model=GetPageBlogsResponse, name="tag_blogs")
+async def get_tag_blogs(
+    keyword: str,
+    request: Request,
+    response: Response,
+    limit: int = Query(7, ge=1, le=100),
+    cursor: Optional[str] = Query(None, description="Opaque keyset cursor from next_cursor or prev_cursor."),
+    service: AsyncBlogService = Depends(get_blog_service),
 ):
-    result = service.get_page(page, limit, state=state)
+    return await _listing(
+        request, response, (keyword, limit, cursor),
+        lambda validate: service.browse(limit, state=BlogState.PUBLISHED, cursor=cursor, keyword=keyword, validate=validate),
+        route="tag_blogs", path_params={"keyword": keyword},
+    )
 
-    if "text/html" in request.headers.get("accept", ""):
-        context = {
+
+async def _listing(
+    request: Request, response: Response, key: Tuple, fetch: Callable[[bool], Awaitable[Dict[str, Any]]],
+    current_page: Optional[int] = None, route: Optional[str] = None, path_params: Optional[Dict[str, Any]] = None,
+):
+    # A page of posts, from the page cache, a 304 or `fetch(validate)`; `route` pages by cursor links.
+    is_html = "text/html" in request.headers.get("accept", "")
+    pages = get_page_cache()
+    # Links in the HTML are absolute (url_for), so the base URL is part of the key.
+    page_key = (str(request.base_url), "index.html" if is_html else "json", route, *key)
+    cached = pages.get(page_key)
+    if cached:
+        if is_not_modified(request, cached["validator"]):
+            return not_modified(cached["validator"])
+        return page_response(cached, request)
+
+    validators = get_validator_cache()
+    validator_key = f"{'html' if is_html else 'json'}:{request.url.path}?{request.url.query}"
+
+    validator = validators.get(validator_key)
+    if validator and is_not_modified(request, validator):
+        return not_modified(validator)
+
+    # JSON is written straight from the repository rows unless BLOGGER_FAST_JSON is off.
+    fast = not is_html and get_settings().BLOGGER_FAST_JSON
+    try:
+        result = await fetch(not fast)
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+
+    blogs = result.get("blogs", [])
+    versions = [_version(blog) for blog in blogs]
+    validator = make_validator(
+        make_etag(
+            validator_key, result.get("total_count"), result.get("has_next"), result.get("has_previous"),
+            *(f"{blog_id}@{last_update.isoformat()}" for blog_id, last_update in versions),
+        ),
+        max((last_update for _, last_update in versions), default=EPOCH),
+    )
+    validators.put(validator_key, validator)
+    if is_not_modified(request, validator):
+        return not_modified(validator)
+
+    if is_html:
+        page_data = result
+        if route:
+            base = request.url_for(route, **(path_params or {}))
+            page_data = {
+                **result,
+                "prev_url": f"{base}?cursor={result['prev_cursor']}" if result.get("prev_cursor") else None,
+                "next_url": f"{base}?cursor={result['next_cursor']}" if result.get("next_cursor") else None,
+            }
+        rendered = render_template("index.html", {
             "request": request,
-            "blogs": result.get("blogs", []),
-            "page_data": result,
-            "current_page": page,
-        }
-        return templates.TemplateResponse("index.html", context)
+            "blogs": blogs,
+            "page_data": page_data,
+            "current_page": current_page,
+        }, headers=validator_headers(validator))
+        return page_response(pages.put(page_key, rendered.body, rendered.media_type, validator), request)
 
+    if fast:
+        encoded = json_response(page_payload(result), headers=validator_headers(validator))
+        return page_response(pages.put(page_key, encoded.body, encoded.media_type, validator), request)
+
+    response.headers.update(validator_headers(validator))
     return GetPageBlogsResponse(**result)
 
 
@@ -58,37 +225,75 @@ async def get_page_blogs(
 async def get_blog_by_permalink(
     year: str, month: str, day: str, slug: str,
     request: Request,
-    service: BlogService = Depends(get_blog_service),
+    service: AsyncBlogService = Depends(get_blog_service),
 ):
-    result = service.get_one(year, month, day, slug)
+    is_html = "text/html" in request.headers.get("accept", "")
+    # Permalink lookups ignore case, so both cache keys use the lowercased slug.
+    slug = slug.lower()
+    pages = get_page_cache()
+    page_key = (str(request.base_url), "post.html" if is_html else "json", f"{year}/{month}/{day}/{slug}")
+    cached = pages.get(page_key)
+    if cached:
+        if is_not_modified(request, cached["validator"]):
+            return not_modified(cached["validator"])
+        return page_response(cached, request)
+
+    validators = get_validator_cache()
+    validator_key = f"{'html' if is_html else 'json'}:{year}/{month}/{day}/{slug}"
+
+    # A cached validator is only trusted while the content file stat is unchanged.
+    validator = validators.get(validator_key)
+    if validator and is_not_modified(request, validator):
+        return not_modified(validator)
+
+    result = await service.get_one(year, month, day, slug)
     if result.get("status") == "error":
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=result.get("message"))
 
     blog = result.get("blog")
-    raw_markdown = result.get("content")
-    render = MarkdownRenderer.render(raw_markdown)
+    render = result.get("render")
+
+    source = await asyncio.to_thread(source_stat, blog.content_file)
+    last_modified = blog.dates.last_update
+    if source:
+        last_modified = max(last_modified, datetime.fromtimestamp(source[2] / 1e9, tz=timezone.utc))
+    validator = make_validator(
+        make_etag(validator_key, blog.id, blog.dates.last_update.isoformat(), source and source[1:]),
+        last_modified,
+        source,
+    )
+    validators.put(validator_key, validator)
+    if is_not_modified(request, validator):
+        return not_modified(validator)
 
-    if "text/html" in request.headers.get("accept", ""):
-        return templates.TemplateResponse("post.html", {
+    if is_html:
+        rendered = render_template("post.html", {
             "request": request,
             "blog": blog,
             "content": render.get("html"),
             "reading_time": render.get("reading_time"),
             "word_count": render.get("word_count"),
-        })
-
-    return GetBlogResponse(**result)
+        }, headers=validator_headers(validator))
+    else:
+        rendered = Response(
+            GetBlogResponse(**result).model_dump_json(),
+            media_type="application/json", headers=validator_headers(validator),
+        )
+    return page_response(pages.put(page_key, rendered.body, rendered.media_type, validator), request)
 
 
 @public.get("/{blog_id}", response_model=GetBlogResponse)
 async def get_blog_by_id(
     blog_id: str,
-    service: BlogService = Depends(get_blog_service)
+    service: AsyncBlogService = Depends(get_blog_service)
 ):
-    result = service.get_by_id(blog_id)
+    fast = get_settings().BLOGGER_FAST_JSON
+    result = await service.get_by_id(blog_id, validate=not fast)
     if result["status"] == "error":
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=result["message"])
-    
+
+    if fast:
+        return json_response(blog_response_payload(result))
     return GetBlogResponse(**result)
 
 
@@ -100,7 +305,7 @@ async def get_register_form(request: Request):
         "errors": {},
         "form_data": {},
     }
-    return templates.TemplateResponse("register.html", context)
+    return render_template("register.html", context)
 
 
 @admin.post("/register", name="register_submission")
@@ -113,7 +318,7 @@ async def register(
     published_at_str: str = Form(...),
     content_file: str = Form(...),
     state: BlogState = Form(BlogState.PUBLISHED),
-    service: BlogService = Depends(get_blog_service),
+    service: AsyncBlogService = Depends(get_blog_service),
 ):
     try:
         keywords = [k.strip() for k in keywords_csv.split(',') if k.strip()]
@@ -126,7 +331,7 @@ async def register(
             references=references, state=state,
         )
 
-        result = service.register(request_model)        
+        result = await service.register(request_model)        
         if result["status"] == "success":
             if "text/html" in request.headers.get("accept", ""):
                 return RedirectResponse(url=request.url_for("page_blogs"), status_code=status.HTTP_303_SEE_OTHER)
@@ -140,20 +345,55 @@ async def register(
                 "request": request,
                 "states": BlogState.list_values(),
                 "errors": {"submission": str(e)},
-                "form_data": locals(),
+                "form_data": {
+                    "title": title, "category": category,
+                    "keywords": keywords_csv, "references": references_csv,
+                    "published_at_str": published_at_str, "content_file": content_file,
+                    "state": state,
+                },
             }
-            return templates.TemplateResponse("register.html", context, status_code=status.HTTP_400_BAD_REQUEST)
+            return render_template("register.html", context, status_code=status.HTTP_400_BAD_REQUEST)
         
         raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
 
 
+@admin.post("/bulk", response_model=BulkRegisterResponse)
+async def register_bulk(
+    request: Request,
+    service: AsyncBlogService = Depends(get_blog_service),
+):
+    # Body is an NDJSON (default) or CSV (Content-Type: text/csv) manifest of posts.
+    try:
+        entries = parse_manifest(await request.body(), request.headers.get("content-type", ""))
+    except UnicodeDecodeError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=f"Manifest is not UTF-8: {e}")
+
+    result = await service.register_many(entries)
+    return BulkRegisterResponse(**result)
+
+
+@admin.get("/export")
+async def export_blogs(
+    format: Literal["ndjson", "csv"] = Query("ndjson", description="Manifest format, loadable again through /blogs/bulk."),
+    state: Optional[BlogState] = None,
+    batch_size: int = Query(1000, ge=1, le=10000, description="Rows fetched from the server-side cursor per round trip."),
+    service: AsyncBlogService = Depends(get_blog_service),
+):
+    # Streamed batch by batch, so memory does not grow with the number of posts.
+    return StreamingResponse(
+        service.export(format, state=state, batch_size=batch_size),
+        media_type=EXPORT_MEDIA_TYPES[format],
+        headers={"Content-Disposition": f'attachment; filename="blogs.{format}"'},
+    )
+
+
 @admin.put("/{blog_id}", response_model=ActionResponse)
 async def update_blog(
     blog_id: str,
     update_data: UpdateBlogRequest,
-    service: BlogService = Depends(get_blog_service)
+    service: AsyncBlogService = Depends(get_blog_service)
 ):
-    result = service.update_blog(blog_id, update_data)
+    result = await service.update_blog(blog_id, update_data)
     if result["status"] == "error":
         raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=result["message"])
     
@@ -163,9 +403,9 @@ async def update_blog(
 @admin.delete("/{blog_id}", response_model=ActionResponse)
 async def delete_blog(
     blog_id: str,
-    service: BlogService = Depends(get_blog_service)
+    service: AsyncBlogService = Depends(get_blog_service)
 ):
-    result = service.delete(blog_id)
+    result = await service.delete(blog_id)
     if result["status"] == "error":
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=result["message"])
     
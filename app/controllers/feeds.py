@@ -0,0 +1,40 @@
+from typing import Any, Dict
+
+from fastapi import APIRouter, Depends, HTTPException, Request, Response, status
+
+from app.services.feeds import FeedService, get_feed_service
+from app.utils.compression import encoded_response
+from app.utils.feeds import is_shard_name
+from app.utils.http_cache import is_not_modified, not_modified, validator_headers
+
+
+feeds = APIRouter(tags=["Feeds"])
+
+
+def document_response(request: Request, doc: Dict[str, Any]) -> Response:
+    if is_not_modified(request, doc["validator"]):
+        return not_modified(doc["validator"])
+    return encoded_response(request, doc["body"], doc["encoded"], doc["media_type"], validator_headers(doc["validator"]))
+
+
+@feeds.get("/feed.xml", name="rss_feed")
+async def rss_feed(request: Request, service: FeedService = Depends(get_feed_service)):
+    return document_response(request, await service.feed("rss", str(request.base_url)))
+
+
+@feeds.get("/atom.xml", name="atom_feed")
+async def atom_feed(request: Request, service: FeedService = Depends(get_feed_service)):
+    return document_response(request, await service.feed("atom", str(request.base_url)))
+
+
+@feeds.get("/sitemap.xml", name="sitemap_index")
+async def get_sitemap_index(request: Request, service: FeedService = Depends(get_feed_service)):
+    return document_response(request, await service.sitemap_index(str(request.base_url)))
+
+
+@feeds.get("/sitemap-{name}.xml", name="sitemap_shard")
+async def get_sitemap_shard(name: str, request: Request, service: FeedService = Depends(get_feed_service)):
+    doc = await service.sitemap_shard(str(request.base_url), name) if is_shard_name(name) else None
+    if doc is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="SITEMAP_NOT_FOUND")
+    return document_response(request, doc)
@@ -0,0 +1,221 @@
+import time
+import weakref
+
+import psycopg
+from psycopg import errors, sql
+from psycopg.conninfo import conninfo_to_dict, make_conninfo
+from psycopg.rows import dict_row, tuple_row
+from psycopg_pool import AsyncConnectionPool
+from typing import Any, AsyncIterator, Tuple, Optional, List, Dict, Mapping
+
+from app.config import get_settings
+from app.gateways.postgres.client import pool_stats
+from app.gateways.postgres.queries import STATEMENTS
+from app.gateways.postgres.routing import ReplicaRouter, replica_dsns
+from app.utils.metrics import record, timed
+
+
+# Errors that mean "this server is unreachable or saturated" (PoolTimeout included), after which a read is retried elsewhere.
+FAILOVER_ERRORS = (psycopg.OperationalError, )
+
+
+class AsyncPostgresClient:
+    def __init__(self, dbname, user, password, host, port, min_conn=None, max_conn=None, timeout=None, replicas=None):
+        # Pool sizes and limits default to the BLOGGER_DB_POOL_* settings, replicas to BLOGGER_DB_REPLICAS.
+        settings = get_settings()
+        self.check_idle = settings.BLOGGER_DB_POOL_CHECK_IDLE
+        # When each pooled connection was last returned, so only long-idle ones pay for a check.
+        self._returned_at: "weakref.WeakKeyDictionary[Any, float]" = weakref.WeakKeyDictionary()
+        self.conninfo = make_conninfo(
+            dbname=dbname,
+            user=user,
+            password=password,
+            host=host,
+            port=port,
+        )
+        min_size = settings.BLOGGER_DB_POOL_MIN if min_conn is None else min_conn
+        max_size = settings.BLOGGER_DB_POOL_MAX if max_conn is None else max_conn
+        timeout = settings.BLOGGER_DB_POOL_TIMEOUT if timeout is None else timeout
+        if replicas is None:
+            replicas = replica_dsns(settings.BLOGGER_DB_REPLICAS)
+
+        # Opened explicitly from the running event loop, see open().
+        self.connection_pool = self._pool(self.conninfo, min_size, max_size, timeout)
+        self.replica_pools = [
+            self._pool(
+                make_conninfo(self.conninfo, **conninfo_to_dict(dsn)),
+                min_size, max_size, min(timeout, settings.BLOGGER_DB_REPLICA_TIMEOUT),
+            )
+            for dsn in replicas
+        ]
+        self.router: ReplicaRouter[AsyncConnectionPool] = ReplicaRouter(
+            self.connection_pool,
+            self.replica_pools,
+            read_your_writes=settings.BLOGGER_DB_READ_YOUR_WRITES,
+            retry_after=settings.BLOGGER_DB_REPLICA_RETRY,
+        )
+
+    def _pool(self, conninfo: str, min_size: int, max_size: int, timeout: float) -> AsyncConnectionPool:
+        settings = get_settings()
+        return AsyncConnectionPool(
+            conninfo,
+            min_size=min_size,
+            max_size=max_size,
+            timeout=timeout,
+            max_lifetime=settings.BLOGGER_DB_POOL_MAX_LIFETIME,
+            check=self._check,
+            reset=self._returned,
+            kwargs={"row_factory": dict_row},
+            open=False,
+        )
+
+    async def _check(self, conn) -> None:
+        # Called by the pool on checkout; a connection that fails is replaced, not handed out.
+        if time.monotonic() - self._returned_at.get(conn, 0.0) >= self.check_idle:
+            await AsyncConnectionPool.check_connection(conn)
+
+    async def _returned(self, conn) -> None:
+        self._returned_at[conn] = time.monotonic()
+
+    async def open(self):
+        try:
+            await self.connection_pool.open(wait=True)
+        except Exception as e:
+            print(f"Error creating async connection pool: {e}")
+            raise
+        # Replicas fill in the background; one that is down only costs failovers, not startup.
+        for replica in self.replica_pools:
+            await replica.open(wait=False)
+
+    async def _read(self, call, name: str, *args):
+        # call(pool, name, *args) on each candidate until one answers; the primary's errors propagate.
+        for connection_pool in self.router.for_read():
+            try:
+                result = await call(connection_pool, name, *args)
+            except FAILOVER_ERRORS as e:
+                if connection_pool is self.connection_pool or isinstance(e, errors.QueryCanceled):
+                    raise
+                self.router.failed(connection_pool, e)
+                continue
+            self.router.served(connection_pool)
+            return result
+
+    async def call_function(
+        self, function_name: str, params: Tuple = (), commit: bool = False, pin_reads: bool = True,
+    ) -> Optional[List[Dict[str, Any]]]:
+        # As PostgresClient.call_function: pin_reads=False keeps reads on the replicas after this write.
+        if commit:
+            result = await self._call(self.connection_pool, function_name, params, commit)
+            if pin_reads:
+                self.router.wrote()
+            return result
+        return await self._read(self._call, function_name, params, commit)
+
+    async def _call(self, connection_pool: AsyncConnectionPool, function_name: str, params: Tuple, commit: bool) -> Optional[List[Dict[str, Any]]]:
+        # Same statement psycopg2's callproc() builds: SELECT * FROM fn(%s, ...)
+        query = sql.SQL("SELECT * FROM {}({})").format(
+            sql.Identifier(function_name),
+            sql.SQL(", ").join(sql.Placeholder() * len(params)),
+        )
+
+        try:
+            started = time.perf_counter()
+            async with connection_pool.connection() as conn:
+                record("pool", function_name, time.perf_counter() - started)
+                with timed("db", function_name):
+                    async with conn.cursor() as cur:
+                        await cur.execute(query, params)
+
+                        result = None
+                        if cur.description:
+                            result = await cur.fetchall()
+
+                    if commit:
+                        await conn.commit()
+                    else:
+                        await conn.rollback()
+
+                return result
+        except Exception as e:
+            print(f"Database error during {function_name}: {e}")
+            raise
+
+    async def fetch_prepared(self, name: str, params: Mapping[str, Any]) -> List[Tuple]:
+        return await self._read(self._fetch_prepared, name, params)
+
+    async def _fetch_prepared(self, connection_pool: AsyncConnectionPool, name: str, params: Mapping[str, Any]) -> List[Tuple]:
+        # prepare=True makes psycopg PREPARE the statement on first use on each
+        # pooled connection and only Bind/Execute it afterwards. A single SELECT
+        # needs no transaction, autocommit saves the BEGIN and ROLLBACK round trips.
+        try:
+            started = time.perf_counter()
+            async with connection_pool.connection() as conn:
+                record("pool", name, time.perf_counter() - started)
+                await conn.set_autocommit(True)
+                try:
+                    with timed("db", name):
+                        async with conn.cursor(row_factory=tuple_row) as cur:
+                            await cur.execute(STATEMENTS[name], params, prepare=True)
+                            return await cur.fetchall()
+                finally:
+                    if not conn.broken:
+                        await conn.set_autocommit(False)
+        except Exception as e:
+            print(f"Database error during {name}: {e}")
+            raise
+
+    async def stream_function(self, function_name: str, params: Tuple = (), batch_size: int = 1000) -> AsyncIterator[List[Tuple]]:
+        # Rows come from a named (server-side) cursor, batch_size tuples at a
+        # time, and the pooled connection is held until the iteration ends.
+        # Only the checkout fails over: once rows have been yielded the stream cannot restart elsewhere.
+        query = sql.SQL("SELECT * FROM {}({})").format(
+            sql.Identifier(function_name),
+            sql.SQL(", ").join(sql.Placeholder() * len(params)),
+        )
+
+        for connection_pool in self.router.for_read():
+            try:
+                conn = await connection_pool.getconn()
+                break
+            except FAILOVER_ERRORS as e:
+                if connection_pool is self.connection_pool:
+                    raise
+                self.router.failed(connection_pool, e)
+        self.router.served(connection_pool)
+
+        try:
+            try:
+                async with conn.cursor(name=f"stream_{function_name}", row_factory=tuple_row) as cur:
+                    await cur.execute(query, params)
+                    while True:
+                        rows = await cur.fetchmany(batch_size)
+                        if not rows:
+                            break
+                        yield rows
+            finally:
+                if not conn.broken:
+                    await conn.rollback()
+                await connection_pool.putconn(conn)
+        except Exception as e:
+            print(f"Database error during {function_name}: {e}")
+            raise
+
+    def note_write(self) -> None:
+        # Writes seen from elsewhere (NOTIFY) also pin reads to the primary for a while.
+        self.router.wrote()
+
+    def pool_stats(self, connection_pool: Optional[AsyncConnectionPool] = None) -> Dict[str, Any]:
+        return pool_stats(connection_pool or self.connection_pool)
+
+    def all_pool_stats(self) -> Dict[str, Dict[str, Any]]:
+        stats = {"primary": self.pool_stats()}
+        for index, replica in enumerate(self.replica_pools, 1):
+            stats[f"replica{index}"] = self.pool_stats(replica)
+        return stats
+
+    def routing_stats(self) -> Dict[str, Any]:
+        return self.router.stats()
+
+    async def close_all(self):
+        for connection_pool in [self.connection_pool, *self.replica_pools]:
+            await connection_pool.close()
@@ -1,50 +1,202 @@
-import psycopg2
-from psycopg2 import pool
-from psycopg2.extras import RealDictCursor
-from typing import Any, Tuple, Optional, List, Dict
+import time
+import weakref
+
+import psycopg
+from psycopg import errors, sql
+from psycopg.conninfo import conninfo_to_dict, make_conninfo
+from psycopg.rows import dict_row
+from psycopg_pool import ConnectionPool
+from typing import Any, Tuple, Optional, List, Dict, Iterator
+
+from app.config import get_settings
+from app.gateways.postgres.routing import ReplicaRouter, replica_dsns
+from app.utils.metrics import record, timed
+
+
+# Errors that mean "this server is unreachable or saturated" (PoolTimeout included), after which a read is retried elsewhere.
+FAILOVER_ERRORS = (psycopg.OperationalError, )
+
+
+def pool_stats(connection_pool) -> Dict[str, Any]:
+    # psycopg_pool's get_stats() (sync or async pool) under the keys /metrics reports; requests_errors are checkouts that timed out.
+    stats = connection_pool.get_stats()
+    size, idle = stats.get("pool_size", 0), stats.get("pool_available", 0)
+    return {
+        "max": stats.get("pool_max", 0),
+        "size": size,
+        "idle": idle,
+        "in_use": size - idle,
+        "waiting": stats.get("requests_waiting", 0),
+        "requests": stats.get("requests_num", 0),
+        "timeouts": stats.get("requests_errors", 0),
+        "replaced": stats.get("connections_lost", 0) + stats.get("returns_bad", 0),
+        "wait_seconds": stats.get("requests_wait_ms", 0) / 1000,
+    }
 
 
 class PostgresClient:
-    def __init__(self, dbname, user, password, host, port, min_conn=1, max_conn=10):
+    def __init__(self, dbname, user, password, host, port, min_conn=None, max_conn=None, timeout=None, replicas=None):
+        # Pool sizes and limits default to the BLOGGER_DB_POOL_* settings, replicas to BLOGGER_DB_REPLICAS.
+        settings = get_settings()
+        self.check_idle = settings.BLOGGER_DB_POOL_CHECK_IDLE
+        # When each pooled connection was last returned, so only long-idle ones pay for a check.
+        self._returned_at: "weakref.WeakKeyDictionary[Any, float]" = weakref.WeakKeyDictionary()
+        conninfo = make_conninfo(dbname=dbname, user=user, password=password, host=host, port=port)
+        min_size = settings.BLOGGER_DB_POOL_MIN if min_conn is None else min_conn
+        max_size = settings.BLOGGER_DB_POOL_MAX if max_conn is None else max_conn
+        timeout = settings.BLOGGER_DB_POOL_TIMEOUT if timeout is None else timeout
+        if replicas is None:
+            replicas = replica_dsns(settings.BLOGGER_DB_REPLICAS)
+
         try:
-            self.connection_pool = psycopg2.pool.ThreadedConnectionPool(
-                min_conn,
-                max_conn,
-                dbname=dbname,
-                user=user,
-                password=password,
-                host=host,
-                port=port,
-                cursor_factory=RealDictCursor,
-            )
+            self.connection_pool = self._pool(conninfo, min_size, max_size, timeout)
+            self.connection_pool.open(wait=True)
         except Exception as e:
             print(f"Error creating connection pool: {e}")
             raise
+        # Replicas connect on first use, so one that is down does not stop a script from starting.
+        self.replica_pools = [
+            self._pool(
+                make_conninfo(conninfo, **conninfo_to_dict(dsn)),
+                0, max_size, min(timeout, settings.BLOGGER_DB_REPLICA_TIMEOUT),
+            )
+            for dsn in replicas
+        ]
+        for replica in self.replica_pools:
+            replica.open(wait=False)
+
+        self.router: ReplicaRouter[ConnectionPool] = ReplicaRouter(
+            self.connection_pool,
+            self.replica_pools,
+            read_your_writes=settings.BLOGGER_DB_READ_YOUR_WRITES,
+            retry_after=settings.BLOGGER_DB_REPLICA_RETRY,
+        )
+
+    def _pool(self, conninfo: str, min_size: int, max_size: int, timeout: float) -> ConnectionPool:
+        settings = get_settings()
+        return ConnectionPool(
+            conninfo,
+            min_size=min_size,
+            max_size=max_size,
+            timeout=timeout,
+            max_lifetime=settings.BLOGGER_DB_POOL_MAX_LIFETIME,
+            check=self._check,
+            reset=self._returned,
+            kwargs={"row_factory": dict_row},
+            open=False,
+        )
+
+    def _check(self, conn) -> None:
+        # Called by the pool on checkout; a connection that fails is replaced, not handed out.
+        if time.monotonic() - self._returned_at.get(conn, 0.0) >= self.check_idle:
+            ConnectionPool.check_connection(conn)
+
+    def _returned(self, conn) -> None:
+        self._returned_at[conn] = time.monotonic()
+
+    def call_function(
+        self, function_name: str, params: Tuple = (), commit: bool = False, pin_reads: bool = True,
+    ) -> Optional[List[Dict[str, Any]]]:
+        # Writes go to the primary; pin_reads=False for ones reads do not depend on (render cache upserts).
+        if commit:
+            result = self._call(self.connection_pool, function_name, params, commit)
+            if pin_reads:
+                self.router.wrote()
+            return result
+
+        for connection_pool in self.router.for_read():
+            try:
+                result = self._call(connection_pool, function_name, params, commit)
+            except FAILOVER_ERRORS as e:
+                if connection_pool is self.connection_pool or isinstance(e, errors.QueryCanceled):
+                    raise
+                self.router.failed(connection_pool, e)
+                continue
+            self.router.served(connection_pool)
+            return result
+
+    def _call(self, connection_pool: ConnectionPool, function_name: str, params: Tuple, commit: bool) -> Optional[List[Dict[str, Any]]]:
+        # Same statement psycopg2's callproc() builds: SELECT * FROM fn(%s, ...)
+        query = sql.SQL("SELECT * FROM {}({})").format(
+            sql.Identifier(function_name),
+            sql.SQL(", ").join(sql.Placeholder() * len(params)),
+        )
 
-    def call_function(self, function_name: str, params: Tuple = (), commit: bool = False) -> Optional[List[Dict[str, Any]]]:
-        conn = None
         try:
-            conn = self.connection_pool.getconn()
-            with conn.cursor() as cur:
-                cur.callproc(function_name, params)
-                
-                result = None
-                if cur.description:
-                    result = cur.fetchall()
-                
-                if commit:
-                    conn.commit()
-                
+            started = time.perf_counter()
+            with connection_pool.connection() as conn:
+                record("pool", function_name, time.perf_counter() - started)
+                with timed("db", function_name):
+                    with conn.cursor() as cur:
+                        cur.execute(query, params)
+
+                        result = None
+                        if cur.description:
+                            result = cur.fetchall()
+
+                    if commit:
+                        conn.commit()
+                    else:
+                        conn.rollback()
+
                 return result
         except Exception as e:
-            if conn:
-                conn.rollback()
+            print(f"Database error during {function_name}: {e}")
+            raise
+
+    def stream_function(self, function_name: str, params: Tuple = (), batch_size: int = 1000) -> Iterator[List[Dict[str, Any]]]:
+        # A named (server-side) cursor keeps the result in Postgres; only
+        # batch_size rows are held here at a time.
+        query = sql.SQL("SELECT * FROM {}({})").format(
+            sql.Identifier(function_name),
+            sql.SQL(", ").join(sql.Placeholder() * len(params)),
+        )
+
+        # Only the checkout fails over: once rows have been yielded the stream cannot restart elsewhere.
+        for connection_pool in self.router.for_read():
+            try:
+                started = time.perf_counter()
+                conn = connection_pool.getconn()
+                record("pool", function_name, time.perf_counter() - started)
+                break
+            except FAILOVER_ERRORS as e:
+                if connection_pool is self.connection_pool:
+                    raise
+                self.router.failed(connection_pool, e)
+        self.router.served(connection_pool)
+
+        try:
+            with conn.cursor(name=f"stream_{function_name}") as cur:
+                cur.execute(query, params)
+                while True:
+                    rows = cur.fetchmany(batch_size)
+                    if not rows:
+                        break
+                    yield rows
+        except Exception as e:
             print(f"Database error during {function_name}: {e}")
             raise
         finally:
-            if conn:
-                self.connection_pool.putconn(conn)
+            if not conn.broken:
+                conn.rollback()
+            connection_pool.putconn(conn)
+
+    def note_write(self) -> None:
+        # Writes seen from elsewhere (NOTIFY) also pin reads to the primary for a while.
+        self.router.wrote()
+
+    def pool_stats(self) -> Dict[str, Any]:
+        return pool_stats(self.connection_pool)
+
+    def all_pool_stats(self) -> Dict[str, Dict[str, Any]]:
+        stats = {"primary": self.pool_stats()}
+        for index, replica in enumerate(self.replica_pools, 1):
+            stats[f"replica{index}"] = pool_stats(replica)
+        return stats
+
+    def routing_stats(self) -> Dict[str, Any]:
+        return self.router.stats()
 
     def close_all(self):
-        if self.connection_pool:
-            self.connection_pool.closeall()
+        for connection_pool in [self.connection_pool, *self.replica_pools]:
+            connection_pool.close()
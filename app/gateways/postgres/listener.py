@@ -0,0 +1,57 @@
+import asyncio
+from typing import Callable, Optional
+
+import psycopg
+from psycopg import sql
+
+
+class PostgresListener:
+    """
+    LISTENs on a channel over its own autocommit connection (pooled
+    connections are handed back between queries and would miss
+    notifications), reconnecting with backoff. on_state(False) fires when
+    the connection is lost, since anything may change while nobody listens.
+    """
+
+    def __init__(
+        self, conninfo: str, channel: str,
+        on_notify: Callable[[str], None], on_state: Callable[[bool], None],
+    ):
+        self.conninfo = conninfo
+        self.channel = channel
+        self.on_notify = on_notify
+        self.on_state = on_state
+        self._task: Optional[asyncio.Task] = None
+
+    async def start(self) -> None:
+        self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        if self._task:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+
+    async def _run(self) -> None:
+        delay = 1.0
+        while True:
+            try:
+                async with await psycopg.AsyncConnection.connect(self.conninfo, autocommit=True) as conn:
+                    await conn.execute(sql.SQL("LISTEN {}").format(sql.Identifier(self.channel)))
+                    self.on_state(True)
+                    delay = 1.0
+                    async for notify in conn.notifies():
+                        try:
+                            self.on_notify(notify.payload)
+                        except Exception as e:
+                            print(f"Notification handler failed on {self.channel}: {e}")
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                print(f"Listener on {self.channel} disconnected: {e}")
+
+            self.on_state(False)
+            await asyncio.sleep(delay)
+            delay = min(delay * 2, 30.0)
@@ -0,0 +1,159 @@
+"""
+Inline statements for the hot read paths.
+
+They return the same rows as the fn_get_* functions in database/functions.sql,
+but are sent as plain SQL so psycopg can prepare them once per connection and
+reuse the plan, and they are read as tuples instead of dicts. Each variant
+the functions pick at run time (state, category and keyword filters,
+first/next/previous page, dated/undated cursor) is a statement of its own, and every branch orders
+exactly like idx_blogs_state_published (published_at DESC NULLS LAST), so
+its plan is an ordered index range scan instead of a scan and sort. The
+functions remain the interface for scripts and other consumers.
+"""
+from typing import Any, Dict, Optional, Tuple
+
+
+BLOG_COLUMNS = (
+    "b.id, b.title, b.category, b.keywords, "
+    "b.created_at, b.published_at, b.last_update, "
+    "b.content_file, b.\"references\", b.state, "
+    "b.word_count, b.reading_time, b.content_size"
+)
+
+# Optional WHERE filters, applied in this order; a variant's name lists the ones it has.
+_FILTERS = {
+    "state": "AND b.state = %(state)s",
+    "category": "AND b.category = %(category)s",
+    "keyword": "AND b.keywords @> ARRAY[%(keyword)s]::text[]",
+}
+
+_KEYSET = {
+    "first": """
+        SELECT {columns} FROM blogs b
+        WHERE TRUE {filters}
+        ORDER BY b.published_at DESC NULLS LAST, b.created_at DESC, b.id DESC
+        LIMIT %(limit)s
+    """,
+    # Dated rows and undated (NULLS LAST) rows are scanned separately so
+    # each branch stays a plain index range scan.
+    "after_dated": """
+        SELECT * FROM (
+            (SELECT {columns} FROM blogs b
+            WHERE b.published_at IS NOT NULL {filters}
+              AND (b.published_at, b.created_at, b.id) < (%(published_at)s, %(created_at)s, %(id)s)
+            ORDER BY b.published_at DESC NULLS LAST, b.created_at DESC, b.id DESC
+            LIMIT %(limit)s)
+            UNION ALL
+            (SELECT {columns} FROM blogs b
+            WHERE b.published_at IS NULL {filters}
+            ORDER BY b.published_at DESC NULLS LAST, b.created_at DESC, b.id DESC
+            LIMIT %(limit)s)
+        ) page
+        ORDER BY page.published_at DESC NULLS LAST, page.created_at DESC, page.id DESC
+        LIMIT %(limit)s
+    """,
+    "after_undated": """
+        SELECT {columns} FROM blogs b
+        WHERE b.published_at IS NULL {filters}
+          AND (b.created_at, b.id) < (%(created_at)s, %(id)s)
+        ORDER BY b.published_at DESC NULLS LAST, b.created_at DESC, b.id DESC
+        LIMIT %(limit)s
+    """,
+    "before_dated": """
+        SELECT * FROM (
+            SELECT {columns} FROM blogs b
+            WHERE b.published_at IS NOT NULL {filters}
+              AND (b.published_at, b.created_at, b.id) > (%(published_at)s, %(created_at)s, %(id)s)
+            ORDER BY b.published_at ASC NULLS FIRST, b.created_at ASC, b.id ASC
+            LIMIT %(limit)s
+        ) nearest
+        ORDER BY nearest.published_at DESC NULLS LAST, nearest.created_at DESC, nearest.id DESC
+    """,
+    "before_undated": """
+        SELECT * FROM (
+            SELECT * FROM (
+                (SELECT {columns} FROM blogs b
+                WHERE b.published_at IS NOT NULL {filters}
+                ORDER BY b.published_at ASC NULLS FIRST, b.created_at ASC, b.id ASC
+                LIMIT %(limit)s)
+                UNION ALL
+                (SELECT {columns} FROM blogs b
+                WHERE b.published_at IS NULL {filters}
+                  AND (b.created_at, b.id) > (%(created_at)s, %(id)s)
+                ORDER BY b.published_at ASC NULLS FIRST, b.created_at ASC, b.id ASC
+                LIMIT %(limit)s)
+            ) page
+            ORDER BY page.published_at ASC NULLS FIRST, page.created_at ASC, page.id ASC
+            LIMIT %(limit)s
+        ) nearest
+        ORDER BY nearest.published_at DESC NULLS LAST, nearest.created_at DESC, nearest.id DESC
+    """,
+}
+
+_PAGED = """
+    WITH filtered AS (
+        SELECT {columns} FROM blogs b WHERE TRUE {filters}
+    )
+    SELECT f.*, t.total
+    FROM filtered f, (SELECT count(*) AS total FROM filtered) t
+    ORDER BY f.published_at DESC NULLS LAST, f.created_at DESC, f.id DESC
+    LIMIT %(limit)s OFFSET %(offset)s
+"""
+
+_COUNT = "SELECT count(*) FROM blogs b WHERE TRUE {filters}"
+
+
+def _variants(name: str, template: str, filters: Tuple[str, ...] = ("state", )) -> Dict[str, str]:
+    variants = {}
+    for mask in range(1 << len(filters)):
+        used = [f for i, f in enumerate(filters) if mask & (1 << i)]
+        variants[":".join([name, *used])] = template.format(
+            columns=BLOG_COLUMNS, filters=" ".join(_FILTERS[f] for f in used),
+        )
+    return variants
+
+
+STATEMENTS: Dict[str, str] = {
+    "blog_by_id": f"SELECT {BLOG_COLUMNS} FROM blogs b WHERE b.id = %(id)s",
+    "blog_by_permalink": f"SELECT {BLOG_COLUMNS} FROM blogs b WHERE b.permalink_key = %(key)s",
+    "blog_render": """
+        SELECT r.content_hash, r.html, r.reading_time, r.word_count, r.source_size, r.source_mtime_ns
+        FROM blog_renders r WHERE r.blog_id = %(id)s
+    """,
+    **_variants("paged_blogs", _PAGED),
+    **_variants("count_blogs", _COUNT),
+    **{
+        key: statement
+        for variant, template in _KEYSET.items()
+        for key, statement in _variants(f"keyset_{variant}", template, tuple(_FILTERS)).items()
+    },
+}
+
+
+def statement_name(name: str, state: Optional[str], category: Optional[str] = None, keyword: Optional[str] = None) -> str:
+    filters = {"state": state, "category": category, "keyword": keyword}
+    return ":".join([name, *(f for f, value in filters.items() if value is not None)])
+
+
+def keyset_variant(cursor: Optional[Dict[str, Any]]) -> str:
+    if not cursor or cursor.get('id') is None:
+        return "keyset_first"
+    direction = "before" if cursor.get('before') else "after"
+    return f"keyset_{direction}_{'dated' if cursor.get('published_at') is not None else 'undated'}"
+
+
+def blog_row(row: Tuple) -> Dict[str, Any]:
+    """Maps a BLOG_COLUMNS tuple to the repository's row shape."""
+    return {
+        'id': row[0], 'title': row[1], 'category': row[2], 'keywords': row[3],
+        'dates': {'created_at': row[4], 'published_at': row[5], 'last_update': row[6]},
+        'content_file': row[7], 'references': row[8], 'state': row[9],
+        'word_count': row[10], 'reading_time': row[11], 'content_size': row[12],
+    }
+
+
+RENDER_COLUMNS = ("content_hash", "html", "reading_time", "word_count", "source_size", "source_mtime_ns")
+
+
+def render_row(row: Tuple) -> Dict[str, Any]:
+    return dict(zip(RENDER_COLUMNS, row))
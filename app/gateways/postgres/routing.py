@@ -0,0 +1,76 @@
+import itertools
+import threading
+import time
+from typing import Any, Dict, Generic, List, TypeVar
+
+
+Pool = TypeVar("Pool")
+
+
+def replica_dsns(value: str) -> List[str]:
+    # BLOGGER_DB_REPLICAS: comma-separated conninfo strings or URIs.
+    return [dsn.strip() for dsn in value.split(",") if dsn.strip()]
+
+
+class ReplicaRouter(Generic[Pool]):
+    """
+    Picks pools for a call: writes (and every read for read_your_writes
+    seconds after one) go to the primary; other reads go round-robin over
+    the replicas, then the primary. A replica that fails is skipped for
+    retry_after seconds. Shared by the sync and async clients, it never
+    touches a connection itself.
+    """
+
+    def __init__(self, primary: Pool, replicas: List[Pool], read_your_writes: float, retry_after: float):
+        self.primary = primary
+        self.replicas = replicas
+        self.read_your_writes = read_your_writes
+        self.retry_after = retry_after
+        self._next = itertools.count()
+        self._primary_until = 0.0
+        self._down_until: Dict[int, float] = {}
+        self._lock = threading.Lock()
+
+        self.replica_reads = 0
+        self.primary_reads = 0
+        self.failovers = 0
+
+    def for_read(self) -> List[Pool]:
+        now = time.monotonic()
+        if not self.replicas or now < self._primary_until:
+            return [self.primary]
+
+        start = next(self._next)
+        ordered = [self.replicas[(start + i) % len(self.replicas)] for i in range(len(self.replicas))]
+        with self._lock:
+            healthy = [replica for replica in ordered if self._down_until.get(id(replica), 0.0) <= now]
+        return healthy + [self.primary]
+
+    def wrote(self) -> None:
+        # A write made here or seen through NOTIFY: replicas may not have it yet.
+        if self.read_your_writes > 0:
+            self._primary_until = time.monotonic() + self.read_your_writes
+
+    def served(self, pool: Pool) -> None:
+        with self._lock:
+            if pool is self.primary:
+                self.primary_reads += 1
+            else:
+                self.replica_reads += 1
+
+    def failed(self, pool: Pool, error: Exception) -> None:
+        with self._lock:
+            self.failovers += 1
+            self._down_until[id(pool)] = time.monotonic() + self.retry_after
+        print(f"Replica unavailable, reading from the next pool for {self.retry_after}s: {error}")
+
+    def stats(self) -> Dict[str, Any]:
+        now = time.monotonic()
+        with self._lock:
+            return {
+                "replicas": len(self.replicas),
+                "replicas_down": sum(1 for until in self._down_until.values() if until > now),
+                "replica_reads": self.replica_reads,
+                "primary_reads": self.primary_reads,
+                "failovers": self.failovers,
+            }
@@ -1,16 +1,19 @@
-from typing import List, Dict, Any, Optional
+import time
+from typing import AsyncIterator, Iterator, List, Dict, Any, Optional
 from pydantic import BaseModel
-from fastapi import Depends
+from fastapi import Request
 
 from app.models.abstract import AbstractModel
 
 from app.enums.enums import BlogState
 from app.models.dates import DatesModel
-from app.repositories.blog import BlogRepository, get_blog_repository
-from app.utils.slugify import slugify
+from app.repositories.blog import BlogRepository, AsyncBlogRepository
+from app.utils.slugify import permalink_key
 
 
-class Blog(AbstractModel[BlogRepository]):
+class BlogSchemaMixin:
+    """The Schema and the row to Schema helpers shared by Blog and AsyncBlog."""
+
     class Schema(BaseModel):
         id: str
         title: str
@@ -20,43 +23,166 @@ class Blog(AbstractModel[BlogRepository]):
         content_file: str
         references: List[str]
         state: BlogState
+        word_count: Optional[int] = None
+        reading_time: Optional[int] = None
+        content_size: Optional[int] = None
 
         @property
         def permalink_key(self) -> str:
-            publish_date = self.dates.published_at or self.dates.created_at
-            year = publish_date.strftime("%Y")
-            month = publish_date.strftime("%m")
-            day = publish_date.strftime("%d")
-            slug = slugify(self.title)
-            return f"{year}/{month}/{day}/{slug}"
+            return permalink_key(self.dates.published_at, self.dates.created_at, self.title)
 
+    def _schema(self, data: Optional[Dict[str, Any]], validate: bool = True) -> Any:
+        # validate=False hands the repository row through untouched, for callers that only serialize it.
+        if not data or not validate:
+            return data
+        return self.Schema(**data)
 
-    def find_by_permalink(self, year: str, month: str, day: str, slug: str) -> Optional[Schema]:
-        data = self.repository.get_by_permalink(year, month, day, slug)
-        return self.Schema(**data) if data else None
+    def _bulk_summary(self, results: List[Dict[str, Any]], elapsed: float) -> Dict[str, Any]:
+        inserted = sum(1 for result in results if result["status"] == "inserted")
+        return {
+            "results": results,
+            "inserted": inserted,
+            "duplicates": sum(1 for result in results if result["status"] == "duplicate"),
+            "failed": sum(1 for result in results if result["status"] == "error"),
+            "elapsed": elapsed,
+            "rows_per_second": len(results) / elapsed if elapsed > 0 else 0.0,
+        }
+
+
+class Blog(BlogSchemaMixin, AbstractModel[BlogRepository]):
+    def save_many(self, blogs: List[BlogSchemaMixin.Schema], batch_size: int = 1000) -> Dict[str, Any]:
+        started = time.perf_counter()
+        results = []
+        for start in range(0, len(blogs), batch_size):
+            batch = [blog.model_dump() for blog in blogs[start:start + batch_size]]
+            results.extend(self.repository.add_many(batch))
+        return self._bulk_summary(results, time.perf_counter() - started)
+
+    def update_many(self, blogs: List[BlogSchemaMixin.Schema], batch_size: int = 1000) -> List[str]:
+        updated = []
+        for start in range(0, len(blogs), batch_size):
+            batch = [blog.model_dump() for blog in blogs[start:start + batch_size]]
+            updated.extend(self.repository.update_many(batch))
+        return updated
+
+    def retire_many(self, blog_ids: List[str]) -> List[str]:
+        return self.repository.retire_many(blog_ids) if blog_ids else []
 
-    def save(self, blog_data: Schema) -> None:
-        self.repository.add(blog_data.model_dump())
+    def find_ids_by_content_files(self, content_files: List[str]) -> Dict[str, str]:
+        return self.repository.get_ids_by_content_files(content_files) if content_files else {}
 
-    def update(self, blog_id: str, blog_data: Schema) -> None:
-        self.repository.update(blog_id, blog_data.model_dump())
+    def get_keyset_page(
+        self, limit: int, state: Optional[BlogState] = None,
+        cursor: Optional[Dict[str, Any]] = None, validate: bool = True,
+    ) -> Dict[str, Any]:
+        repo_data = self.repository.get_keyset_page(limit, state=state, cursor=cursor)
+        return {"blogs": [self._schema(blog, validate) for blog in repo_data.get("blogs")]}
 
-    def find_by_id(self, blog_id: str) -> Optional[Schema]:
-        data = self.repository.get_by_id(blog_id)
+    def count(self, state: Optional[BlogState] = None) -> int:
+        return self.repository.count(state=state)
+
+    def iter_all(self, state: Optional[BlogState] = None, batch_size: int = 1000, validate: bool = True) -> Iterator[List[Any]]:
+        for rows in self.repository.iter_all(state=state, batch_size=batch_size):
+            yield [self._schema(blog, validate) for blog in rows]
+
+    def save_search_bodies(self, bodies: Dict[str, str], batch_size: int = 1000) -> None:
+        rows = [{"id": blog_id, "body": body} for blog_id, body in bodies.items()]
+        for start in range(0, len(rows), batch_size):
+            self.repository.save_search_bodies(rows[start:start + batch_size])
+
+
+class AsyncBlog(BlogSchemaMixin, AbstractModel[AsyncBlogRepository]):
+    def __init__(self, repository: AsyncBlogRepository):
+        super().__init__(repository)
+
+    async def find_by_permalink(self, year: str, month: str, day: str, slug: str) -> Optional[BlogSchemaMixin.Schema]:
+        data = await self.repository.get_by_permalink(year, month, day, slug)
         return self.Schema(**data) if data else None
 
-    def get_page(self, page: int, limit: int, state: Optional[BlogState] = None) -> Dict[str, Any]:
-        repo_data = self.repository.get_page(page, limit, state=state)
-        
+    async def save(self, blog_data: BlogSchemaMixin.Schema) -> None:
+        await self.repository.add(blog_data.model_dump())
+
+    async def save_many(self, blogs: List[BlogSchemaMixin.Schema], batch_size: int = 1000) -> Dict[str, Any]:
+        started = time.perf_counter()
+        results = []
+        for start in range(0, len(blogs), batch_size):
+            batch = [blog.model_dump() for blog in blogs[start:start + batch_size]]
+            results.extend(await self.repository.add_many(batch))
+        return self._bulk_summary(results, time.perf_counter() - started)
+
+    async def update_many(self, blogs: List[BlogSchemaMixin.Schema], batch_size: int = 1000) -> List[str]:
+        updated = []
+        for start in range(0, len(blogs), batch_size):
+            batch = [blog.model_dump() for blog in blogs[start:start + batch_size]]
+            updated.extend(await self.repository.update_many(batch))
+        return updated
+
+    async def retire_many(self, blog_ids: List[str]) -> List[str]:
+        return await self.repository.retire_many(blog_ids) if blog_ids else []
+
+    async def find_ids_by_content_files(self, content_files: List[str]) -> Dict[str, str]:
+        return await self.repository.get_ids_by_content_files(content_files) if content_files else {}
+
+    async def update(self, blog_id: str, blog_data: BlogSchemaMixin.Schema) -> None:
+        await self.repository.update(blog_id, blog_data.model_dump())
+
+    async def find_by_id(self, blog_id: str, validate: bool = True) -> Optional[BlogSchemaMixin.Schema]:
+        return self._schema(await self.repository.get_by_id(blog_id), validate)
+
+    async def get_page(self, page: int, limit: int, state: Optional[BlogState] = None, validate: bool = True) -> Dict[str, Any]:
+        repo_data = await self.repository.get_page(page, limit, state=state)
+
         return {
-            "blogs": [self.Schema(**blog) for blog in repo_data.get("blogs")],
+            "blogs": [self._schema(blog, validate) for blog in repo_data.get("blogs")],
             "total_count": repo_data.get("total_count")
         }
 
-    def get_all(self) -> List[Schema]:
-        data = self.repository.get_all()
+    async def get_keyset_page(
+        self, limit: int, state: Optional[BlogState] = None,
+        cursor: Optional[Dict[str, Any]] = None, validate: bool = True,
+        category: Optional[str] = None, keyword: Optional[str] = None,
+    ) -> Dict[str, Any]:
+        repo_data = await self.repository.get_keyset_page(limit, state=state, cursor=cursor, category=category, keyword=keyword)
+        return {"blogs": [self._schema(blog, validate) for blog in repo_data.get("blogs")]}
+
+    async def count(self, state: Optional[BlogState] = None) -> int:
+        return await self.repository.count(state=state)
+
+    async def facets(self, kind: Optional[str] = None, limit: int = 100) -> List[Dict[str, Any]]:
+        return await self.repository.get_facets(kind, limit)
+
+    async def get_all(self) -> List[BlogSchemaMixin.Schema]:
+        data = await self.repository.get_all()
         return [self.Schema(**blog) for blog in data]
 
+    async def iter_all(self, state: Optional[BlogState] = None, batch_size: int = 1000, validate: bool = True) -> AsyncIterator[List[Any]]:
+        async for rows in self.repository.iter_all(state=state, batch_size=batch_size):
+            yield [self._schema(blog, validate) for blog in rows]
+
+    async def find_render(self, blog_id: str) -> Optional[Dict[str, Any]]:
+        return await self.repository.get_render(blog_id)
+
+    async def save_render(self, blog_id: str, render: Dict[str, Any]) -> None:
+        await self.repository.save_render(blog_id, render)
+
+    async def sitemap_shards(self) -> List[Dict[str, Any]]:
+        return await self.repository.get_sitemap_shards()
+
+    async def sitemap_entries(self, shard: str, limit: int, offset: int = 0) -> List[Dict[str, Any]]:
+        return await self.repository.get_sitemap_entries(shard, limit, offset)
+
+    async def search(self, query: str, limit: int, state: Optional[BlogState] = None, cursor: Optional[Dict[str, Any]] = None) -> List[Dict[str, Any]]:
+        hits = await self.repository.search(query, limit, state=state, cursor=cursor)
+        return [{**hit, "blog": self.Schema(**hit["blog"])} for hit in hits]
+
+    async def save_search_body(self, blog_id: str, body: str) -> None:
+        await self.repository.save_search_body(blog_id, body)
+
+    async def save_search_bodies(self, bodies: Dict[str, str], batch_size: int = 1000) -> None:
+        rows = [{"id": blog_id, "body": body} for blog_id, body in bodies.items()]
+        for start in range(0, len(rows), batch_size):
+            await self.repository.save_search_bodies(rows[start:start + batch_size])
+
 
-def get_blog_model(repository: BlogRepository = Depends(get_blog_repository)) -> Blog:
-    return Blog(repository)
+async def get_blog_model(request: Request) -> AsyncBlog:
+    return request.app.state.container.blog_model
@@ -1,5 +1,5 @@
-from abc import ABC, abstractmethod
-from typing import Any, Dict, List, Optional, Tuple
+from abc import ABC
+from typing import Tuple
 
 from app.gateways.postgres.client import PostgresClient
 
@@ -10,27 +10,3 @@ class AbstractRepository(ABC):
 
     def _call(self, func_name: str, params: Tuple = (), commit: bool = False):
         return self.client.call_function(func_name, params, commit)
-
-    @abstractmethod
-    def get_by_id(self, id: str) -> Optional[Dict[str, Any]]:
-        pass
-    
-    @abstractmethod
-    def get_page(self, page: int, limit: int, **kwargs) -> Dict[str, Any]:
-        pass
-
-    @abstractmethod
-    def get_all(self) -> Dict[str, Any]:
-        pass
-    
-    @abstractmethod
-    def add(self, data: Any) -> None:
-        pass
-
-    @abstractmethod
-    def update(self, id: int, data: Any) -> None:
-        pass
-
-    @abstractmethod
-    def delete(self, id: str) -> None:
-        pass
@@ -1,22 +1,28 @@
+import json
 from fastapi import Request
-from typing import Any, Dict, List, Optional
+from typing import Any, AsyncIterator, Dict, Iterator, List, Optional, Tuple
 
+from app.config import get_settings
 from app.repositories.abstract import AbstractRepository
 
 from app.gateways.postgres.client import PostgresClient
+from app.gateways.postgres.async_client import AsyncPostgresClient
+from app.gateways.postgres import queries
 from app.enums.enums import BlogState
 
 
-class BlogRepository(AbstractRepository):
-    def __init__(self, db_client: PostgresClient):
-        super().__init__(db_client)
-        
+class BlogRowsMixin:
+    """
+    Parameter building and row formatting shared by BlogRepository and
+    AsyncBlogRepository; no I/O, so it is the same for both clients.
+    """
+
     def _format_row(self, row: Dict[str, Any]) -> Optional[Dict[str, Any]]:
         if not row:
             return None
-        
+
         data = dict(row)
-        
+
         data['dates'] = {
             'created_at': data.pop('created_at'),
             'published_at': data.pop('published_at'),
@@ -24,15 +30,7 @@ class BlogRepository(AbstractRepository):
         }
         return data
 
-    def get_by_id(self, id: str) -> Optional[Dict[str, Any]]:
-        rows = self._call("fn_get_blog_by_id", (id, ))
-        return self._format_row(rows[0]) if rows else None
-
-    def get_page(self, page: int, limit: int, state: Optional[BlogState] = None) -> Dict[str, Any]:
-        offset = (page - 1) * limit
-        state_value = state.value if isinstance(state, BlogState) else None
-        
-        rows = self._call("fn_get_paged_blogs", (state_value, limit, offset))
+    def _format_page(self, rows: Optional[List[Dict[str, Any]]]) -> Dict[str, Any]:
         if not rows:
             return {"blogs": [], "total_count": 0}
 
@@ -41,41 +39,327 @@ class BlogRepository(AbstractRepository):
             "total_count": rows[0]['total_count'],
         }
 
-    def get_all(self) -> List[Dict[str, Any]]:
-        rows = self._call("fn_get_all_blogs")
-        return [self._format_row(row) for row in rows] if rows else []
+    def _state_value(self, state: Any) -> Optional[str]:
+        return state.value if hasattr(state, 'value') else state
 
-    def add(self, metadata: Dict[str, Any]) -> None:
+    def _page_params(self, page: int, limit: int, state: Optional[BlogState]) -> Tuple:
+        offset = (page - 1) * limit
+        return (self._state_value(state), limit, offset)
+
+    def _keyset_params(
+        self, limit: int, state: Optional[BlogState], cursor: Optional[Dict[str, Any]],
+        category: Optional[str] = None, keyword: Optional[str] = None,
+    ) -> Tuple:
+        cursor = cursor or {}
+        return (
+            self._state_value(state), limit,
+            cursor.get('published_at'), cursor.get('created_at'),
+            cursor.get('id'), cursor.get('before', False),
+            category, keyword,
+        )
+
+    def _add_params(self, metadata: Dict[str, Any]) -> Tuple:
         dates = metadata.get('dates', {})
-        state = metadata['state'].value if hasattr(metadata['state'], 'value') else metadata['state']
-        
-        params = (
+        return (
             metadata['id'], metadata['title'], metadata['category'],
             metadata['keywords'], dates.get('created_at'),
             dates.get('published_at'), dates.get('last_update'),
-            metadata['content_file'], metadata['references'], state,
+            metadata['content_file'], metadata['references'],
+            self._state_value(metadata['state']),
+            metadata.get('word_count'), metadata.get('reading_time'), metadata.get('content_size'),
         )
-        self._call("fn_add_blog", params, commit=True)
 
-    def update(self, id: str, metadata: Dict[str, Any]) -> None:
+    def _update_params(self, id: str, metadata: Dict[str, Any]) -> Tuple:
         dates = metadata.get('dates', {})
-        state = metadata['state'].value if hasattr(metadata['state'], 'value') else metadata['state']
-        
-        params = (
+        return (
             id, metadata['title'], metadata['category'],
             metadata['keywords'], dates.get('published_at'),
-            metadata['content_file'], metadata['references'], state
+            metadata['content_file'], metadata['references'],
+            self._state_value(metadata['state']),
+            metadata.get('word_count'), metadata.get('reading_time'), metadata.get('content_size'),
+        )
+
+    def _unique_rows(self, metadata_rows: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        unique, seen = [], set()
+        for metadata in metadata_rows:
+            if metadata['id'] not in seen:
+                seen.add(metadata['id'])
+                unique.append(metadata)
+        return unique
+
+    def _bulk_params(self, metadata_rows: List[Dict[str, Any]]) -> Tuple:
+        payload = []
+        for metadata in metadata_rows:
+            dates = metadata.get('dates', {})
+            payload.append({
+                'id': metadata['id'], 'title': metadata['title'],
+                'category': metadata['category'], 'keywords': metadata['keywords'],
+                'created_at': dates.get('created_at'), 'published_at': dates.get('published_at'),
+                'last_update': dates.get('last_update'), 'content_file': metadata['content_file'],
+                'references': metadata['references'], 'state': self._state_value(metadata['state']),
+                'word_count': metadata.get('word_count'), 'reading_time': metadata.get('reading_time'),
+                'content_size': metadata.get('content_size'),
+            })
+        return (json.dumps(payload, default=str), )
+
+    def _bulk_outcome(self, rows: Optional[List[Dict[str, Any]]]) -> Dict[str, Tuple[str, Optional[str]]]:
+        return {
+            row['blog_id']: ("inserted", None) if row['inserted'] else ("duplicate", "Blog id already exists")
+            for row in rows or []
+        }
+
+    def _row_outcome(self, error: Optional[Exception]) -> Tuple[str, Optional[str]]:
+        if error is None:
+            return ("inserted", None)
+        # 23505 is unique_violation.
+        if getattr(error, 'sqlstate', None) == '23505':
+            return ("duplicate", "Blog id already exists")
+        return ("error", str(error).strip().splitlines()[0])
+
+    def _bulk_results(
+        self, metadata_rows: List[Dict[str, Any]], unique: List[Dict[str, Any]],
+        outcome: Dict[str, Tuple[str, Optional[str]]],
+    ) -> List[Dict[str, Any]]:
+        sent = {id(metadata) for metadata in unique}
+        results = []
+        for metadata in metadata_rows:
+            if id(metadata) in sent:
+                status, message = outcome.get(metadata['id'], ("error", "No result returned"))
+            else:
+                status, message = ("duplicate", "Blog id repeated in batch")
+            results.append({"id": metadata['id'], "status": status, "message": message})
+        return results
+
+    def _bulk_update_params(self, metadata_rows: List[Dict[str, Any]]) -> Tuple:
+        payload = []
+        for metadata in metadata_rows:
+            dates = metadata.get('dates', {})
+            payload.append({
+                'id': metadata['id'], 'title': metadata['title'],
+                'category': metadata['category'], 'keywords': metadata['keywords'],
+                'published_at': dates.get('published_at'), 'content_file': metadata['content_file'],
+                'references': metadata['references'], 'state': self._state_value(metadata['state']),
+                'word_count': metadata.get('word_count'), 'reading_time': metadata.get('reading_time'),
+                'content_size': metadata.get('content_size'),
+            })
+        return (json.dumps(payload, default=str), )
+
+    def _content_file_ids(self, rows: Optional[List[Dict[str, Any]]]) -> Dict[str, str]:
+        # Rows come newest first, so the newest blog wins when a file was registered twice.
+        ids = {}
+        for row in rows or []:
+            ids.setdefault(row['content_file'], row['blog_id'])
+        return ids
+
+    def _search_params(self, query: str, limit: int, state: Optional[BlogState], cursor: Optional[Dict[str, Any]]) -> Tuple:
+        cursor = cursor or {}
+        return (query, self._state_value(state), limit, cursor.get('rank'), cursor.get('id'))
+
+    def _format_hit(self, row: Dict[str, Any]) -> Dict[str, Any]:
+        data = self._format_row(row)
+        return {"rank": data.pop('rank'), "snippet": data.pop('snippet'), "blog": data}
+
+    def _render_params(self, id: str, render: Dict[str, Any]) -> Tuple:
+        return (
+            id, render['content_hash'], render['html'],
+            render['reading_time'], render['word_count'],
+            render['source_size'], render['source_mtime_ns'],
         )
-        self._call("fn_update_blog", params, commit=True)
 
-    def delete(self, id: str) -> None:
-        self._call("fn_delete_blog", (id, ), commit=True)
 
-    def get_by_permalink(self, year: str, month: str, day: str, slug: str) -> Optional[Dict[str, Any]]:
-        rows = self._call("fn_get_blog_by_permalink", (year, month, day, slug))
+class BlogRepository(BlogRowsMixin, AbstractRepository):
+    def __init__(self, db_client: PostgresClient):
+        super().__init__(db_client)
+
+    def get_keyset_page(self, limit: int, state: Optional[BlogState] = None, cursor: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+        rows = self._call("fn_get_keyset_blogs", self._keyset_params(limit, state, cursor))
+        return {"blogs": [self._format_row(row) for row in rows] if rows else []}
+
+    def count(self, state: Optional[BlogState] = None) -> int:
+        rows = self._call("fn_count_blogs", (self._state_value(state), ))
+        return rows[0]['fn_count_blogs'] if rows else 0
+
+    def iter_all(self, state: Optional[BlogState] = None, batch_size: int = 1000) -> Iterator[List[Dict[str, Any]]]:
+        for rows in self.client.stream_function("fn_get_all_blogs", (self._state_value(state), ), batch_size):
+            yield [self._format_row(row) for row in rows]
+
+    def add(self, metadata: Dict[str, Any]) -> None:
+        self._call("fn_add_blog", self._add_params(metadata), commit=True)
+
+    def add_many(self, metadata_rows: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        unique = self._unique_rows(metadata_rows)
+        try:
+            rows = self._call("fn_add_blogs_bulk", self._bulk_params(unique), commit=True)
+            outcome = self._bulk_outcome(rows)
+        except Exception:
+            # The batch was rolled back as a whole, retry row by row to isolate the bad rows.
+            outcome = {}
+            for metadata in unique:
+                try:
+                    self.add(metadata)
+                    outcome[metadata['id']] = self._row_outcome(None)
+                except Exception as e:
+                    outcome[metadata['id']] = self._row_outcome(e)
+        return self._bulk_results(metadata_rows, unique, outcome)
+
+    def update_many(self, metadata_rows: List[Dict[str, Any]]) -> List[str]:
+        rows = self._call("fn_update_blogs_bulk", self._bulk_update_params(metadata_rows), commit=True)
+        return [row['blog_id'] for row in rows or []]
+
+    def retire_many(self, ids: List[str]) -> List[str]:
+        rows = self._call("fn_retire_blogs", (list(ids), ), commit=True)
+        return [row['blog_id'] for row in rows or []]
+
+    def get_ids_by_content_files(self, content_files: List[str]) -> Dict[str, str]:
+        rows = self._call("fn_get_blog_ids_by_content_files", (list(content_files), ))
+        return self._content_file_ids(rows)
+
+    def save_search_bodies(self, bodies: List[Dict[str, str]]) -> None:
+        self._call("fn_upsert_blog_search_bulk", (json.dumps(bodies), ), commit=True)
+
+
+class AsyncBlogRepository(BlogRowsMixin):
+    """
+    With `prepared` (BLOGGER_DB_PREPARED by default) the metadata and render
+    reads run the inline statements of app/gateways/postgres/queries.py as
+    prepared statements with tuple rows; writes and search always call the
+    SQL functions.
+    """
+
+    def __init__(self, db_client: AsyncPostgresClient, prepared: Optional[bool] = None):
+        self.client = db_client
+        self.prepared = get_settings().BLOGGER_DB_PREPARED if prepared is None else prepared
+
+    async def _call(self, func_name: str, params: Tuple = (), commit: bool = False):
+        return await self.client.call_function(func_name, params, commit)
+
+    async def _fetch(self, name: str, state: Optional[BlogState] = None, **params: Any) -> List[Tuple]:
+        state = self._state_value(state)
+        name = queries.statement_name(name, state, params.get("category"), params.get("keyword"))
+        return await self.client.fetch_prepared(name, {"state": state, **params})
+
+    async def get_by_id(self, id: str) -> Optional[Dict[str, Any]]:
+        if self.prepared:
+            rows = await self._fetch("blog_by_id", id=id)
+            return queries.blog_row(rows[0]) if rows else None
+        rows = await self._call("fn_get_blog_by_id", (id, ))
+        return self._format_row(rows[0]) if rows else None
+
+    async def get_page(self, page: int, limit: int, state: Optional[BlogState] = None) -> Dict[str, Any]:
+        if self.prepared:
+            rows = await self._fetch("paged_blogs", state, limit=limit, offset=(page - 1) * limit)
+            return {
+                "blogs": [queries.blog_row(row) for row in rows],
+                "total_count": rows[0][-1] if rows else 0,
+            }
+        rows = await self._call("fn_get_paged_blogs", self._page_params(page, limit, state))
+        return self._format_page(rows)
+
+    async def get_keyset_page(
+        self, limit: int, state: Optional[BlogState] = None, cursor: Optional[Dict[str, Any]] = None,
+        category: Optional[str] = None, keyword: Optional[str] = None,
+    ) -> Dict[str, Any]:
+        if self.prepared:
+            cursor = cursor or {}
+            rows = await self._fetch(
+                queries.keyset_variant(cursor), state, limit=limit,
+                published_at=cursor.get('published_at'), created_at=cursor.get('created_at'), id=cursor.get('id'),
+                category=category, keyword=keyword,
+            )
+            return {"blogs": [queries.blog_row(row) for row in rows]}
+        rows = await self._call("fn_get_keyset_blogs", self._keyset_params(limit, state, cursor, category, keyword))
+        return {"blogs": [self._format_row(row) for row in rows] if rows else []}
+
+    async def get_facets(self, kind: Optional[str] = None, limit: int = 100) -> List[Dict[str, Any]]:
+        return await self._call("fn_get_blog_facets", (kind, limit)) or []
+
+    async def count(self, state: Optional[BlogState] = None) -> int:
+        if self.prepared:
+            rows = await self._fetch("count_blogs", state)
+            return rows[0][0] if rows else 0
+        rows = await self._call("fn_count_blogs", (self._state_value(state), ))
+        return rows[0]['fn_count_blogs'] if rows else 0
+
+    async def get_all(self) -> List[Dict[str, Any]]:
+        rows = await self._call("fn_get_all_blogs")
+        return [self._format_row(row) for row in rows] if rows else []
+
+    async def iter_all(self, state: Optional[BlogState] = None, batch_size: int = 1000) -> AsyncIterator[List[Dict[str, Any]]]:
+        # Same column order as BLOG_COLUMNS, so the tuple rows map like the prepared reads.
+        async for rows in self.client.stream_function("fn_get_all_blogs", (self._state_value(state), ), batch_size):
+            yield [queries.blog_row(row) for row in rows]
+
+    async def add(self, metadata: Dict[str, Any]) -> None:
+        await self._call("fn_add_blog", self._add_params(metadata), commit=True)
+
+    async def add_many(self, metadata_rows: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        unique = self._unique_rows(metadata_rows)
+        try:
+            rows = await self._call("fn_add_blogs_bulk", self._bulk_params(unique), commit=True)
+            outcome = self._bulk_outcome(rows)
+        except Exception:
+            outcome = {}
+            for metadata in unique:
+                try:
+                    await self.add(metadata)
+                    outcome[metadata['id']] = self._row_outcome(None)
+                except Exception as e:
+                    outcome[metadata['id']] = self._row_outcome(e)
+        return self._bulk_results(metadata_rows, unique, outcome)
+
+    async def update(self, id: str, metadata: Dict[str, Any]) -> None:
+        await self._call("fn_update_blog", self._update_params(id, metadata), commit=True)
+
+    async def update_many(self, metadata_rows: List[Dict[str, Any]]) -> List[str]:
+        rows = await self._call("fn_update_blogs_bulk", self._bulk_update_params(metadata_rows), commit=True)
+        return [row['blog_id'] for row in rows or []]
+
+    async def retire_many(self, ids: List[str]) -> List[str]:
+        rows = await self._call("fn_retire_blogs", (list(ids), ), commit=True)
+        return [row['blog_id'] for row in rows or []]
+
+    async def get_ids_by_content_files(self, content_files: List[str]) -> Dict[str, str]:
+        rows = await self._call("fn_get_blog_ids_by_content_files", (list(content_files), ))
+        return self._content_file_ids(rows)
+
+    async def delete(self, id: str) -> None:
+        await self._call("fn_delete_blog", (id, ), commit=True)
+
+    async def get_by_permalink(self, year: str, month: str, day: str, slug: str) -> Optional[Dict[str, Any]]:
+        if self.prepared:
+            rows = await self._fetch("blog_by_permalink", key=f"{year}/{month}/{day}/{slug.lower()}")
+            return queries.blog_row(rows[0]) if rows else None
+        rows = await self._call("fn_get_blog_by_permalink", (year, month, day, slug))
         return self._format_row(rows[0]) if rows else None
 
+    async def search(self, query: str, limit: int, state: Optional[BlogState] = None, cursor: Optional[Dict[str, Any]] = None) -> List[Dict[str, Any]]:
+        rows = await self._call("fn_search_blogs", self._search_params(query, limit, state, cursor))
+        return [self._format_hit(row) for row in rows] if rows else []
+
+    async def save_search_body(self, id: str, body: str) -> None:
+        await self._call("fn_upsert_blog_search", (id, body), commit=True)
+
+    async def save_search_bodies(self, bodies: List[Dict[str, str]]) -> None:
+        await self._call("fn_upsert_blog_search_bulk", (json.dumps(bodies), ), commit=True)
+
+    async def get_render(self, id: str) -> Optional[Dict[str, Any]]:
+        if self.prepared:
+            rows = await self._fetch("blog_render", id=id)
+            return queries.render_row(rows[0]) if rows else None
+        rows = await self._call("fn_get_blog_render", (id, ))
+        return dict(rows[0]) if rows else None
+
+    async def save_render(self, id: str, render: Dict[str, Any]) -> None:
+        await self.client.call_function("fn_upsert_blog_render", self._render_params(id, render), commit=True, pin_reads=False)
+
+    async def get_sitemap_shards(self) -> List[Dict[str, Any]]:
+        rows = await self._call("fn_get_sitemap_shards")
+        return [dict(row) for row in rows] if rows else []
+
+    async def get_sitemap_entries(self, shard: str, limit: int, offset: int = 0) -> List[Dict[str, Any]]:
+        rows = await self._call("fn_get_sitemap_entries", (shard, limit, offset))
+        return [dict(row) for row in rows] if rows else []
+
 
-def get_blog_repository(request: Request) -> BlogRepository:
-    db_client = request.app.state.db_client
-    return BlogRepository(db_client)
+async def get_blog_repository(request: Request) -> AsyncBlogRepository:
+    return request.app.state.container.blog_repository
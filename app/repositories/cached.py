@@ -0,0 +1,57 @@
+from typing import Any, Dict, List, Optional
+
+from app.gateways.postgres.async_client import AsyncPostgresClient
+from app.repositories.blog import AsyncBlogRepository
+from app.utils.metadata_cache import MetadataCache, get_metadata_cache
+
+
+class CachedBlogRepository(AsyncBlogRepository):
+    """Point lookups read through the MetadataCache; updates and deletes drop the rows they touch."""
+
+    def __init__(self, db_client: AsyncPostgresClient, cache: Optional[MetadataCache] = None):
+        super().__init__(db_client)
+        self.cache = cache or get_metadata_cache()
+
+    async def get_by_id(self, id: str) -> Optional[Dict[str, Any]]:
+        key = ("id", id)
+        row = self.cache.get(key)
+        if row is None:
+            token = self.cache.token()
+            row = await super().get_by_id(id)
+            if row:
+                self.cache.put(key, row, token)
+        return row
+
+    async def get_by_permalink(self, year: str, month: str, day: str, slug: str) -> Optional[Dict[str, Any]]:
+        key = ("permalink", f"{year}/{month}/{day}/{slug.lower()}")
+        row = self.cache.get(key)
+        if row is None:
+            token = self.cache.token()
+            row = await super().get_by_permalink(year, month, day, slug)
+            if row:
+                self.cache.put(key, row, token)
+        return row
+
+    async def update(self, id: str, metadata: Dict[str, Any]) -> None:
+        try:
+            await super().update(id, metadata)
+        finally:
+            self.cache.invalidate([id])
+
+    async def update_many(self, metadata_rows: List[Dict[str, Any]]) -> List[str]:
+        try:
+            return await super().update_many(metadata_rows)
+        finally:
+            self.cache.invalidate([metadata['id'] for metadata in metadata_rows])
+
+    async def retire_many(self, ids: List[str]) -> List[str]:
+        try:
+            return await super().retire_many(ids)
+        finally:
+            self.cache.invalidate(ids)
+
+    async def delete(self, id: str) -> None:
+        try:
+            await super().delete(id)
+        finally:
+            self.cache.invalidate([id])
@@ -0,0 +1,219 @@
+import asyncio
+import json
+import os
+import time
+from bisect import bisect_left, bisect_right
+from datetime import datetime, timezone
+from typing import Any, Dict, List, Optional, Tuple
+
+from app.config import Settings
+from app.enums.enums import BlogState
+from app.gateways.postgres.async_client import AsyncPostgresClient
+from app.repositories.blog import AsyncBlogRepository
+from app.utils.invalidation import on_write
+from app.utils.slugify import permalink_key
+
+
+# Ascending form of the listing order (published_at DESC NULLS LAST, created_at DESC, id DESC):
+# walking these keys backwards yields rows in listing order.
+SortKey = Tuple[bool, datetime, datetime, str]
+_NO_DATE = datetime.min.replace(tzinfo=timezone.utc)
+
+
+def _sort_key(published_at: Optional[datetime], created_at: datetime, id: str) -> SortKey:
+    return (published_at is not None, published_at or _NO_DATE, created_at, id)
+
+
+class _IndexState:
+    """One immutable generation of the index, swapped in whole on refresh."""
+
+    __slots__ = ("by_id", "by_permalink", "orders", "keys")
+
+    def __init__(self, rows: List[Dict[str, Any]]):
+        keyed = sorted(
+            ((_sort_key(row['dates']['published_at'], row['dates']['created_at'], row['id']), row) for row in rows),
+            key=lambda item: item[0],
+        )
+
+        self.by_id: Dict[str, Dict[str, Any]] = {}
+        self.by_permalink: Dict[str, Dict[str, Any]] = {}
+        self.orders: Dict[Optional[str], List[Dict[str, Any]]] = {None: [], **{state: [] for state in BlogState.list_values()}}
+        self.keys: Dict[Optional[str], List[SortKey]] = {state: [] for state in self.orders}
+
+        for key, row in keyed:
+            state = row['state'].value if hasattr(row['state'], 'value') else row['state']
+            for bucket in (None, state):
+                self.orders[bucket].append(row)
+                self.keys[bucket].append(key)
+            self.by_id[row['id']] = row
+
+        # Newest first, so a shared permalink resolves to the row listed first.
+        for row in reversed(self.orders[None]):
+            dates = row['dates']
+            self.by_permalink.setdefault(permalink_key(dates['published_at'], dates['created_at'], row['title']), row)
+
+
+class BlogIndex:
+    """
+    All blog metadata held in process: dicts by id and by permalink key,
+    plus per-state arrays in listing order with their sort keys, so a page is
+    a slice and a keyset page a bisect. Loaded from Postgres (keyset batches)
+    or a snapshot file written by snapshot_blogs.py, and reloaded every
+    `interval` seconds or right after an admin write.
+    """
+
+    def __init__(self, source: str = "postgres", snapshot_path: Optional[str] = None, interval: float = 60.0, batch_size: int = 5000):
+        if source not in ("postgres", "snapshot"):
+            raise ValueError(f"Unknown blog index source: {source}")
+        self.source = source
+        self.snapshot_path = snapshot_path
+        self.interval = interval
+        self.batch_size = batch_size
+        self.loaded_at: Optional[float] = None
+
+        self._state = _IndexState([])
+        self._snapshot_mtime: Optional[int] = None
+        self._changed = asyncio.Event()
+        self._task: Optional[asyncio.Task] = None
+
+    @classmethod
+    def from_settings(cls, settings: Settings) -> "BlogIndex":
+        return cls(
+            source=settings.BLOGGER_MEMORY_SOURCE,
+            snapshot_path=settings.BLOGGER_MEMORY_SNAPSHOT,
+            interval=settings.BLOGGER_MEMORY_REFRESH,
+        )
+
+    def get_by_id(self, id: str) -> Optional[Dict[str, Any]]:
+        return self._state.by_id.get(id)
+
+    def get_by_permalink(self, year: str, month: str, day: str, slug: str) -> Optional[Dict[str, Any]]:
+        return self._state.by_permalink.get(f"{year}/{month}/{day}/{slug.lower()}")
+
+    def get_page(self, page: int, limit: int, state: Optional[str] = None) -> Dict[str, Any]:
+        rows = self._state.orders[state]
+        end = max(0, len(rows) - (page - 1) * limit)
+        return {"blogs": rows[max(0, end - limit):end][::-1], "total_count": len(rows)}
+
+    def get_keyset_page(self, limit: int, state: Optional[str] = None, cursor: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+        current = self._state
+        rows, keys = current.orders[state], current.keys[state]
+        if not cursor:
+            return {"blogs": rows[max(0, len(rows) - limit):][::-1]}
+
+        key = _sort_key(cursor.get('published_at'), cursor['created_at'], cursor['id'])
+        if cursor.get('before'):
+            start = bisect_right(keys, key)
+            return {"blogs": rows[start:start + limit][::-1]}
+        end = bisect_left(keys, key)
+        return {"blogs": rows[max(0, end - limit):end][::-1]}
+
+    def count(self, state: Optional[str] = None) -> int:
+        return len(self._state.orders[state])
+
+    def get_all(self) -> List[Dict[str, Any]]:
+        return self._state.orders[None][::-1]
+
+    def mark_stale(self) -> None:
+        self._changed.set()
+
+    async def refresh(self, repository: AsyncBlogRepository) -> bool:
+        if self.source == "snapshot":
+            mtime = os.stat(self.snapshot_path).st_mtime_ns
+            if mtime == self._snapshot_mtime:
+                return False
+            rows = await asyncio.to_thread(read_snapshot, self.snapshot_path)
+            self._snapshot_mtime = mtime
+        else:
+            rows = await self._load_rows(repository)
+
+        self._state = await asyncio.to_thread(_IndexState, rows)
+        self.loaded_at = time.time()
+        return True
+
+    async def _load_rows(self, repository: AsyncBlogRepository) -> List[Dict[str, Any]]:
+        rows, cursor = [], None
+        while True:
+            batch = (await repository.get_keyset_page(self.batch_size, cursor=cursor))["blogs"]
+            rows.extend(batch)
+            if len(batch) < self.batch_size:
+                return rows
+            last = batch[-1]
+            cursor = {"published_at": last['dates']['published_at'], "created_at": last['dates']['created_at'], "id": last['id']}
+
+    async def start(self, repository: AsyncBlogRepository) -> None:
+        await self.refresh(repository)
+        on_write(self.mark_stale)
+        self._task = asyncio.create_task(self._run(repository))
+
+    async def stop(self) -> None:
+        if self._task:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+
+    async def _run(self, repository: AsyncBlogRepository) -> None:
+        while True:
+            try:
+                await asyncio.wait_for(self._changed.wait(), timeout=self.interval if self.interval > 0 else None)
+            except asyncio.TimeoutError:
+                pass
+            self._changed.clear()
+            try:
+                await self.refresh(repository)
+            except Exception as e:
+                # Keep serving the last generation, the next tick retries.
+                print(f"Blog index refresh failed: {e}")
+
+
+class InMemoryBlogRepository(AsyncBlogRepository):
+    """Serves metadata reads from a BlogIndex; renders, search and writes still go to Postgres."""
+
+    def __init__(self, db_client: AsyncPostgresClient, index: BlogIndex):
+        super().__init__(db_client)
+        self.index = index
+
+    async def get_by_id(self, id: str) -> Optional[Dict[str, Any]]:
+        return self.index.get_by_id(id)
+
+    async def get_by_permalink(self, year: str, month: str, day: str, slug: str) -> Optional[Dict[str, Any]]:
+        return self.index.get_by_permalink(year, month, day, slug)
+
+    async def get_page(self, page: int, limit: int, state: Optional[BlogState] = None) -> Dict[str, Any]:
+        return self.index.get_page(page, limit, self._state_value(state))
+
+    async def get_keyset_page(
+        self, limit: int, state: Optional[BlogState] = None, cursor: Optional[Dict[str, Any]] = None,
+        category: Optional[str] = None, keyword: Optional[str] = None,
+    ) -> Dict[str, Any]:
+        if category is not None or keyword is not None:
+            # The index keeps one order per state only; filtered pages come from Postgres.
+            return await super().get_keyset_page(limit, state, cursor, category, keyword)
+        return self.index.get_keyset_page(limit, self._state_value(state), cursor)
+
+    async def count(self, state: Optional[BlogState] = None) -> int:
+        return self.index.count(self._state_value(state))
+
+    async def get_all(self) -> List[Dict[str, Any]]:
+        return self.index.get_all()
+
+
+def write_snapshot(path: str, rows: List[Dict[str, Any]]) -> None:
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump({"rows": rows}, f, default=lambda value: value.isoformat(), separators=(",", ":"))
+    os.replace(tmp_path, path)
+
+
+def read_snapshot(path: str) -> List[Dict[str, Any]]:
+    with open(path, "r", encoding="utf-8") as f:
+        rows = json.load(f)["rows"]
+    for row in rows:
+        row['dates'] = {
+            name: datetime.fromisoformat(value) if value else None
+            for name, value in row['dates'].items()
+        }
+    return rows
@@ -1,12 +1,20 @@
-from typing import Any, Dict, List, Optional
+from typing import Any, AsyncIterator, Dict, Iterator, List, Optional, Tuple
+import asyncio
+import hashlib
 import os
+import time
 from datetime import date
-from fastapi import Depends
+from fastapi import Request
+from pydantic import ValidationError
 
-from app.repositories.blog import get_blog_repository
-from app.models.blog import Blog, get_blog_model
+from app.models.blog import Blog, AsyncBlog
 from app.models.dates import DatesModel
 from app.enums.enums import BlogState
+from app.utils.pagination import encode_cursor, decode_cursor, encode_search_cursor, decode_search_cursor
+from app.utils.markdown import MarkdownRenderer
+from app.utils.render_cache import RenderCache, RenderKey, get_render_cache
+from app.utils.manifest import ManifestEntry, export_header, export_lines
+from app.utils.metrics import timed
 
 from app.contracts.blog import (
     GetBlogResponse,
@@ -19,56 +27,130 @@ from app.contracts.blog import (
 )
 
 class BlogService:
-    def __init__(self, model: Blog = Depends(get_blog_model)):
+    """The scripts' side of the service; the app serves everything else through AsyncBlogService."""
+
+    def __init__(self, model: Blog):
+        self.model = model
+
+    def export(self, fmt: str, state: Optional[BlogState] = None, batch_size: int = 1000) -> Iterator[bytes]:
+        # Rows go straight from the cursor batch to bytes, nothing is accumulated.
+        header = export_header(fmt)
+        if header:
+            yield header
+        for rows in self.model.iter_all(state=state, batch_size=batch_size, validate=False):
+            yield export_lines(rows, fmt)
+
+
+class AsyncBlogService:
+    def __init__(self, model: AsyncBlog, render_cache: Optional[RenderCache] = None):
         self.model = model
+        self.render_cache = render_cache or get_render_cache()
 
-    def get_one(self, year: str, month: str, day: str, slug: str) -> Dict[str, Any]:
-        blog_schema = self.model.find_by_permalink(year, month, day, slug)
+    async def get_one(self, year: str, month: str, day: str, slug: str) -> Dict[str, Any]:
+        blog_schema = await self.model.find_by_permalink(year, month, day, slug)
         if not blog_schema:
             return {"status": "error", "message": "Blog not found"}
 
-        file_path = blog_schema.content_file
+        # File stat/read/render run off the event loop thread.
         try:
-            if not os.path.exists(file_path):
-                return {
-                    "status": "error",
-                    "message": f"Source file missing: {blog_schema.content_file}",
-                }
-            
-            with open(file_path, "r", encoding="utf-8") as f:
-                content = f.read()
-                
+            key = await asyncio.to_thread(self.render_cache.key_for, blog_schema.content_file)
+            render = self.render_cache.get(key)
+            if render is None:
+                stored = await self.model.find_render(blog_schema.id)
+                render, changed = await asyncio.to_thread(self._resolve_render, key, stored)
+                if changed:
+                    await self.model.save_render(blog_schema.id, render)
+        except Exception as e:
+            return self._content_error(blog_schema, e)
+
+        return self._content_result(blog_schema, render)
+
+    def _resolve_render(self, key: RenderKey, stored: Optional[Dict[str, Any]]) -> Tuple[Dict[str, Any], bool]:
+        # The stored artifact is trusted as long as the source file looks untouched.
+        if stored and (stored["source_size"], stored["source_mtime_ns"]) == key[1:]:
+            self.render_cache.put(key, stored)
+            return stored, False
+
+        return self._render_artifact(key[0], stored), True
+
+    def _render_artifact(self, file_path: str, stored: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+        with timed("file", "read"), open(file_path, "rb") as f:
+            raw = f.read()
+            st = os.fstat(f.fileno())
+
+        content_hash = hashlib.sha256(raw).hexdigest()
+        if stored and stored["content_hash"] == content_hash:
+            render = {key: stored[key] for key in ("html", "reading_time", "word_count")}
+        else:
+            render = MarkdownRenderer.render(raw.decode("utf-8"))
+
+        artifact = {
+            **render,
+            "content_hash": content_hash,
+            "source_size": st.st_size,
+            "source_mtime_ns": st.st_mtime_ns,
+        }
+        self.render_cache.put((os.path.abspath(file_path), st.st_size, st.st_mtime_ns), artifact)
+        return artifact
+
+    def _content_result(self, blog_schema: Blog.Schema, render: Dict[str, Any]) -> Dict[str, Any]:
+        return {
+            "status": "success",
+            "blog": blog_schema,
+            "render": render,
+            "message": "Source content loaded successfully",
+        }
+
+    def _content_error(self, blog_schema: Blog.Schema, error: Exception) -> Dict[str, Any]:
+        if isinstance(error, FileNotFoundError):
             return {
-                "status": "success",
-                "blog": blog_schema,
-                "content": content,
-                "message": "Source content loaded successfully",
+                "status": "error",
+                "message": f"Source file missing: {blog_schema.content_file}",
             }
-        except Exception as e:
-            return {"status": "error", "message": f"Filesystem Error: {str(e)}"}
+        return {"status": "error", "message": f"Filesystem Error: {str(error)}"}
 
-    def get_by_id(self, blog_id: str) -> Dict[str, Any]:
-        blog = self.model.find_by_id(blog_id)
+    async def get_by_id(self, blog_id: str, validate: bool = True) -> Dict[str, Any]:
+        blog = await self.model.find_by_id(blog_id, validate=validate)
         return {
             "status": "success" if blog else "error",
             "blog": blog,
             "message": "Blog found" if blog else "Blog not found",
         }
 
-    def get_all(self) -> Dict[str, Any]:
-        blogs = self.model.get_all()
+    async def get_all(self) -> Dict[str, Any]:
+        blogs = await self.model.get_all()
         return {
             "status": "success",
             "blogs": blogs,
             "message": f"Successfully retrieved {len(blogs)} blogs",
         }
 
-    def get_page(self, page: int, limit: int, state: Optional[BlogState] = None) -> Dict[str, Any]:
-        data = self.model.get_page(page, limit, state=state)
+    async def export(self, fmt: str, state: Optional[BlogState] = None, batch_size: int = 1000) -> AsyncIterator[bytes]:
+        header = export_header(fmt)
+        if header:
+            yield header
+        async for rows in self.model.iter_all(state=state, batch_size=batch_size, validate=False):
+            yield export_lines(rows, fmt)
+
+    async def get_page(
+        self, page: int, limit: int, state: Optional[BlogState] = None,
+        cursor: Optional[str] = None, include_total: bool = False, validate: bool = True,
+    ) -> Dict[str, Any]:
+        if cursor is not None:
+            position = decode_cursor(cursor) if cursor else None
+            # One extra row tells whether another page exists in the walking direction.
+            data = await self.model.get_keyset_page(limit + 1, state=state, cursor=position, validate=validate)
+            total_count = await self.model.count(state=state) if include_total else None
+            return self._cursor_page_result(limit, position, data.get("blogs", []), total_count)
 
+        data = await self.model.get_page(page, limit, state=state, validate=validate)
+        return self._offset_page_result(page, limit, data)
+
+    def _offset_page_result(self, page: int, limit: int, data: Dict[str, Any]) -> Dict[str, Any]:
         blogs = data.get("blogs", [])
         total_count = data.get("total_count", 0)
         total_pages = (total_count + limit - 1) // limit if total_count > 0 else 0
+        has_next = page < total_pages
         
         return {
             "status": "success",
@@ -77,14 +159,175 @@ class BlogService:
             "page": page,
             "limit": limit,
             "total_pages": total_pages,
-            "has_next": page < total_pages,
+            "has_next": has_next,
             "has_previous": page > 1,
+            # Lets clients (and crawlers) continue with keyset pages from here.
+            "next_cursor": self._cursor_for(blogs[-1]) if has_next and blogs else None,
+            "prev_cursor": None,
             "message": "Successfully retrieved paged blogs",
         }
 
-    def register(self, request: RegisterBlogRequest) -> Dict[str, Any]:
-        file_metadata = self._extract_file_metadata(request.content_file)
-        
+    def _cursor_page_result(
+        self, limit: int, position: Optional[Dict[str, Any]],
+        blogs: List[Blog.Schema], total_count: Optional[int],
+    ) -> Dict[str, Any]:
+        before = bool(position and position["before"])
+        has_more = len(blogs) > limit
+        if has_more:
+            blogs = blogs[1:] if before else blogs[:limit]
+
+        has_next = True if before else has_more
+        has_previous = has_more if before else position is not None
+        total_pages = (total_count + limit - 1) // limit if total_count else None
+
+        return {
+            "status": "success",
+            "blogs": blogs,
+            "total_count": total_count,
+            "page": None,
+            "limit": limit,
+            "total_pages": total_pages,
+            "has_next": has_next and bool(blogs),
+            "has_previous": has_previous and bool(blogs),
+            "next_cursor": self._cursor_for(blogs[-1]) if has_next and blogs else None,
+            "prev_cursor": self._cursor_for(blogs[0], before=True) if has_previous and blogs else None,
+            "message": "Successfully retrieved paged blogs",
+        }
+
+    def _cursor_for(self, blog: Any, before: bool = False) -> str:
+        # Either a Blog.Schema or, with validate=False, the repository row.
+        if isinstance(blog, dict):
+            dates = blog['dates']
+            return encode_cursor(dates['published_at'], dates['created_at'], blog['id'], before=before)
+        return encode_cursor(blog.dates.published_at, blog.dates.created_at, blog.id, before=before)
+
+    async def browse(
+        self, limit: int, state: Optional[BlogState] = None, cursor: Optional[str] = None,
+        category: Optional[str] = None, keyword: Optional[str] = None, validate: bool = True,
+    ) -> Dict[str, Any]:
+        position = decode_cursor(cursor) if cursor else None
+        data = await self.model.get_keyset_page(
+            limit + 1, state=state, cursor=position, validate=validate, category=category, keyword=keyword,
+        )
+        return self._cursor_page_result(limit, position, data.get("blogs", []), None)
+
+    async def facets(self, limit: int = 100) -> Dict[str, Any]:
+        return self._facets_result(await self.model.facets(limit=limit))
+
+    def _facets_result(self, rows: List[Dict[str, Any]]) -> Dict[str, Any]:
+        facets: Dict[str, List[Dict[str, Any]]] = {"category": [], "keyword": []}
+        for row in rows:
+            facets[row["kind"]].append({"name": row["name"], "count": row["post_count"]})
+        return {
+            "status": "success",
+            "categories": facets["category"],
+            "keywords": facets["keyword"],
+            "message": f"Retrieved {len(facets['category'])} categories and {len(facets['keyword'])} keywords",
+        }
+
+    async def search(self, query: str, limit: int, state: Optional[BlogState] = None, cursor: Optional[str] = None) -> Dict[str, Any]:
+        position = decode_search_cursor(cursor) if cursor else None
+        hits = await self.model.search(query, limit + 1, state=state, cursor=position)
+        return self._search_result(query, limit, hits)
+
+    def _search_result(self, query: str, limit: int, hits: List[Dict[str, Any]]) -> Dict[str, Any]:
+        has_next = len(hits) > limit
+        hits = hits[:limit]
+        return {
+            "status": "success",
+            "query": query,
+            "hits": hits,
+            "limit": limit,
+            "has_next": has_next,
+            "next_cursor": encode_search_cursor(hits[-1]["rank"], hits[-1]["blog"].id) if has_next else None,
+            "message": f"Found {len(hits)} matching blogs" + (" (more available)" if has_next else ""),
+        }
+
+    async def register(self, request: RegisterBlogRequest) -> Dict[str, Any]:
+        file_metadata = await asyncio.to_thread(self._extract_file_metadata, request.content_file)
+        render = await asyncio.to_thread(self._render_artifact, request.content_file)
+        blog_data = self._register_schema(request, file_metadata, self._render_stats(render))
+        body = await asyncio.to_thread(self._read_body, request.content_file)
+
+        await self.model.save(blog_data)
+        await self.model.save_render(blog_data.id, render)
+        await self.model.save_search_body(blog_data.id, body)
+        return self._register_result(blog_data)
+
+    async def register_many(self, entries: List[ManifestEntry]) -> Dict[str, Any]:
+        started = time.perf_counter()
+        prepared, failures = await asyncio.to_thread(self._prepare_bulk, entries)
+        summary = await self.model.save_many([blog for _, blog in prepared])
+        await self.model.save_search_bodies(await asyncio.to_thread(self._inserted_bodies, prepared, summary))
+        return self._bulk_result(prepared, failures, summary, time.perf_counter() - started)
+
+    def _inserted_bodies(self, prepared: List[Tuple[int, Blog.Schema]], summary: Dict[str, Any]) -> Dict[str, str]:
+        bodies = {}
+        for (_, blog), result in zip(prepared, summary["results"]):
+            if result["status"] == "inserted":
+                try:
+                    bodies[blog.id] = self._read_body(blog.content_file)
+                except OSError:
+                    continue
+        return bodies
+
+    def _read_body(self, file_path: str) -> str:
+        # Indexed for search (see fn_blog_document), markdown syntax is dropped by the parser.
+        with open(file_path, "r", encoding="utf-8", errors="replace") as f:
+            return MarkdownRenderer.strip_metadata(f.read())
+
+    def _prepare_bulk(self, entries: List[ManifestEntry]) -> Tuple[List[Tuple[int, Blog.Schema]], List[Dict[str, Any]]]:
+        # Rendering is left to the first view, see get_one; bulk loads only write metadata.
+        prepared, failures = [], []
+        for line, row, error in entries:
+            if error:
+                failures.append({"line": line, "id": None, "status": "error", "message": error})
+                continue
+            try:
+                row = dict(row)
+                blog_id = row.pop("id", None)
+                request = RegisterBlogRequest(**row)
+                file_metadata = self._extract_file_metadata(request.content_file)
+                if blog_id:
+                    file_metadata["id"] = str(blog_id)
+                stats = self._file_stats(request.content_file)
+                prepared.append((line, self._register_schema(request, file_metadata, stats)))
+            except (ValidationError, ValueError, OSError) as e:
+                failures.append({"line": line, "id": None, "status": "error", "message": str(e)})
+        return prepared, failures
+
+    def _bulk_result(
+        self, prepared: List[Tuple[int, Blog.Schema]], failures: List[Dict[str, Any]],
+        summary: Dict[str, Any], elapsed: float,
+    ) -> Dict[str, Any]:
+        results = failures + [
+            {"line": line, **result}
+            for (line, _), result in zip(prepared, summary["results"])
+        ]
+        results.sort(key=lambda result: result["line"])
+        failed = summary["failed"] + len(failures)
+
+        return {
+            "status": "success" if failed == 0 else "partial",
+            "message": f"{summary['inserted']} inserted, {summary['duplicates']} duplicates, {failed} failed",
+            "inserted": summary["inserted"],
+            "duplicates": summary["duplicates"],
+            "failed": failed,
+            "elapsed": elapsed,
+            "rows_per_second": len(results) / elapsed if elapsed > 0 else 0.0,
+            "results": results,
+        }
+
+    def _file_stats(self, file_path: str) -> Dict[str, int]:
+        with open(file_path, "rb") as f:
+            raw = f.read()
+        return {**MarkdownRenderer.content_stats(raw.decode("utf-8", errors="replace")), "content_size": len(raw)}
+
+    def _render_stats(self, render: Dict[str, Any]) -> Dict[str, int]:
+        # The render artifact already counted the same source, no second read needed.
+        return {"word_count": render["word_count"], "reading_time": render["reading_time"], "content_size": render["source_size"]}
+
+    def _register_schema(self, request: RegisterBlogRequest, file_metadata: Dict[str, Any], stats: Dict[str, int]) -> Blog.Schema:
         dates = DatesModel(
             created_at=date.fromtimestamp(file_metadata['created_at_ts']),
             published_at=request.published_at,
@@ -100,21 +343,34 @@ class BlogService:
             content_file=request.content_file,
             references=request.references,
             state=request.state,
+            **stats,
         )
-        
-        self.model.save(blog_data)
+        return blog_data
+
+    def _register_result(self, blog_data: Blog.Schema) -> Dict[str, Any]:
         return {
             "status": "success",
             "id": blog_data.id,
             "message": f"Blog '{blog_data.title}' registered successfully",
         }
 
-    def update_blog(self, blog_id: str, request: UpdateBlogRequest) -> Dict[str, Any]:
-        existing = self.model.find_by_id(blog_id)
+    async def update_blog(self, blog_id: str, request: UpdateBlogRequest) -> Dict[str, Any]:
+        existing = await self.model.find_by_id(blog_id)
         if not existing:
             return {"status": "error", "message": "Cannot update: Blog not found"}
 
-        updated_data = self.model.Schema(
+        stored = await self.model.find_render(blog_id)
+        render = await asyncio.to_thread(self._render_artifact, request.content_file, stored)
+        updated_data = self._update_schema(blog_id, existing, request, self._render_stats(render))
+        body = await asyncio.to_thread(self._read_body, request.content_file)
+
+        await self.model.update(blog_id, updated_data)
+        await self.model.save_render(blog_id, render)
+        await self.model.save_search_body(blog_id, body)
+        return {"status": "success", "message": "Blog updated successfully"}
+
+    def _update_schema(self, blog_id: str, existing: Blog.Schema, request: UpdateBlogRequest, stats: Dict[str, int]) -> Blog.Schema:
+        return self.model.Schema(
             id=blog_id,
             title=request.title,
             category=request.category,
@@ -127,16 +383,14 @@ class BlogService:
             content_file=request.content_file,
             references=request.references,
             state=request.state,
+            **stats,
         )
 
-        self.model.update(blog_id, updated_data)
-        return {"status": "success", "message": "Blog updated successfully"}
-
-    def delete(self, blog_id: str) -> Dict[str, Any]:
-        if not self.model.find_by_id(blog_id):
+    async def delete(self, blog_id: str) -> Dict[str, Any]:
+        if not await self.model.find_by_id(blog_id):
             return {"status": "error", "message": "Delete failed: Blog not found"}
-            
-        self.model.repository.delete(blog_id)
+
+        await self.model.repository.delete(blog_id)
         return {"status": "success", "message": f"Blog {blog_id} deleted successfully"}
 
     def _extract_file_metadata(self, content_path: str) -> Dict[str, Any]:
@@ -154,5 +408,5 @@ class BlogService:
         }
 
 
-def get_blog_service(service: BlogService = Depends(BlogService)) -> BlogService:
-    return service
+async def get_blog_service(request: Request) -> AsyncBlogService:
+    return request.app.state.container.blog_service
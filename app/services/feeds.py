@@ -0,0 +1,155 @@
+import asyncio
+from datetime import datetime, timezone
+from typing import Any, Dict, List, Optional, Tuple
+
+from fastapi import Request
+
+from app.config import get_settings
+from app.enums.enums import BlogState
+from app.models.blog import AsyncBlog
+from app.utils.feeds import (
+    FEED_MEDIA_TYPES,
+    FeedCache,
+    ShardEntry,
+    atom_document,
+    atom_entry,
+    get_feed_cache,
+    rss_document,
+    rss_item,
+    sitemap_index,
+    sitemap_shards,
+    sitemap_urlset,
+)
+from app.utils.http_cache import make_etag, make_validator
+from app.utils.lru import BoundedLRU
+from app.utils.metrics import timed
+
+
+EPOCH = datetime(1970, 1, 1, tzinfo=timezone.utc)
+
+FEEDS = {"rss": (rss_item, rss_document), "atom": (atom_entry, atom_document)}
+
+# Base URLs come from the Host header, so rendered entries are kept for the most recent few only.
+MAX_ENTRY_SETS = 8
+
+
+class FeedService:
+    """
+    RSS/Atom feeds of the newest posts and a sitemap index with one shard
+    per publication month, served from FeedCache. After a write only the
+    fingerprint of a requested document is re-read (the newest ids and
+    versions, or the per-month counts); the document is rebuilt only when it
+    changed, and feed entries that did not change are reused as they are.
+    """
+
+    def __init__(self, model: AsyncBlog, cache: Optional[FeedCache] = None):
+        settings = get_settings()
+        self.model = model
+        self.cache = cache or get_feed_cache()
+        self.title = settings.BLOGGER_SITE_TITLE
+        self.feed_size = settings.BLOGGER_FEED_SIZE
+        self.shard_size = settings.BLOGGER_SITEMAP_SHARD_SIZE
+        # Rendered feed entries per (kind, base URL), by (id, last_update), for the posts still listed.
+        self._entries: BoundedLRU[Dict[Tuple[str, datetime], str]] = BoundedLRU(max_entries=MAX_ENTRY_SETS)
+        # One rebuild at a time; requests that waited find the document already current.
+        self._lock = asyncio.Lock()
+
+    async def feed(self, kind: str, base_url: str) -> Dict[str, Any]:
+        key = (base_url, kind)
+        doc = self.cache.current(key)
+        if doc:
+            return doc
+
+        async with self._lock:
+            doc = self.cache.current(key)
+            if doc:
+                return doc
+
+            page = await self.model.get_keyset_page(self.feed_size, state=BlogState.PUBLISHED, validate=False)
+            rows = page["blogs"]
+            fingerprint = tuple((row["id"], row["dates"]["last_update"]) for row in rows)
+            doc = self.cache.stale(key)
+            if doc and doc["fingerprint"] == fingerprint:
+                return self.cache.confirm(doc)
+
+            with timed("feed", kind):
+                body = self._feed_body(kind, base_url, rows)
+            updated = max((last_update for _, last_update in fingerprint), default=EPOCH)
+            validator = make_validator(make_etag(kind, base_url, *fingerprint), updated)
+            return self.cache.put(key, body, FEED_MEDIA_TYPES[kind], fingerprint, validator)
+
+    async def sitemap_index(self, base_url: str) -> Dict[str, Any]:
+        key = (base_url, "sitemap")
+        doc = self.cache.current(key)
+        if doc:
+            return doc
+
+        async with self._lock:
+            doc = self.cache.current(key)
+            if doc:
+                return doc
+
+            shards = await self._shards()
+            fingerprint = tuple(shards)
+            doc = self.cache.stale(key)
+            if doc and doc["fingerprint"] == fingerprint:
+                return self.cache.confirm(doc)
+
+            with timed("feed", "sitemap"):
+                body = sitemap_index(base_url, shards)
+            updated = max((shard[4] for shard in shards), default=EPOCH)
+            validator = make_validator(make_etag("sitemap", base_url, *fingerprint), updated)
+            return self.cache.put(key, body, FEED_MEDIA_TYPES["sitemap"], fingerprint, validator)
+
+    async def sitemap_shard(self, base_url: str, name: str) -> Optional[Dict[str, Any]]:
+        key = (base_url, "sitemap", name)
+        doc = self.cache.current(key)
+        if doc:
+            return doc
+
+        async with self._lock:
+            doc = self.cache.current(key)
+            if doc:
+                return doc
+
+            shard = next((entry for entry in await self._shards() if entry[0] == name), None)
+            if shard is None:
+                return None
+            doc = self.cache.stale(key)
+            if doc and doc["fingerprint"] == shard:
+                return self.cache.confirm(doc)
+
+            _, month, part, _, last_update = shard
+            rows = await self.model.sitemap_entries(month, self.shard_size, (part - 1) * self.shard_size)
+            with timed("feed", "sitemap_shard"):
+                body = sitemap_urlset(base_url, rows)
+            validator = make_validator(make_etag("sitemap", base_url, *shard), last_update)
+            return self.cache.put(key, body, FEED_MEDIA_TYPES["sitemap"], shard, validator)
+
+    async def _shards(self) -> List[ShardEntry]:
+        # The per-month summary every sitemap document is checked against, itself cached per generation.
+        key = ("sitemap_shards", )
+        doc = self.cache.current(key)
+        if doc:
+            return doc["fingerprint"]
+        shards = sitemap_shards(await self.model.sitemap_shards(), self.shard_size)
+        return self.cache.put(key, b"", "", shards, None)["fingerprint"]
+
+    def _feed_body(self, kind: str, base_url: str, rows: List[Dict[str, Any]]) -> bytes:
+        render_entry, render_document = FEEDS[kind]
+        previous = self._entries.pop((kind, base_url)) or {}
+        entries, keep = [], {}
+        for row in rows:
+            entry_key = (row["id"], row["dates"]["last_update"])
+            entry = previous.get(entry_key) or render_entry(base_url, row)
+            keep[entry_key] = entry
+            entries.append(entry)
+
+        # Entries of posts no longer listed (or since updated) are dropped with `previous`.
+        self._entries.put((kind, base_url), keep)
+        updated = max((row["dates"]["last_update"] for row in rows), default=EPOCH)
+        return render_document(base_url, self.title, entries, updated)
+
+
+async def get_feed_service(request: Request) -> FeedService:
+    return request.app.state.container.feed_service
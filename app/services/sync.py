@@ -0,0 +1,248 @@
+import hashlib
+import json
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date, datetime, timezone
+from typing import Any, Dict, List, Optional, Tuple
+
+from pydantic import ValidationError
+
+from app.models.blog import Blog
+from app.models.dates import DatesModel
+from app.enums.enums import BlogState
+from app.utils.markdown import MarkdownRenderer
+
+
+FileStat = Tuple[int, int]
+
+
+class ContentSyncService:
+    """
+    Mirrors a directory of markdown posts into the blogs table.
+
+    A manifest remembers path -> (size, mtime_ns, sha256, id) from the last
+    run, so unchanged files cost one stat() each and are never read. Only
+    new or touched files are read and hashed (in a thread pool), and the
+    resulting adds, updates and retirements are written in batches.
+    """
+
+    def __init__(self, model: Blog, content_dir: str, manifest_path: str, workers: int = 8, batch_size: int = 1000):
+        self.model = model
+        self.content_dir = content_dir
+        self.manifest_path = manifest_path
+        self.workers = workers
+        self.batch_size = batch_size
+
+    def run(self, dry_run: bool = False) -> Dict[str, Any]:
+        started = time.perf_counter()
+
+        with ThreadPoolExecutor(max_workers=self.workers) as pool:
+            loading = pool.submit(self._load_manifest)
+            files = self._scan(pool)
+            manifest = loading.result()
+            candidates = [
+                path for path, stat in files.items()
+                if path not in manifest or (manifest[path]["size"], manifest[path]["mtime_ns"]) != stat
+            ]
+            inspected = dict(zip(candidates, pool.map(self._inspect, candidates)))
+
+        removed = [path for path in manifest if path not in files]
+        new_blogs: List[Tuple[str, Blog.Schema]] = []
+        changed_blogs: List[Tuple[str, Blog.Schema]] = []
+        touched: Dict[str, Dict[str, Any]] = {}
+        errors: List[Dict[str, str]] = []
+
+        # Files missing from the manifest may still be registered (first sync, lost manifest).
+        known_ids = {path: entry["id"] for path, entry in manifest.items()}
+        known_ids.update(self.model.find_ids_by_content_files(
+            [path for path in candidates if path not in manifest and inspected[path] is not None]
+        ))
+        used_ids = set(known_ids.values())
+
+        for path in candidates:
+            info = inspected[path]
+            if info is None:
+                continue
+            entry = manifest.get(path)
+            if entry and entry["hash"] == info["hash"]:
+                # Only the stat changed (touch, checkout, copy): nothing to write.
+                touched[path] = {**entry, "size": info["size"], "mtime_ns": info["mtime_ns"]}
+                continue
+            try:
+                blog = self._build_schema(path, info, known_ids.get(path), used_ids)
+            except (ValidationError, ValueError) as e:
+                errors.append({"path": path, "message": str(e)})
+                continue
+            (changed_blogs if path in known_ids else new_blogs).append((path, blog))
+
+        summary = {
+            "scanned": len(files),
+            "unchanged": len(files) - len(candidates),
+            "touched": len(touched),
+            "added": len(new_blogs),
+            "updated": len(changed_blogs),
+            "retired": len(removed),
+            "failed": len(errors),
+            "errors": errors,
+            "dry_run": dry_run,
+        }
+        if dry_run or not (new_blogs or changed_blogs or removed or touched):
+            summary["elapsed"] = time.perf_counter() - started
+            return summary
+
+        added = self._write_new(new_blogs, errors)
+        updated = set(self.model.update_many([blog for _, blog in changed_blogs], batch_size=self.batch_size))
+        # Rows deleted since the last sync match no update: their files are registered again.
+        added += self._write_new([(path, blog) for path, blog in changed_blogs if blog.id not in updated], errors)
+        self.model.retire_many([manifest[path]["id"] for path in removed])
+
+        for path in removed:
+            del manifest[path]
+        manifest.update(touched)
+        written = added + [(path, blog) for path, blog in changed_blogs if blog.id in updated]
+        self.model.save_search_bodies({blog.id: inspected[path]["body"] for path, blog in written}, batch_size=self.batch_size)
+        for path, blog in written:
+            info = inspected[path]
+            manifest[path] = {"size": info["size"], "mtime_ns": info["mtime_ns"], "hash": info["hash"], "id": blog.id}
+        self._save_manifest(manifest)
+
+        summary.update({
+            "added": len(added),
+            "updated": len(updated),
+            "failed": len(errors),
+            "elapsed": time.perf_counter() - started,
+        })
+        return summary
+
+    def _write_new(self, new_blogs: List[Tuple[str, Blog.Schema]], errors: List[Dict[str, str]]) -> List[Tuple[str, Blog.Schema]]:
+        result = self.model.save_many([blog for _, blog in new_blogs], batch_size=self.batch_size)
+        added = []
+        for (path, blog), row in zip(new_blogs, result["results"]):
+            if row["status"] == "inserted":
+                added.append((path, blog))
+            else:
+                errors.append({"path": path, "message": row["message"]})
+        return added
+
+    def _scan(self, pool: ThreadPoolExecutor) -> Dict[str, FileStat]:
+        entries = []
+        pending = [self.content_dir]
+        while pending:
+            with os.scandir(pending.pop()) as it:
+                for entry in it:
+                    if entry.name.startswith("."):
+                        continue
+                    if entry.is_dir(follow_symlinks=False):
+                        pending.append(entry.path)
+                    elif entry.name.endswith(".md") and entry.is_file():
+                        entries.append(entry)
+
+        # stat() releases the GIL, so chunks of entries are stat'ed concurrently.
+        chunk_size = max(1, len(entries) // (self.workers * 4) + 1)
+        chunks = [entries[i:i + chunk_size] for i in range(0, len(entries), chunk_size)]
+        files = {}
+        for chunk in pool.map(self._stat_chunk, chunks):
+            files.update(chunk)
+        return files
+
+    @staticmethod
+    def _stat_chunk(entries: List[os.DirEntry]) -> Dict[str, FileStat]:
+        stats = {}
+        for entry in entries:
+            try:
+                st = entry.stat()
+            except OSError:
+                continue
+            stats[entry.path] = (st.st_size, st.st_mtime_ns)
+        return stats
+
+    @staticmethod
+    def _inspect(path: str) -> Optional[Dict[str, Any]]:
+        try:
+            with open(path, "rb") as f:
+                raw = f.read()
+                st = os.fstat(f.fileno())
+        except OSError:
+            return None
+
+        text = raw.decode("utf-8", errors="replace")
+        return {
+            **MarkdownRenderer.content_stats(text),
+            "hash": hashlib.sha256(raw).hexdigest(),
+            "size": st.st_size,
+            "mtime_ns": st.st_mtime_ns,
+            "ctime_ns": st.st_ctime_ns,
+            "body": MarkdownRenderer.strip_metadata(text),
+            "meta": parse_front_matter(text),
+            "heading": next((line[2:].strip() for line in text.splitlines() if line.startswith("# ")), None),
+        }
+
+    def _build_schema(self, path: str, info: Dict[str, Any], known_id: Optional[str], used_ids: set) -> Blog.Schema:
+        meta = info["meta"]
+        published_at = meta.get("published_at")
+
+        blog_id = known_id or meta.get("id")
+        if not blog_id:
+            # Same microsecond-ctime scheme as AsyncBlogService._extract_file_metadata; files
+            # written within one timestamp tick share a ctime, so step past taken ids.
+            ctime_us = info["ctime_ns"] // 1000
+            while str(ctime_us) in used_ids:
+                ctime_us += 1
+            blog_id = str(ctime_us)
+        used_ids.add(blog_id)
+
+        return self.model.Schema(
+            id=blog_id,
+            title=meta.get("title") or info["heading"] or _title_from_path(path),
+            category=meta.get("category") or "Uncategorized",
+            keywords=_split_list(meta.get("keywords")),
+            dates=DatesModel(
+                created_at=datetime.fromtimestamp(info["ctime_ns"] / 1e9, tz=timezone.utc),
+                published_at=date.fromisoformat(published_at) if published_at else None,
+                last_update=datetime.fromtimestamp(info["mtime_ns"] / 1e9, tz=timezone.utc),
+            ),
+            content_file=path,
+            references=_split_list(meta.get("references")),
+            state=BlogState(meta.get("state", BlogState.PUBLISHED.value)),
+            word_count=info["word_count"],
+            reading_time=info["reading_time"],
+            content_size=info["size"],
+        )
+
+    def _load_manifest(self) -> Dict[str, Dict[str, Any]]:
+        try:
+            with open(self.manifest_path, "r", encoding="utf-8") as f:
+                return json.load(f)
+        except FileNotFoundError:
+            return {}
+
+    def _save_manifest(self, manifest: Dict[str, Dict[str, Any]]) -> None:
+        os.makedirs(os.path.dirname(self.manifest_path) or ".", exist_ok=True)
+        tmp_path = f"{self.manifest_path}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(manifest, f, separators=(",", ":"))
+        os.replace(tmp_path, self.manifest_path)
+
+
+def parse_front_matter(text: str) -> Dict[str, str]:
+    # Same "---" delimited "key: value" block markdown2's metadata extra strips when rendering.
+    if not text.startswith("---"):
+        return {}
+
+    meta = {}
+    for line in text.splitlines()[1:]:
+        if line.strip() == "---":
+            return meta
+        key, sep, value = line.partition(":")
+        if sep:
+            meta[key.strip().lower()] = value.strip().strip("\"'")
+    return {}
+
+
+def _title_from_path(path: str) -> str:
+    return os.path.splitext(os.path.basename(path))[0].replace("_", " ").strip()
+
+
+def _split_list(value: Optional[str]) -> List[str]:
+    return [item.strip() for item in value.split(",") if item.strip()] if value else []
@@ -0,0 +1,103 @@
+import gzip
+from typing import Callable, Dict, Iterable, Optional
+
+from fastapi import Request, Response
+
+from app.config import get_settings
+from app.utils.metrics import timed
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+
+# Content-Encoding negotiation and the codecs behind it. gzip is always
+# there; br and zstd are offered when brotli / zstandard are installed.
+# Responses are compressed once, when they are cached or built, and the
+# stored variant picked per request: nothing here runs on a cache hit.
+# `best` is for files compressed at build time, where ratio beats speed.
+
+SUFFIXES = {"zstd": ".zst", "br": ".br", "gzip": ".gz"}
+
+
+def _gzip(data: bytes, best: bool) -> bytes:
+    # mtime=0 keeps the output (and anything hashed from it) reproducible.
+    return gzip.compress(data, compresslevel=9 if best else 6, mtime=0)
+
+
+def _brotli(data: bytes, best: bool) -> bytes:
+    return brotli.compress(data, quality=11 if best else 5)
+
+
+def _zstd(data: bytes, best: bool) -> bytes:
+    return zstandard.ZstdCompressor(level=19 if best else 6).compress(data)
+
+
+# In order of preference when a client accepts several equally.
+CODECS: Dict[str, Callable[[bytes, bool], bytes]] = {
+    **({"zstd": _zstd} if zstandard is not None else {}),
+    **({"br": _brotli} if brotli is not None else {}),
+    "gzip": _gzip,
+}
+
+
+def compress(data: bytes, encoding: str, best: bool = False) -> bytes:
+    with timed("compress", encoding):
+        return CODECS[encoding](data, best)
+
+
+def compress_variants(data: bytes, best: bool = False) -> Dict[str, bytes]:
+    # Every available encoding that saves at least a tenth; {} when compression is off or data is small.
+    settings = get_settings()
+    if not settings.BLOGGER_COMPRESSION or len(data) < settings.BLOGGER_COMPRESS_MIN_SIZE:
+        return {}
+    variants = {}
+    for encoding in CODECS:
+        encoded = compress(data, encoding, best)
+        if len(encoded) < len(data) * 0.9:
+            variants[encoding] = encoded
+    return variants
+
+
+def negotiate(accept_encoding: str, offered: Iterable[str]) -> Optional[str]:
+    # Highest q-value wins, ties go to CODECS order; "identity" (None) when nothing offered is acceptable.
+    accepted: Dict[str, float] = {}
+    for part in accept_encoding.lower().split(","):
+        name, _, params = part.strip().partition(";")
+        if not name:
+            continue
+        q = 1.0
+        key, _, value = params.strip().partition("=")
+        if key.strip() == "q":
+            try:
+                q = float(value)
+            except ValueError:
+                q = 0.0
+        accepted[name.strip()] = q
+
+    best, best_q = None, 0.0
+    for encoding in (e for e in CODECS if e in offered):
+        q = accepted.get(encoding, accepted.get("*", 0.0))
+        if q > best_q:
+            best, best_q = encoding, q
+    return best
+
+
+def encoded_response(
+    request: Request, body: bytes, variants: Dict[str, bytes], media_type: str, headers: Dict[str, str],
+) -> Response:
+    encoding = negotiate(request.headers.get("accept-encoding", ""), variants)
+    if encoding is None:
+        return Response(content=body, media_type=media_type, headers=headers)
+
+    # A strong ETag names one exact body; like nginx, the compressed variant carries the weak form.
+    headers = {**headers, "Content-Encoding": encoding}
+    if headers.get("ETag", "").startswith('"'):
+        headers["ETag"] = f"W/{headers['ETag']}"
+    return Response(content=variants[encoding], media_type=media_type, headers=headers)
@@ -0,0 +1,84 @@
+import json
+from datetime import datetime
+from typing import Any, Dict, Mapping, Optional
+
+from fastapi import Response
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+
+# JSON bodies for the listing and by-id endpoints, written straight from
+# repository rows: the driver already typed them, so Blog.Schema and the
+# response models are not built only to be dumped again. The bytes match
+# what FastAPI writes for GetPageBlogsResponse / GetBlogResponse (keys in
+# field order, UTC datetimes as "Z").
+
+
+def _default(value: Any) -> Any:
+    if isinstance(value, datetime):
+        iso = value.isoformat()
+        return f"{iso[:-6]}Z" if iso.endswith("+00:00") else iso
+    if hasattr(value, "value"):
+        return value.value
+    raise TypeError(f"Type is not JSON serializable: {type(value).__name__}")
+
+
+def dumps(payload: Any) -> bytes:
+    if orjson is not None:
+        return orjson.dumps(payload, option=orjson.OPT_UTC_Z)
+    return json.dumps(payload, default=_default, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+
+def blog_payload(row: Mapping[str, Any]) -> Dict[str, Any]:
+    # Rebuilt in Blog.Schema field order, which also drops extra columns (e.g. total_count).
+    dates = row['dates']
+    return {
+        "id": row['id'],
+        "title": row['title'],
+        "category": row['category'],
+        "keywords": row['keywords'],
+        "dates": {
+            "created_at": dates['created_at'],
+            "published_at": dates['published_at'],
+            "last_update": dates['last_update'],
+        },
+        "content_file": row['content_file'],
+        "references": row['references'],
+        "state": row['state'],
+        # Absent from snapshots written before the stats columns existed.
+        "word_count": row.get('word_count'),
+        "reading_time": row.get('reading_time'),
+        "content_size": row.get('content_size'),
+    }
+
+
+def page_payload(result: Mapping[str, Any]) -> Dict[str, Any]:
+    return {
+        "status": result["status"],
+        "message": result["message"],
+        "blogs": [blog_payload(row) for row in result["blogs"]],
+        "total_count": result.get("total_count"),
+        "page": result.get("page"),
+        "limit": result["limit"],
+        "total_pages": result.get("total_pages"),
+        "has_next": result["has_next"],
+        "has_previous": result["has_previous"],
+        "next_cursor": result.get("next_cursor"),
+        "prev_cursor": result.get("prev_cursor"),
+    }
+
+
+def blog_response_payload(result: Mapping[str, Any]) -> Dict[str, Any]:
+    blog = result.get("blog")
+    return {
+        "status": result["status"],
+        "message": result["message"],
+        "blog": blog_payload(blog) if blog else None,
+    }
+
+
+def json_response(payload: Any, headers: Optional[Mapping[str, str]] = None) -> Response:
+    return Response(content=dumps(payload), media_type="application/json", headers=headers)
@@ -0,0 +1,197 @@
+import re
+import time
+from datetime import datetime, timezone
+from email.utils import format_datetime
+from functools import lru_cache
+from typing import Any, Dict, Hashable, List, Optional, Tuple
+from xml.sax.saxutils import escape, quoteattr
+
+from app.config import get_settings
+from app.utils.compression import compress_variants
+from app.utils.invalidation import on_write
+from app.utils.lru import BoundedLRU
+from app.utils.metrics import register_cache
+from app.utils.slugify import permalink_key
+
+
+# RSS 2.0, Atom 1.0 and sitemaps.org documents, built from repository rows
+# with plain string joins. Sitemaps are sharded by publication month (the
+# "YYYY/MM" prefix of permalink_key) and split into numbered parts past
+# BLOGGER_SITEMAP_SHARD_SIZE URLs, so no request builds the whole sitemap.
+
+FEED_MEDIA_TYPES = {
+    "rss": "application/rss+xml; charset=utf-8",
+    "atom": "application/atom+xml; charset=utf-8",
+    "sitemap": "application/xml; charset=utf-8",
+}
+
+XML_HEADER = '<?xml version="1.0" encoding="UTF-8"?>\n'
+SITEMAP_NS = "http://www.sitemaps.org/schemas/sitemap/0.9"
+ATOM_NS = "http://www.w3.org/2005/Atom"
+
+_SHARD_NAME = re.compile(r"^(\d{4})-(\d{2})(?:-(\d+))?$")
+
+DocKey = Tuple[Hashable, ...]
+ShardEntry = Tuple[str, str, int, int, datetime]
+
+
+def post_url(base_url: str, row: Dict[str, Any]) -> str:
+    dates = row["dates"]
+    return f"{base_url}blogs/{permalink_key(dates['published_at'], dates['created_at'], row['title'])}"
+
+
+def _utc(value: datetime) -> datetime:
+    return value.astimezone(timezone.utc).replace(microsecond=0)
+
+
+def _rfc822(value: datetime) -> str:
+    return format_datetime(_utc(value), usegmt=True)
+
+
+def _rfc3339(value: datetime) -> str:
+    return _utc(value).isoformat().replace("+00:00", "Z")
+
+
+def rss_item(base_url: str, row: Dict[str, Any]) -> str:
+    url = escape(post_url(base_url, row))
+    dates = row["dates"]
+    categories = "".join(f"<category>{escape(term)}</category>" for term in [row["category"], *(row.get("keywords") or [])])
+    summary = f"{row['reading_time']} min read" if row.get("reading_time") else ""
+    return (
+        f"<item><title>{escape(row['title'])}</title><link>{url}</link>"
+        f'<guid isPermaLink="true">{url}</guid>'
+        f"<pubDate>{_rfc822(dates['published_at'] or dates['created_at'])}</pubDate>"
+        f"{categories}<description>{escape(summary)}</description></item>"
+    )
+
+
+def atom_entry(base_url: str, row: Dict[str, Any]) -> str:
+    url = post_url(base_url, row)
+    dates = row["dates"]
+    categories = "".join(f"<category term={quoteattr(term)}/>" for term in [row["category"], *(row.get("keywords") or [])])
+    summary = f"<summary>{row['reading_time']} min read</summary>" if row.get("reading_time") else ""
+    return (
+        f"<entry><title>{escape(row['title'])}</title><id>{escape(url)}</id>"
+        f"<link rel=\"alternate\" href={quoteattr(url)}/>"
+        f"<published>{_rfc3339(dates['published_at'] or dates['created_at'])}</published>"
+        f"<updated>{_rfc3339(dates['last_update'])}</updated>{categories}{summary}</entry>"
+    )
+
+
+def rss_document(base_url: str, title: str, items: List[str], updated: datetime) -> bytes:
+    return (
+        f'{XML_HEADER}<rss version="2.0" xmlns:atom="{ATOM_NS}"><channel>'
+        f"<title>{escape(title)}</title><link>{escape(base_url)}</link>"
+        f"<description>{escape(title)}</description><lastBuildDate>{_rfc822(updated)}</lastBuildDate>"
+        f'<atom:link href={quoteattr(base_url + "feed.xml")} rel="self" type="application/rss+xml"/>'
+        f"{''.join(items)}</channel></rss>\n"
+    ).encode("utf-8")
+
+
+def atom_document(base_url: str, title: str, entries: List[str], updated: datetime) -> bytes:
+    return (
+        f'{XML_HEADER}<feed xmlns="{ATOM_NS}">'
+        f"<title>{escape(title)}</title><id>{escape(base_url)}</id>"
+        f"<link rel=\"alternate\" href={quoteattr(base_url)}/>"
+        f'<link rel="self" href={quoteattr(base_url + "atom.xml")}/>'
+        f"<updated>{_rfc3339(updated)}</updated><author><name>{escape(title)}</name></author>"
+        f"{''.join(entries)}</feed>\n"
+    ).encode("utf-8")
+
+
+def sitemap_index(base_url: str, shards: List[ShardEntry]) -> bytes:
+    entries = "".join(
+        f"<sitemap><loc>{escape(f'{base_url}sitemap-{name}.xml')}</loc><lastmod>{_rfc3339(last_update)}</lastmod></sitemap>"
+        for name, _, _, _, last_update in shards
+    )
+    return f'{XML_HEADER}<sitemapindex xmlns="{SITEMAP_NS}">{entries}</sitemapindex>\n'.encode("utf-8")
+
+
+def sitemap_urlset(base_url: str, rows: List[Dict[str, Any]]) -> bytes:
+    entries = "".join(
+        f"<url><loc>{escape(base_url)}blogs/{escape(row['permalink_key'])}</loc><lastmod>{_rfc3339(row['last_update'])}</lastmod></url>"
+        for row in rows
+    )
+    return f'{XML_HEADER}<urlset xmlns="{SITEMAP_NS}">{entries}</urlset>\n'.encode("utf-8")
+
+
+def sitemap_shards(rows: List[Dict[str, Any]], shard_size: int) -> List[ShardEntry]:
+    # (name, month, part, urls, last_update) per document: "2024-05", then "2024-05-2", ... past shard_size.
+    shards = []
+    for row in rows:
+        month, count = row["shard"], row["post_count"]
+        parts = max(1, -(-count // shard_size))
+        for part in range(1, parts + 1):
+            name = month.replace("/", "-") + (f"-{part}" if part > 1 else "")
+            urls = min(shard_size, count - (part - 1) * shard_size)
+            shards.append((name, month, part, urls, row["last_update"]))
+    return shards
+
+
+def is_shard_name(name: str) -> bool:
+    return _SHARD_NAME.match(name) is not None
+
+
+class FeedCache:
+    """
+    Feed and sitemap documents as encoded bytes with their validator and the
+    fingerprint they were built from. An admin write does not drop them, it
+    bumps the generation: the next request re-reads the fingerprint (one
+    small query) and rebuilds the document only if its posts changed, when
+    its compressed copies are made too. Bounded by total bytes, least
+    recently used out first; rechecked after a TTL as well, for writes made
+    elsewhere.
+    """
+
+    def __init__(self, max_bytes: int, ttl: float):
+        self.ttl = ttl
+        self.generation = 0
+        self._docs: BoundedLRU[Dict[str, Any]] = BoundedLRU(max_bytes=max_bytes, sizeof=_doc_size)
+
+    def current(self, key: DocKey) -> Optional[Dict[str, Any]]:
+        # The document, if nothing was written since it was built or last confirmed.
+        return self._docs.get(key, valid=self._fresh)
+
+    def stale(self, key: DocKey) -> Optional[Dict[str, Any]]:
+        return self._docs.peek(key)
+
+    def confirm(self, doc: Dict[str, Any]) -> Dict[str, Any]:
+        # Its fingerprint still matches: keep the bytes, trust them until the next write.
+        with self._docs.lock:
+            doc["generation"] = self.generation
+            doc["checked_at"] = time.monotonic()
+        return doc
+
+    def put(self, key: DocKey, body: bytes, media_type: str, fingerprint: Any, validator: Optional[Dict[str, Any]]) -> Dict[str, Any]:
+        doc = {
+            "body": body, "media_type": media_type, "validator": validator, "fingerprint": fingerprint,
+            "encoded": compress_variants(body), "generation": self.generation, "checked_at": time.monotonic(),
+        }
+        self._docs.put(key, doc)
+        return doc
+
+    def mark_stale(self) -> None:
+        with self._docs.lock:
+            self.generation += 1
+
+    def clear(self) -> None:
+        self._docs.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        return self._docs.stats()
+
+    def _fresh(self, doc: Dict[str, Any]) -> bool:
+        return doc["generation"] == self.generation and doc["checked_at"] + self.ttl >= time.monotonic()
+
+
+def _doc_size(doc: Dict[str, Any]) -> int:
+    return len(doc["body"]) + sum(len(body) for body in doc["encoded"].values())
+
+
+@lru_cache()
+def get_feed_cache() -> FeedCache:
+    settings = get_settings()
+    cache = FeedCache(max_bytes=settings.BLOGGER_FEED_CACHE_BYTES, ttl=settings.BLOGGER_FEED_TTL)
+    on_write(cache.mark_stale)
+    register_cache("feed", cache.stats)
+    return cache
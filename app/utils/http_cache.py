@@ -0,0 +1,106 @@
+import hashlib
+import os
+from datetime import datetime, timezone
+from email.utils import format_datetime, parsedate_to_datetime
+from functools import lru_cache
+from typing import Any, Dict, Iterable, Optional, Tuple
+
+from fastapi import Request, Response
+
+from app.config import get_settings
+from app.utils.invalidation import on_write
+from app.utils.lru import BoundedLRU
+
+
+def make_etag(*parts: Any) -> str:
+    digest = hashlib.sha256("\x1f".join(str(part) for part in parts).encode("utf-8")).hexdigest()
+    return f'"{digest[:32]}"'
+
+
+def make_validator(
+    etag: str, last_modified: datetime, source: Optional[Tuple[str, int, int]] = None,
+) -> Dict[str, Any]:
+    return {
+        "etag": etag,
+        "last_modified": last_modified.astimezone(timezone.utc).replace(microsecond=0),
+        # (content_file, size, mtime_ns) the validator was computed from, if any.
+        "source": source,
+    }
+
+
+def source_stat(content_file: str) -> Optional[Tuple[str, int, int]]:
+    try:
+        st = os.stat(content_file)
+    except OSError:
+        return None
+    return (content_file, st.st_size, st.st_mtime_ns)
+
+
+def source_current(validator: Dict[str, Any]) -> bool:
+    # Posts also depend on their content file, which can change without an admin write.
+    source = validator["source"]
+    return not source or source_stat(source[0]) == source
+
+
+def is_not_modified(request: Request, validator: Dict[str, Any]) -> bool:
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match is not None:
+        # Weak comparison, as RFC 9110 asks for GET/HEAD.
+        tags = [tag.strip().removeprefix("W/") for tag in if_none_match.split(",")]
+        return "*" in tags or validator["etag"] in tags
+
+    if_modified_since = request.headers.get("if-modified-since")
+    if if_modified_since:
+        try:
+            since = parsedate_to_datetime(if_modified_since)
+        except (TypeError, ValueError):
+            return False
+        if since.tzinfo is None:
+            since = since.replace(tzinfo=timezone.utc)
+        return validator["last_modified"] <= since
+
+    return False
+
+
+def validator_headers(validator: Dict[str, Any]) -> Dict[str, str]:
+    return {
+        "ETag": validator["etag"],
+        "Last-Modified": format_datetime(validator["last_modified"], usegmt=True),
+        "Cache-Control": get_settings().BLOGGER_CACHE_CONTROL,
+        "Vary": "Accept, Accept-Encoding" if get_settings().BLOGGER_COMPRESSION else "Accept",
+    }
+
+
+def not_modified(validator: Dict[str, Any]) -> Response:
+    return Response(status_code=304, headers=validator_headers(validator))
+
+
+class ValidatorCache:
+    """
+    Last validators handed out per URL variant, so a revalidation can be
+    answered with a 304 without touching Postgres. Entries expire after a TTL
+    (writes made by other instances) and are dropped on every admin write.
+    """
+
+    def __init__(self, max_entries: int, ttl: float):
+        self._validators: BoundedLRU[Dict[str, Any]] = BoundedLRU(max_entries=max_entries, ttl=ttl)
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        return self._validators.get(key, valid=source_current)
+
+    def put(self, key: str, validator: Dict[str, Any]) -> None:
+        self._validators.put(key, validator)
+
+    def clear(self) -> None:
+        self._validators.clear()
+
+
+@lru_cache()
+def get_validator_cache() -> ValidatorCache:
+    settings = get_settings()
+    cache = ValidatorCache(
+        max_entries=settings.BLOGGER_VALIDATOR_CACHE_SIZE,
+        ttl=settings.BLOGGER_VALIDATOR_CACHE_TTL,
+    )
+    on_write(cache.clear)
+    return cache
@@ -0,0 +1,18 @@
+from typing import Callable, List
+
+
+# Caches derived from blog data register here and are dropped on every admin write.
+_listeners: List[Callable[[], None]] = []
+
+
+def on_write(listener: Callable[[], None]) -> Callable[[], None]:
+    _listeners.append(listener)
+    return listener
+
+
+def notify_write() -> None:
+    for listener in _listeners:
+        try:
+            listener()
+        except Exception as e:
+            print(f"Cache invalidation failed in {getattr(listener, '__name__', listener)}: {e}")
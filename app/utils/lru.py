@@ -0,0 +1,103 @@
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Generic, Hashable, Optional, Tuple, TypeVar
+
+V = TypeVar("V")
+
+
+class BoundedLRU(Generic[V]):
+    """
+    The least-recently-used store behind the app's caches, bounded by entry
+    count, total size (as `sizeof` measures a value) and a TTL, any of them
+    optional. `on_evict` sees every value that leaves other than by clear(),
+    for caches that keep an index next to it. `lock` is reentrant so a cache
+    can hold it around several calls.
+    """
+
+    def __init__(
+        self, max_entries: Optional[int] = None, max_bytes: Optional[int] = None, ttl: Optional[float] = None,
+        sizeof: Optional[Callable[[V], int]] = None, on_evict: Optional[Callable[[Hashable, V], None]] = None,
+    ):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self.sizeof = sizeof
+        self.on_evict = on_evict
+        self.hits = 0
+        self.misses = 0
+        self.lock = threading.RLock()
+        # key -> (expires_at, size, value)
+        self._entries: "OrderedDict[Hashable, Tuple[float, int, V]]" = OrderedDict()
+        self._bytes = 0
+
+    def get(self, key: Hashable, valid: Optional[Callable[[V], bool]] = None) -> Optional[V]:
+        # `valid` runs outside the lock (it may stat a file); a value it rejects counts as a miss.
+        with self.lock:
+            value = self._live(key)
+            if value is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+
+        if valid is not None and not valid(value):
+            with self.lock:
+                self.misses += 1
+            return None
+
+        with self.lock:
+            self.hits += 1
+        return value
+
+    def peek(self, key: Hashable) -> Optional[V]:
+        # Neither counted nor made recent.
+        with self.lock:
+            return self._live(key)
+
+    def put(self, key: Hashable, value: V) -> bool:
+        size = self.sizeof(value) if self.sizeof else 0
+        if (self.max_entries is not None and self.max_entries <= 0) or (self.max_bytes is not None and size > self.max_bytes):
+            self.pop(key)
+            return False
+
+        expires_at = time.monotonic() + self.ttl if self.ttl is not None else float("inf")
+        with self.lock:
+            self.pop(key)
+            self._entries[key] = (expires_at, size, value)
+            self._bytes += size
+            while (self.max_entries is not None and len(self._entries) > self.max_entries) or (
+                self.max_bytes is not None and self._bytes > self.max_bytes
+            ):
+                self.pop(next(iter(self._entries)))
+        return True
+
+    def pop(self, key: Hashable) -> Optional[V]:
+        with self.lock:
+            entry = self._entries.pop(key, None)
+            if entry is None:
+                return None
+            self._bytes -= entry[1]
+            if self.on_evict:
+                self.on_evict(key, entry[2])
+            return entry[2]
+
+    def clear(self) -> None:
+        with self.lock:
+            self._entries.clear()
+            self._bytes = 0
+
+    def stats(self) -> Dict[str, Any]:
+        with self.lock:
+            return {"entries": len(self._entries), "bytes": self._bytes, "hits": self.hits, "misses": self.misses}
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def _live(self, key: Hashable) -> Optional[V]:
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        if entry[0] < time.monotonic():
+            self.pop(key)
+            return None
+        return entry[2]
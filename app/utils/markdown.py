@@ -1,9 +1,18 @@
 import markdown2
 import re
-from functools import lru_cache
+
+from app.utils.metrics import timed
 
 
 class MarkdownRenderer:
+    @staticmethod
+    def content_stats(raw_content: str) -> dict:
+        # Stored with the blog metadata (register/update/sync) so listings never open the file.
+        return {
+            "word_count": len(raw_content.split()),
+            "reading_time": MarkdownRenderer.calculate_reading_time(raw_content),
+        }
+
     @staticmethod
     def calculate_reading_time(raw_content: str) -> int:
         text_only = re.sub(r'[#*`\[\]\(\)-]', '', raw_content)
@@ -14,22 +23,30 @@ class MarkdownRenderer:
         return max(1, minutes)
     
     @staticmethod
-    @lru_cache(maxsize=100)
-    def render(raw_content: str) -> str:
-        html = markdown2.markdown(raw_content, extras=[
-            "fenced-code-blocks",
-            "code-friendly", 
-            "tables",
-            "header-ids",
-            "metadata",
-            "task_list",
-            "break-on-newline",
-        ])
-        reading_time = MarkdownRenderer.calculate_reading_time(raw_content)
-        word_count = len(raw_content.split())
-        
+    def strip_metadata(raw_content: str) -> str:
+        # Drops the "---" front-matter block the metadata extra hides when rendering.
+        if not raw_content.startswith("---"):
+            return raw_content
+        lines = raw_content.splitlines(keepends=True)
+        for index, line in enumerate(lines[1:], start=1):
+            if line.strip() == "---":
+                return "".join(lines[index + 1:])
+        return raw_content
+
+    # Callers cache by source file identity, see app/utils/render_cache.py.
+    @staticmethod
+    def render(raw_content: str) -> dict:
+        with timed("markdown", "render"):
+            html = markdown2.markdown(raw_content, extras=[
+                "fenced-code-blocks",
+                "code-friendly", 
+                "tables",
+                "header-ids",
+                "metadata",
+                "task_list",
+                "break-on-newline",
+            ])
         return {
             "html": html,
-            "reading_time": reading_time,
-            "word_count": word_count,
+            **MarkdownRenderer.content_stats(raw_content),
         }
@@ -0,0 +1,94 @@
+import json
+from functools import lru_cache
+from typing import Any, Dict, Hashable, Iterable, Optional, Set
+
+from app.config import get_settings
+from app.utils.lru import BoundedLRU
+from app.utils.metrics import register_cache
+
+
+class MetadataCache:
+    """
+    Read-through cache of blog rows (by id and by permalink), bounded by
+    entry count and TTL. Rows are dropped by id when this process writes
+    them and when another process does (NOTIFY, see PostgresListener), so
+    staleness is bounded by the notification delay; the TTL caps it if a
+    notification is ever lost. While the listener is down the cache is
+    suspended and every read goes to Postgres.
+    """
+
+    def __init__(self, max_entries: int, ttl: float):
+        self.active = False
+        self._rows: BoundedLRU[Dict[str, Any]] = BoundedLRU(max_entries=max_entries, ttl=ttl, on_evict=self._forget)
+        self._keys_by_id: Dict[str, Set[Hashable]] = {}
+        # Bumped on every invalidation; a fill that raced with one is discarded.
+        self._generation = 0
+        self._stats = {"invalidations": 0, "flushes": 0}
+
+    def get(self, key: Hashable) -> Optional[Dict[str, Any]]:
+        return self._rows.get(key)
+
+    def token(self) -> int:
+        return self._generation
+
+    def put(self, key: Hashable, row: Dict[str, Any], token: int) -> None:
+        with self._rows.lock:
+            if not self.active or token != self._generation:
+                return
+            if self._rows.put(key, row):
+                self._keys_by_id.setdefault(row['id'], set()).add(key)
+
+    def invalidate(self, ids: Iterable[str]) -> None:
+        with self._rows.lock:
+            self._generation += 1
+            self._stats["invalidations"] += 1
+            for id in ids:
+                for key in self._keys_by_id.pop(id, ()):
+                    self._rows.pop(key)
+
+    def clear(self) -> None:
+        with self._rows.lock:
+            self._generation += 1
+            self._stats["flushes"] += 1
+            self._rows.clear()
+            self._keys_by_id.clear()
+
+    def set_active(self, active: bool) -> None:
+        self.clear()
+        self.active = active
+
+    def apply_notification(self, payload: str) -> None:
+        try:
+            message = json.loads(payload)
+        except ValueError:
+            message = {"flush": True}
+        if message.get("flush"):
+            self.clear()
+        else:
+            self.invalidate(message.get("ids") or [])
+
+    def stats(self) -> Dict[str, Any]:
+        with self._rows.lock:
+            stats = {**self._rows.stats(), **self._stats}
+        lookups = stats["hits"] + stats["misses"]
+        del stats["bytes"]
+        return {**stats, "hit_ratio": stats["hits"] / lookups if lookups else 0.0, "active": self.active}
+
+    def _forget(self, key: Hashable, row: Dict[str, Any]) -> None:
+        # Called by the LRU (under its lock) for every row that leaves other than by clear().
+        keys = self._keys_by_id.get(row['id'])
+        if keys:
+            keys.discard(key)
+            if not keys:
+                del self._keys_by_id[row['id']]
+
+
+@lru_cache()
+def get_metadata_cache() -> MetadataCache:
+    settings = get_settings()
+    cache = MetadataCache(
+        max_entries=settings.BLOGGER_METADATA_CACHE_SIZE,
+        ttl=settings.BLOGGER_METADATA_CACHE_TTL,
+    )
+    register_cache("metadata", cache.stats)
+    return cache
@@ -0,0 +1,228 @@
+import bisect
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple
+
+from app.config import get_settings
+
+
+# Request latency and per-stage timings (pool wait, SQL, file I/O, markdown,
+# templates) as Prometheus histograms, plus a Server-Timing header per
+# response. Kept dependency free: an observation is a perf_counter() pair,
+# a bisect and one locked increment.
+
+BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0)
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+Labels = Tuple[str, ...]
+Sample = Tuple[Dict[str, str], float]
+Collector = Callable[[], List[Tuple[str, str, str, List[Sample]]]]
+
+# Stages timed while serving the current request, read back for Server-Timing.
+_timings: ContextVar[Optional[List[Tuple[str, float]]]] = ContextVar("blogger_timings", default=None)
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\"", "\\\"").replace("\n", "\\n")
+
+
+def _labels(names: Tuple[str, ...], values: Labels, extra: str = "") -> str:
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+class Counter:
+    def __init__(self, name: str, help: str, labelnames: Tuple[str, ...] = ()):
+        self.name = name
+        self.help = help
+        self.labelnames = labelnames
+        self._values: Dict[Labels, float] = {}
+        self._lock = threading.Lock()
+
+    def inc(self, labels: Labels = (), amount: float = 1.0) -> None:
+        with self._lock:
+            self._values[labels] = self._values.get(labels, 0.0) + amount
+
+    def render(self) -> List[str]:
+        with self._lock:
+            values = list(self._values.items())
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} counter"]
+        lines.extend(f"{self.name}{_labels(self.labelnames, labels)} {value}" for labels, value in values)
+        return lines
+
+
+class Histogram:
+    def __init__(self, name: str, help: str, labelnames: Tuple[str, ...] = (), buckets: Tuple[float, ...] = BUCKETS):
+        self.name = name
+        self.help = help
+        self.labelnames = labelnames
+        self.buckets = buckets
+        # labels -> [per-bucket counts (last is +Inf), sum, count]
+        self._values: Dict[Labels, List[Any]] = {}
+        self._lock = threading.Lock()
+
+    def observe(self, labels: Labels, value: float) -> None:
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            entry = self._values.get(labels)
+            if entry is None:
+                entry = self._values[labels] = [[0] * (len(self.buckets) + 1), 0.0, 0]
+            entry[0][index] += 1
+            entry[1] += value
+            entry[2] += 1
+
+    def render(self) -> List[str]:
+        with self._lock:
+            values = [(labels, list(entry[0]), entry[1], entry[2]) for labels, entry in self._values.items()]
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} histogram"]
+        for labels, counts, total, count in values:
+            cumulative = 0
+            for bound, bucket in zip(self.buckets + (float("inf"), ), counts):
+                cumulative += bucket
+                le = 'le="+Inf"' if bound == float("inf") else f'le="{bound}"'
+                lines.append(f"{self.name}_bucket{_labels(self.labelnames, labels, le)} {cumulative}")
+            lines.append(f"{self.name}_sum{_labels(self.labelnames, labels)} {total}")
+            lines.append(f"{self.name}_count{_labels(self.labelnames, labels)} {count}")
+        return lines
+
+
+class Registry:
+    def __init__(self):
+        self.metrics: List[Any] = []
+        # Gauges read at scrape time from objects that already keep their own stats.
+        self.collectors: Dict[str, Collector] = {}
+
+    def counter(self, name: str, help: str, labelnames: Tuple[str, ...] = ()) -> Counter:
+        metric = Counter(name, help, labelnames)
+        self.metrics.append(metric)
+        return metric
+
+    def histogram(self, name: str, help: str, labelnames: Tuple[str, ...] = ()) -> Histogram:
+        metric = Histogram(name, help, labelnames)
+        self.metrics.append(metric)
+        return metric
+
+    def register_collector(self, key: str, collector: Collector) -> None:
+        # Keyed, so an object rebuilt (a new Container, a cleared lru_cache) replaces its collector.
+        self.collectors[key] = collector
+
+    def render(self) -> str:
+        lines = []
+        for metric in self.metrics:
+            lines.extend(metric.render())
+
+        families: Dict[str, Tuple[str, str, List[str]]] = {}
+        for collector in list(self.collectors.values()):
+            for name, kind, help, samples in collector():
+                family = families.setdefault(name, (kind, help, []))
+                family[2].extend(
+                    f"{name}{_labels(tuple(labels), tuple(labels.values()))} {float(value)}"
+                    for labels, value in samples
+                )
+        for name, (kind, help, samples) in families.items():
+            lines.extend([f"# HELP {name} {help}", f"# TYPE {name} {kind}", *samples])
+        return "\n".join(lines) + "\n"
+
+
+REGISTRY = Registry()
+
+REQUEST_SECONDS = REGISTRY.histogram(
+    "blogger_request_duration_seconds", "Time to serve a request, by route template.", ("method", "route"),
+)
+REQUESTS = REGISTRY.counter(
+    "blogger_requests_total", "Requests served, by route template and status.", ("method", "route", "status"),
+)
+STAGE_SECONDS = REGISTRY.histogram(
+    "blogger_stage_duration_seconds", "Time spent per stage (pool, db, file, markdown, template).", ("stage", "name"),
+)
+
+
+def enabled() -> bool:
+    return get_settings().BLOGGER_METRICS
+
+
+def record(stage: str, name: str, seconds: float) -> None:
+    if not enabled():
+        return
+    STAGE_SECONDS.observe((stage, name), seconds)
+    timings = _timings.get()
+    if timings is not None:
+        timings.append((stage, seconds))
+
+
+@contextmanager
+def timed(stage: str, name: str = "") -> Iterator[None]:
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        record(stage, name, time.perf_counter() - started)
+
+
+def register_cache(name: str, stats: Callable[[], Dict[str, Any]]) -> None:
+    """Exports a cache's own stats() counters (hits, misses, entries, bytes) under cache=name."""
+    def collect() -> List[Tuple[str, str, str, List[Sample]]]:
+        values = stats()
+        labels = {"cache": name}
+        families = [
+            ("blogger_cache_hits_total", "counter", "Cache lookups answered from the cache.", "hits"),
+            ("blogger_cache_misses_total", "counter", "Cache lookups that fell through.", "misses"),
+            ("blogger_cache_entries", "gauge", "Entries currently held.", "entries"),
+            ("blogger_cache_bytes", "gauge", "Bytes currently held.", "bytes"),
+        ]
+        return [(metric, kind, help, [(labels, values[key])]) for metric, kind, help, key in families if key in values]
+
+    REGISTRY.register_collector(f"cache:{name}", collect)
+
+
+def server_timing(timings: List[Tuple[str, float]], total: float) -> str:
+    # Stages that ran several times (e.g. two queries) are summed, in first-seen order.
+    durations: Dict[str, float] = {}
+    for stage, seconds in timings:
+        durations[stage] = durations.get(stage, 0.0) + seconds
+    durations["app"] = total
+    return ", ".join(f"{stage};dur={seconds * 1000:.2f}" for stage, seconds in durations.items())
+
+
+class MetricsMiddleware:
+    """
+    Plain ASGI middleware (no BaseHTTPMiddleware task and body buffering):
+    collects the stages timed during the request, adds them as Server-Timing
+    when the response starts, and records latency by route template.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or not enabled():
+            await self.app(scope, receive, send)
+            return
+
+        started = time.perf_counter()
+        timings: List[Tuple[str, float]] = []
+        token = _timings.set(timings)
+        status = [500]
+        add_header = get_settings().BLOGGER_SERVER_TIMING
+
+        async def send_with_timing(message):
+            if message["type"] == "http.response.start":
+                status[0] = message["status"]
+                if add_header:
+                    header = server_timing(timings, time.perf_counter() - started)
+                    message = {**message, "headers": [*message.get("headers", []), (b"server-timing", header.encode("latin-1"))]}
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_timing)
+        finally:
+            _timings.reset(token)
+            # The router stores the matched route in the scope; mounts (static) only leave their root_path.
+            route = scope.get("route")
+            label = getattr(route, "path", None) or scope.get("root_path") or "unmatched"
+            REQUEST_SECONDS.observe((scope["method"], label), time.perf_counter() - started)
+            REQUESTS.inc((scope["method"], label, str(status[0])))
@@ -0,0 +1,67 @@
+from functools import lru_cache
+from typing import Any, Dict, Hashable, Optional, Tuple
+
+from fastapi import Request, Response
+
+from app.config import get_settings
+from app.utils.compression import compress_variants, encoded_response
+from app.utils.http_cache import source_current, validator_headers
+from app.utils.invalidation import on_write
+from app.utils.lru import BoundedLRU
+from app.utils.metrics import register_cache
+
+
+PageKey = Tuple[Hashable, ...]
+
+
+class PageCache:
+    """
+    Whole responses as encoded bytes with their validator, keyed by the
+    normalized request (the Accept variant is part of every key, so HTML and
+    JSON never share an entry). A hit answers without Postgres, Jinja or
+    JSON encoding. Compressed copies are made once, when a page is stored,
+    and count towards the byte bound. Bounded by entry count and total
+    bytes, dropped on every admin write and expired after a TTL for writes
+    made elsewhere.
+    """
+
+    def __init__(self, max_entries: int, max_bytes: int, ttl: float):
+        self._pages: BoundedLRU[Dict[str, Any]] = BoundedLRU(
+            max_entries=max_entries, max_bytes=max_bytes, ttl=ttl, sizeof=_page_size,
+        )
+
+    def get(self, key: PageKey) -> Optional[Dict[str, Any]]:
+        return self._pages.get(key, valid=lambda page: source_current(page["validator"]))
+
+    def put(self, key: PageKey, body: bytes, media_type: str, validator: Dict[str, Any]) -> Dict[str, Any]:
+        # The page as page_response() takes it, whether it was stored or not.
+        page = {"body": body, "media_type": media_type, "validator": validator, "encoded": compress_variants(body)}
+        self._pages.put(key, page)
+        return page
+
+    def clear(self) -> None:
+        self._pages.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        return self._pages.stats()
+
+
+def _page_size(page: Dict[str, Any]) -> int:
+    return len(page["body"]) + sum(len(body) for body in page["encoded"].values())
+
+
+def page_response(page: Dict[str, Any], request: Request) -> Response:
+    return encoded_response(request, page["body"], page["encoded"], page["media_type"], validator_headers(page["validator"]))
+
+
+@lru_cache()
+def get_page_cache() -> PageCache:
+    settings = get_settings()
+    cache = PageCache(
+        max_entries=settings.BLOGGER_PAGE_CACHE_SIZE,
+        max_bytes=settings.BLOGGER_PAGE_CACHE_BYTES,
+        ttl=settings.BLOGGER_PAGE_CACHE_TTL,
+    )
+    on_write(cache.clear)
+    register_cache("page", cache.stats)
+    return cache
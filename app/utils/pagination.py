@@ -1,4 +1,49 @@
+import base64
+import json
+from datetime import datetime
+from typing import Any, Dict, Optional
+
+
 def get_csv_row_count(file_path: str) -> int:
     with open(file_path, mode='r', encoding='utf-8') as f:
         # Subtract 1 for the header row
         return sum(1 for line in f) - 1
+
+
+def encode_cursor(published_at: Optional[datetime], created_at: datetime, id: str, before: bool = False) -> str:
+    payload = {
+        "p": published_at.isoformat() if published_at else None,
+        "c": created_at.isoformat(),
+        "i": id,
+        "b": before,
+    }
+    raw = json.dumps(payload, separators=(",", ":")).encode("utf-8")
+    return base64.urlsafe_b64encode(raw).decode("ascii").rstrip("=")
+
+
+def decode_cursor(cursor: str) -> Dict[str, Any]:
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        payload = json.loads(raw)
+        return {
+            "published_at": datetime.fromisoformat(payload["p"]) if payload["p"] else None,
+            "created_at": datetime.fromisoformat(payload["c"]),
+            "id": str(payload["i"]),
+            "before": bool(payload.get("b", False)),
+        }
+    except (ValueError, KeyError, TypeError) as e:
+        raise ValueError(f"Invalid pagination cursor: {cursor}") from e
+
+
+def encode_search_cursor(rank: float, id: str) -> str:
+    raw = json.dumps({"r": rank, "i": id}, separators=(",", ":")).encode("utf-8")
+    return base64.urlsafe_b64encode(raw).decode("ascii").rstrip("=")
+
+
+def decode_search_cursor(cursor: str) -> Dict[str, Any]:
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        payload = json.loads(raw)
+        return {"rank": float(payload["r"]), "id": str(payload["i"])}
+    except (ValueError, KeyError, TypeError) as e:
+        raise ValueError(f"Invalid search cursor: {cursor}") from e
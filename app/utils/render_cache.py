@@ -0,0 +1,118 @@
+import hashlib
+import json
+import os
+import threading
+from functools import lru_cache
+from typing import Any, Dict, Optional, Tuple
+
+from app.config import get_settings
+from app.utils.lru import BoundedLRU
+from app.utils.markdown import MarkdownRenderer
+from app.utils.metrics import register_cache, timed
+
+
+RenderKey = Tuple[str, int, int]
+
+
+class RenderCache:
+    """
+    Rendered markdown keyed by the source file identity (path, size, mtime),
+    so a hit costs one stat() instead of a file read and a markdown2 call.
+    Memory is an LRU bounded by the size of the cached HTML; the optional
+    disk tier survives restarts and --reload, and holds one file per source
+    path, the render of its latest version.
+    """
+
+    def __init__(self, max_bytes: int, disk_dir: Optional[str] = None):
+        self.disk_dir = disk_dir
+        self.disk_hits = 0
+        self._renders: BoundedLRU[Dict[str, Any]] = BoundedLRU(max_bytes=max_bytes, sizeof=_render_size)
+
+        if self.disk_dir:
+            os.makedirs(self.disk_dir, exist_ok=True)
+
+    @staticmethod
+    def key_for(file_path: str) -> RenderKey:
+        with timed("file", "stat"):
+            st = os.stat(file_path)
+        return (os.path.abspath(file_path), st.st_size, st.st_mtime_ns)
+
+    def get(self, key: RenderKey) -> Optional[Dict[str, Any]]:
+        render = self._renders.get(key)
+        if render is not None:
+            return render
+
+        # A memory miss answered by the disk tier still saves the markdown render.
+        render = self._read_disk(key)
+        if render is not None:
+            with self._renders.lock:
+                self.disk_hits += 1
+            self._renders.put(key, render)
+        return render
+
+    def put(self, key: RenderKey, render: Dict[str, Any]) -> None:
+        self._renders.put(key, render)
+        self._write_disk(key, render)
+
+    def get_or_render(self, file_path: str) -> Dict[str, Any]:
+        key = self.key_for(file_path)
+        render = self.get(key)
+        if render is not None:
+            return render
+
+        with open(file_path, "r", encoding="utf-8") as f:
+            render = MarkdownRenderer.render(f.read())
+
+        self.put(key, render)
+        return render
+
+    def clear(self) -> None:
+        self._renders.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        return {**self._renders.stats(), "disk_hits": self.disk_hits}
+
+    def _disk_path(self, key: RenderKey) -> str:
+        # One file per source path: a new render of an edited file replaces the old one.
+        digest = hashlib.sha256(key[0].encode("utf-8")).hexdigest()
+        return os.path.join(self.disk_dir, f"{digest}.json")
+
+    def _read_disk(self, key: RenderKey) -> Optional[Dict[str, Any]]:
+        if not self.disk_dir:
+            return None
+        try:
+            with open(self._disk_path(key), "r", encoding="utf-8") as f:
+                stored = json.load(f)
+        except (OSError, ValueError):
+            return None
+        # Rendered from an older version of the file (or written in the old per-version layout).
+        if not isinstance(stored, dict) or stored.get("key") != list(key):
+            return None
+        return stored["render"]
+
+    def _write_disk(self, key: RenderKey, render: Dict[str, Any]) -> None:
+        if not self.disk_dir:
+            return
+        path = self._disk_path(key)
+        tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        try:
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump({"key": list(key), "render": render}, f)
+            os.replace(tmp_path, path)
+        except OSError as e:
+            print(f"Render cache write failed for {path}: {e}")
+
+
+def _render_size(render: Dict[str, Any]) -> int:
+    return len(render.get("html", "").encode("utf-8"))
+
+
+@lru_cache()
+def get_render_cache() -> RenderCache:
+    settings = get_settings()
+    cache = RenderCache(
+        max_bytes=settings.BLOGGER_RENDER_CACHE_BYTES,
+        disk_dir=settings.BLOGGER_RENDER_CACHE_DIR or None,
+    )
+    register_cache("render", cache.stats)
+    return cache
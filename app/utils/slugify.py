@@ -1,7 +1,14 @@
 import re
+from datetime import datetime
+from typing import Optional
 
 def slugify(text: str) -> str:
     text = text.lower()
     text = re.sub(r'[^a-z0-9\s-]', '', text) # Remove non-alphanumeric chars (except space/hyphen)
     text = re.sub(r'[-\s]+', '-', text).strip('-') # Collapse spaces/hyphens to a single hyphen
     return text
+
+
+def permalink_key(published_at: Optional[datetime], created_at: datetime, title: str) -> str:
+    # Mirrors fn_permalink_key: "YYYY/MM/DD/slug".
+    return f"{(published_at or created_at).strftime('%Y/%m/%d')}/{slugify(title)}"
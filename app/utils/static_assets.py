@@ -0,0 +1,250 @@
+import hashlib
+import json
+import mimetypes
+import os
+import re
+import threading
+from functools import lru_cache
+from typing import Any, Dict, Optional, Tuple
+
+from jinja2 import pass_context
+from starlette.datastructures import Headers
+from starlette.responses import FileResponse, Response
+from starlette.staticfiles import NotModifiedResponse, StaticFiles
+from starlette.types import Scope
+
+from app.config import get_settings
+from app.utils.compression import SUFFIXES, compress_variants, negotiate
+
+
+# Static files under content-hashed names ("styles.<hash>.css"), which never
+# change and so are cached by browsers for a year without revalidating.
+# Each file is copied into the build directory under its hashed name next to
+# its precompressed variants (.gz, .br, .zst), built once at startup (or by
+# build_static.py) and reused while the source is unchanged. url() references
+# in CSS are rewritten to the hashed names first, so the fonts a stylesheet
+# loads are immutable too.
+
+MANIFEST_NAME = "manifest.json"
+
+# Already compressed formats; recompressing them only costs CPU.
+PRECOMPRESSED = {".woff", ".woff2", ".png", ".jpg", ".jpeg", ".gif", ".webp", ".avif", ".gz", ".br", ".zst", ".zip"}
+
+_CSS_URL = re.compile(r"""url\(\s*(['"]?)([^'"()]+?)\1\s*\)""")
+_FINGERPRINT = re.compile(r"^(.*)\.[0-9a-f]{12}(\.[^./]+)$")
+
+
+def _fingerprinted(path: str, digest: str) -> str:
+    root, ext = os.path.splitext(path)
+    return f"{root}.{digest}{ext}"
+
+
+class StaticAssets(StaticFiles):
+    """
+    StaticFiles that serves the built variants: hashed URLs as immutable,
+    plain URLs with BLOGGER_CACHE_CONTROL, either one precompressed when the
+    client's Accept-Encoding allows. Files missing from the manifest, or
+    edited since it was built, are served from the source directory as
+    StaticFiles would.
+    """
+
+    def __init__(self, directory: str, build_dir: str, max_age: int):
+        super().__init__(directory=directory, check_dir=False)
+        self.source_dir = directory
+        self.build_dir = build_dir
+        self.max_age = max_age
+        # Source path ("fonts/Ubuntu-R.ttf") -> entry; hashed path -> source path.
+        self.manifest: Dict[str, Dict[str, Any]] = {}
+        self._by_fingerprint: Dict[str, str] = {}
+        self._lock = threading.Lock()
+
+    def load(self) -> None:
+        # The manifest of an earlier build, as is (export workers, or a read-only deploy).
+        try:
+            with open(os.path.join(self.build_dir, MANIFEST_NAME), "r", encoding="utf-8") as f:
+                manifest = json.load(f)
+        except (OSError, ValueError):
+            manifest = {}
+        self._publish(manifest)
+
+    def build(self) -> Dict[str, Any]:
+        with self._lock:
+            if not self.manifest:
+                self.load()
+            previous = self.manifest
+            manifest: Dict[str, Dict[str, Any]] = {}
+            built = 0
+
+            sources = []
+            for root, _, files in os.walk(self.source_dir):
+                for name in files:
+                    full_path = os.path.join(root, name)
+                    sources.append(os.path.relpath(full_path, self.source_dir).replace(os.sep, "/"))
+
+            # Stylesheets last: their content (and hash) depends on the hashed names of what they reference.
+            for path in sorted(sources, key=lambda p: (p.endswith(".css"), p)):
+                entry, rebuilt = self._build_one(path, previous.get(path), manifest)
+                manifest[path] = entry
+                built += rebuilt
+
+            os.makedirs(self.build_dir, exist_ok=True)
+            tmp_path = os.path.join(self.build_dir, f"{MANIFEST_NAME}.tmp")
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump(manifest, f, indent=1, sort_keys=True)
+            os.replace(tmp_path, os.path.join(self.build_dir, MANIFEST_NAME))
+
+            self._remove_stale(previous, manifest)
+            self._publish(manifest)
+
+        return {
+            "files": len(manifest),
+            "built": built,
+            "bytes": sum(entry["size"] for entry in manifest.values()),
+            "encoded": {
+                encoding: sum(entry["encodings"].get(encoding, entry["size"]) for entry in manifest.values())
+                for encoding in SUFFIXES if any(encoding in entry["encodings"] for entry in manifest.values())
+            },
+        }
+
+    def url_path(self, path: str) -> str:
+        # "/styles.css" -> "/styles.<hash>.css"; unknown files keep their path.
+        entry = self.manifest.get(path.lstrip("/"))
+        if entry is None:
+            return path
+        return ("/" if path.startswith("/") else "") + entry["fingerprinted"]
+
+    async def get_response(self, path: str, scope: Scope) -> Response:
+        path = path.replace(os.sep, "/")
+        immutable = path in self._by_fingerprint
+        source = self._by_fingerprint.get(path)
+        if source is None:
+            # An older hash of a known file (a page cached before a deploy) gets the current one, revalidated.
+            match = _FINGERPRINT.match(path)
+            source = f"{match.group(1)}{match.group(2)}" if match else path
+
+        entry = self.manifest.get(source)
+        if entry is None or scope["method"] not in ("GET", "HEAD") or not self._current(source, entry):
+            return await super().get_response(path, scope)
+
+        request_headers = Headers(scope=scope)
+        encoding = negotiate(request_headers.get("accept-encoding", ""), entry["encodings"])
+        built_path = os.path.join(self.build_dir, entry["fingerprinted"] + (SUFFIXES[encoding] if encoding else ""))
+        try:
+            stat_result = os.stat(built_path)
+        except OSError:
+            return await super().get_response(path, scope)
+
+        headers = {
+            "Cache-Control": f"public, max-age={self.max_age}, immutable" if immutable else get_settings().BLOGGER_CACHE_CONTROL,
+        }
+        if entry["encodings"]:
+            headers["Vary"] = "Accept-Encoding"
+        if encoding:
+            headers["Content-Encoding"] = encoding
+
+        response = FileResponse(
+            built_path, stat_result=stat_result, headers=headers,
+            media_type=mimetypes.guess_type(source)[0] or "application/octet-stream",
+        )
+        if self.is_not_modified(response.headers, request_headers):
+            return NotModifiedResponse(response.headers)
+        return response
+
+    def _build_one(
+        self, path: str, previous: Optional[Dict[str, Any]], manifest: Dict[str, Dict[str, Any]],
+    ) -> Tuple[Dict[str, Any], int]:
+        full_path = os.path.join(self.source_dir, path)
+        st = os.stat(full_path)
+        is_css = path.endswith(".css")
+        if previous and not is_css and (previous["size"], previous["mtime_ns"]) == (st.st_size, st.st_mtime_ns):
+            if os.path.exists(os.path.join(self.build_dir, previous["fingerprinted"])):
+                return previous, 0
+
+        with open(full_path, "rb") as f:
+            data = f.read()
+        if is_css:
+            data = self._rewrite_css(path, data, manifest)
+
+        digest = hashlib.sha256(data).hexdigest()[:12]
+        fingerprinted = _fingerprinted(path, digest)
+        if previous and previous["fingerprinted"] == fingerprinted and os.path.exists(os.path.join(self.build_dir, fingerprinted)):
+            return {**previous, "size": st.st_size, "mtime_ns": st.st_mtime_ns}, 0
+
+        variants = {}
+        if os.path.splitext(path)[1].lower() not in PRECOMPRESSED:
+            variants = compress_variants(data, best=True)
+
+        target = os.path.join(self.build_dir, fingerprinted)
+        os.makedirs(os.path.dirname(target), exist_ok=True)
+        for suffix, body in [("", data), *((SUFFIXES[encoding], body) for encoding, body in variants.items())]:
+            with open(f"{target}{suffix}.tmp", "wb") as f:
+                f.write(body)
+            os.replace(f"{target}{suffix}.tmp", f"{target}{suffix}")
+
+        return {
+            "fingerprinted": fingerprinted,
+            "size": st.st_size,
+            "mtime_ns": st.st_mtime_ns,
+            "encodings": {encoding: len(body) for encoding, body in variants.items()},
+        }, 1
+
+    def _rewrite_css(self, path: str, data: bytes, manifest: Dict[str, Dict[str, Any]]) -> bytes:
+        base = os.path.dirname(path)
+
+        def replace(match: "re.Match[str]") -> str:
+            quote, url = match.group(1), match.group(2).strip()
+            if "://" in url or url.startswith(("data:", "#", "/")):
+                return match.group(0)
+            target = os.path.normpath(os.path.join(base, url.split("?")[0].split("#")[0])).replace(os.sep, "/")
+            entry = manifest.get(target)
+            if entry is None:
+                return match.group(0)
+            hashed = os.path.relpath(entry["fingerprinted"], base or ".").replace(os.sep, "/")
+            return f"url({quote}{hashed}{quote})"
+
+        return _CSS_URL.sub(replace, data.decode("utf-8")).encode("utf-8")
+
+    def _current(self, path: str, entry: Dict[str, Any]) -> bool:
+        # Edited since the build (e.g. while developing): the source is served until the next build.
+        try:
+            st = os.stat(os.path.join(self.source_dir, path))
+        except OSError:
+            return False
+        return (st.st_size, st.st_mtime_ns) == (entry["size"], entry["mtime_ns"])
+
+    def _remove_stale(self, previous: Dict[str, Dict[str, Any]], manifest: Dict[str, Dict[str, Any]]) -> None:
+        current = {entry["fingerprinted"] for entry in manifest.values()}
+        for entry in previous.values():
+            if entry["fingerprinted"] in current:
+                continue
+            for suffix in ("", *SUFFIXES.values()):
+                try:
+                    os.remove(os.path.join(self.build_dir, entry["fingerprinted"] + suffix))
+                except OSError:
+                    pass
+
+    def _publish(self, manifest: Dict[str, Dict[str, Any]]) -> None:
+        self.manifest = manifest
+        self._by_fingerprint = {entry["fingerprinted"]: path for path, entry in manifest.items()}
+
+
+@pass_context
+def url_for(context: Dict[str, Any], name: str, /, **path_params: Any):
+    # The templates' url_for, with static paths swapped for their hashed names.
+    if name == "static" and "path" in path_params:
+        path_params["path"] = get_static_assets().url_path(path_params["path"])
+    return context["request"].url_for(name, **path_params)
+
+
+def install_url_for(templates) -> None:
+    templates.env.globals["url_for"] = url_for
+
+
+@lru_cache()
+def get_static_assets() -> StaticAssets:
+    settings = get_settings()
+    return StaticAssets(
+        directory=settings.BLOGGER_STATIC_DIR,
+        build_dir=settings.BLOGGER_STATIC_BUILD_DIR,
+        max_age=settings.BLOGGER_STATIC_MAX_AGE,
+    )
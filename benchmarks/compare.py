@@ -0,0 +1,50 @@
+"""Compares two benchmarks/read_paths.py result files: python -m benchmarks.compare OLD.json NEW.json"""
+import argparse
+import json
+from typing import Any, Dict, Iterator, Tuple
+
+
+METRICS = ("p50_ms", "p95_ms", "p99_ms", "rps")
+
+
+def _scenarios(payload: Dict[str, Any]) -> Iterator[Tuple[str, Dict[str, Any]]]:
+    if "markdown_render" in payload:
+        yield "markdown_render", payload["markdown_render"]
+    for size, result in payload.get("sizes", {}).items():
+        for name, summary in result["scenarios"].items():
+            yield f"{size}/{name}", summary
+
+
+def compare(old: Dict[str, Any], new: Dict[str, Any], threshold: float) -> int:
+    before = dict(_scenarios(old))
+    regressions = 0
+
+    print(f"{old['environment']['commit']} -> {new['environment']['commit']}")
+    print(f"{'scenario':<30}" + "".join(f"{metric:>18}" for metric in METRICS))
+    for name, summary in _scenarios(new):
+        if name not in before:
+            continue
+        cells = []
+        for metric in METRICS:
+            was, now = before[name][metric], summary[metric]
+            change = (now - was) / was if was else 0.0
+            # Latency going up or throughput going down is a regression.
+            worse = change < -threshold if metric == "rps" else change > threshold
+            regressions += worse
+            cells.append(f"{now:>10.2f} {change:>+6.0%}{'!' if worse else ' '}")
+        print(f"{name:<30}" + "".join(cells))
+    return regressions
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Compare two benchmark result files.")
+    parser.add_argument("old")
+    parser.add_argument("new")
+    parser.add_argument("--threshold", type=float, default=0.10, help="Relative change flagged as a regression.")
+    args = parser.parse_args()
+
+    with open(args.old, "r", encoding="utf-8") as f:
+        old = json.load(f)
+    with open(args.new, "r", encoding="utf-8") as f:
+        new = json.load(f)
+    raise SystemExit(1 if compare(old, new, args.threshold) else 0)
@@ -0,0 +1,127 @@
+import os
+import random
+import time
+from contextlib import contextmanager
+from datetime import datetime
+from typing import Iterator, List
+
+import psycopg2
+
+from app.config import Settings
+from app.gateways.postgres.client import PostgresClient
+from app.repositories.blog import BlogRepository
+from app.models.blog import Blog
+from app.enums.enums import BlogState
+from populate_database import TOPICS, BATCH_SIZE, generate_blog, generate_devastating_markdown
+
+
+# 005 adds columns to databases seeded before them and is safe to re-run. prepare() runs them
+# in one transaction, the upgrade order of database/migrations/001_permalink_key.sql.
+SQL_FILES = ("database/schema.sql", "database/migrations/005_content_stats.sql",
+             "database/migrations/006_sitemap_index.sql", "database/migrations/007_browse_facets.sql",
+             "database/functions.sql")
+
+
+class BenchDataset:
+    """
+    A dedicated benchmark database that only ever grows, so 5k -> 50k -> 500k
+    seeds the difference instead of starting over. Posts share a pool of
+    generated markdown files, a unique file per post is not needed to measure
+    the read paths and would cost gigabytes at 500k.
+    """
+
+    def __init__(self, settings: Settings, content_dir: str, files: int = 500):
+        self.settings = settings
+        self.content_dir = content_dir
+        self.files = files
+
+    @contextmanager
+    def _cursor(self, dbname: str, autocommit: bool = False) -> Iterator:
+        conn = psycopg2.connect(
+            dbname=dbname,
+            user=self.settings.BLOGGER_DB_USER,
+            password=self.settings.BLOGGER_DB_PASS,
+            host=self.settings.BLOGGER_DB_HOST,
+            port=self.settings.BLOGGER_DB_PORT,
+        )
+        conn.autocommit = autocommit
+        try:
+            with conn.cursor() as cur:
+                yield cur
+            conn.commit()
+        finally:
+            conn.close()
+
+    def prepare(self, reset: bool = False) -> None:
+        with self._cursor("postgres", autocommit=True) as cur:
+            cur.execute("SELECT 1 FROM pg_database WHERE datname = %s", (self.settings.BLOGGER_DB_NAME, ))
+            if not cur.fetchone():
+                cur.execute(f'CREATE DATABASE "{self.settings.BLOGGER_DB_NAME}"')
+
+        with self._cursor(self.settings.BLOGGER_DB_NAME) as cur:
+            for path in SQL_FILES:
+                with open(path, "r", encoding="utf-8") as f:
+                    cur.execute(f.read())
+            if reset:
+                cur.execute("TRUNCATE blogs CASCADE")
+
+        os.makedirs(self.content_dir, exist_ok=True)
+        for index in range(self.files):
+            path = self.content_path(index)
+            if not os.path.exists(path):
+                with open(path, "w", encoding="utf-8") as f:
+                    f.write(generate_devastating_markdown(random.choice(TOPICS), index))
+
+    def content_path(self, index: int) -> str:
+        return os.path.join(self.content_dir, f"post_{index % self.files}.md")
+
+    def content_files(self) -> List[str]:
+        return [self.content_path(index) for index in range(self.files)]
+
+    def grow_to(self, size: int) -> float:
+        client = self._client()
+        model = Blog(BlogRepository(client))
+        started = time.perf_counter()
+        try:
+            current = model.count()
+            now = datetime.now()
+            for start in range(current, size, BATCH_SIZE):
+                batch = [
+                    generate_blog(model, index, self.content_path(index), now)
+                    for index in range(start, min(start + BATCH_SIZE, size))
+                ]
+                model.save_many(batch, batch_size=BATCH_SIZE)
+        finally:
+            client.close_all()
+
+        with self._cursor(self.settings.BLOGGER_DB_NAME, autocommit=True) as cur:
+            cur.execute("ANALYZE blogs")
+        return time.perf_counter() - started
+
+    def published_count(self) -> int:
+        client = self._client()
+        try:
+            return Blog(BlogRepository(client)).count(state=BlogState.PUBLISHED)
+        finally:
+            client.close_all()
+
+    def sample_permalinks(self, n: int, unrendered: bool = False) -> List[str]:
+        # Unrendered posts have no stored artifact yet, i.e. a true first view.
+        query = (
+            "SELECT b.permalink_key FROM blogs b "
+            "LEFT JOIN blog_renders r ON r.blog_id = b.id "
+            "WHERE b.state = 'published'" + (" AND r.blog_id IS NULL" if unrendered else "") +
+            " ORDER BY random() LIMIT %s"
+        )
+        with self._cursor(self.settings.BLOGGER_DB_NAME) as cur:
+            cur.execute(query, (n, ))
+            return [row[0] for row in cur.fetchall()]
+
+    def _client(self) -> PostgresClient:
+        return PostgresClient(
+            dbname=self.settings.BLOGGER_DB_NAME,
+            user=self.settings.BLOGGER_DB_USER,
+            password=self.settings.BLOGGER_DB_PASS,
+            host=self.settings.BLOGGER_DB_HOST,
+            port=self.settings.BLOGGER_DB_PORT,
+        )
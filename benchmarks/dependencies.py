@@ -0,0 +1,97 @@
+"""
+Dependency resolution overhead per request: the per-request wiring
+(repository -> model -> service rebuilt through nested Depends) against the
+container providers, each behind an otherwise empty endpoint:
+
+    python -m benchmarks.dependencies --requests 20000
+
+No database is needed, the pool is never opened.
+"""
+import argparse
+import asyncio
+import os
+import sys
+import time
+from typing import Any, Dict, List
+
+
+def build_app():
+    from fastapi import Depends, FastAPI, Request, Response
+    from app.config import get_settings
+    from app.container import Container
+    from app.models.blog import AsyncBlog
+    from app.services.blog import AsyncBlogService, get_blog_service
+
+    app = FastAPI()
+    app.state.container = Container(get_settings())
+
+    # The providers as they were before the container: a new object per level, per request.
+    def rebuilt_repository(request: Request):
+        return request.app.state.container._blog_repository()
+
+    def rebuilt_model(repository=Depends(rebuilt_repository)) -> AsyncBlog:
+        return AsyncBlog(repository)
+
+    def rebuilt_service(model: AsyncBlog = Depends(rebuilt_model)) -> AsyncBlogService:
+        return AsyncBlogService(model)
+
+    @app.get("/none")
+    async def no_dependency():
+        return Response(b"")
+
+    @app.get("/per-request")
+    async def per_request(service: AsyncBlogService = Depends(rebuilt_service)):
+        return Response(b"")
+
+    @app.get("/container")
+    async def container(service: AsyncBlogService = Depends(get_blog_service)):
+        return Response(b"")
+
+    return app
+
+
+async def run(args: argparse.Namespace) -> Dict[str, Any]:
+    import httpx
+    from benchmarks.stats import environment, measure_async, print_table
+
+    app = build_app()
+    results = {}
+    async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://bench") as client:
+        for name in ("none", "per-request", "container"):
+            async def get(_: int) -> bool:
+                return (await client.get(f"/{name}")).status_code == 200
+            results[name] = await measure_async(get, args.requests, warmup=args.warmup)
+
+    print_table(f"{args.requests} requests", results)
+    overhead = {name: results[name]["mean_ms"] - results["none"]["mean_ms"] for name in ("per-request", "container")}
+    print(f"\n{'dependency overhead':<24}{'mean ms':>10}")
+    for name, value in overhead.items():
+        print(f"{name:<24}{value:>10.4f}")
+    print(f"{'removed per request':<24}{overhead['per-request'] - overhead['container']:>10.4f}")
+
+    return {
+        "environment": environment(),
+        "config": {key: value for key, value in vars(args).items() if key != "out"},
+        "sizes": {"0": {"scenarios": results}},
+        "overhead_ms": overhead,
+    }
+
+
+def parse_args(argv: List[str]) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Measure FastAPI dependency resolution overhead per request.")
+    parser.add_argument("--requests", type=int, default=20000, help="Timed requests per endpoint.")
+    parser.add_argument("--warmup", type=int, default=500, help="Untimed requests before each endpoint.")
+    parser.add_argument("--out", default=None, help="JSON results path (default: benchmarks/results/dependencies-<commit>.json).")
+    return parser.parse_args(argv)
+
+
+if __name__ == "__main__":
+    args = parse_args(sys.argv[1:])
+
+    started = time.perf_counter()
+    payload = asyncio.run(run(args))
+
+    from benchmarks.stats import write_results
+    out = args.out or os.path.join("benchmarks", "results", f"dependencies-{payload['environment']['commit'] or 'local'}.json")
+    write_results(out, payload)
+    print(f"\n--- Results written to {out} in {time.perf_counter() - started:.1f}s ---")
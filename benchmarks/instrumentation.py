@@ -0,0 +1,110 @@
+"""
+Overhead of BLOGGER_METRICS (stage/request histograms and Server-Timing)
+per request, on a page-cache hit (the cheapest request, so the largest
+relative cost) and on uncached listing and post reads:
+
+    python -m benchmarks.instrumentation --requests 2000
+
+CPU is process time, as in serialization.py, so Postgres round trips are
+left out and the difference between the two modes is the instrumentation.
+Uses the read_paths.py benchmark database and results layout.
+"""
+import argparse
+import asyncio
+import os
+import sys
+import time
+from typing import Any, Dict, List
+
+
+async def bench(app, args: argparse.Namespace) -> Dict[str, Dict[str, Any]]:
+    import httpx
+    from app.config import get_settings
+    from app.utils.page_cache import get_page_cache
+    from benchmarks.stats import measure_async
+
+    settings = get_settings()
+    html = {"accept": "text/html"}
+    results = {}
+    async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://bench") as client:
+        # The first post linked from the listing, so the permalink matches the app's slug.
+        listing = (await client.get("/blogs/", headers=html)).text
+        permalink = "/blogs/" + listing.split('href="/blogs/', 1)[1].split('"', 1)[0].strip()
+        scenarios = {
+            "page_cache_hit": ("/blogs/", html, False),
+            "listing_json": ("/blogs/?limit=20", {}, True),
+            "post_html": (permalink, html, True),
+        }
+
+        for mode in ("off", "on"):
+            settings.BLOGGER_METRICS = mode == "on"
+            for name, (url, headers, uncached) in scenarios.items():
+                async def get(_: int) -> bool:
+                    if uncached:
+                        get_page_cache().clear()
+                    return (await client.get(url, headers=headers)).status_code == 200
+
+                started = time.process_time()
+                summary = await measure_async(get, args.requests, warmup=args.warmup)
+                summary["cpu_ms"] = (time.process_time() - started) / (args.requests + args.warmup) * 1000
+                results[f"{mode}/{name}"] = summary
+    return results
+
+
+async def run(args: argparse.Namespace) -> Dict[str, Any]:
+    from app.config import get_settings
+    from benchmarks.dataset import BenchDataset
+    from benchmarks.stats import environment, print_table
+    import main
+
+    dataset = BenchDataset(get_settings(), args.content_dir, files=args.files)
+    dataset.prepare()
+    dataset.grow_to(args.size)
+
+    async with main.lifespan(main.app):
+        results = await bench(main.app, args)
+
+    print_table(f"{args.size} posts", results)
+    overhead = {}
+    print(f"\n{'cpu per request':<24}{'off':>12}{'on':>12}{'overhead':>12}")
+    for key, summary in results.items():
+        mode, name = key.split("/", 1)
+        if mode == "on":
+            before = results[f"off/{name}"]["cpu_ms"]
+            overhead[name] = {"off_cpu_ms": before, "on_cpu_ms": summary["cpu_ms"], "overhead_cpu_ms": summary["cpu_ms"] - before}
+            print(f"{name:<24}{before:>10.3f}ms{summary['cpu_ms']:>10.3f}ms{summary['cpu_ms'] - before:>10.3f}ms")
+
+    return {
+        "environment": environment(),
+        "config": {key: value for key, value in vars(args).items() if key != "out"},
+        "sizes": {str(args.size): {"scenarios": results}},
+        "overhead": overhead,
+    }
+
+
+def parse_args(argv: List[str]) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Measure the per-request cost of metrics and Server-Timing.")
+    parser.add_argument("--size", type=int, default=5000, help="Total posts in the benchmark database.")
+    parser.add_argument("--requests", type=int, default=2000, help="Timed requests per scenario.")
+    parser.add_argument("--warmup", type=int, default=100, help="Untimed requests before each scenario.")
+    parser.add_argument("--db", default="blogger_bench", help="Benchmark database, created if missing.")
+    parser.add_argument("--content-dir", default="/tmp/blogger_bench_posts", help="Generated markdown pool.")
+    parser.add_argument("--files", type=int, default=500, help="Distinct markdown files in the pool.")
+    parser.add_argument("--out", default=None, help="JSON results path (default: benchmarks/results/instrumentation-<commit>.json).")
+    return parser.parse_args(argv)
+
+
+if __name__ == "__main__":
+    args = parse_args(sys.argv[1:])
+
+    # Settings are read once, so the overrides go in before the app is imported.
+    os.environ["BLOGGER_DB_NAME"] = args.db
+    os.environ["BLOGGER_RENDER_CACHE_DIR"] = ""
+
+    started = time.perf_counter()
+    payload = asyncio.run(run(args))
+
+    from benchmarks.stats import write_results
+    out = args.out or os.path.join("benchmarks", "results", f"instrumentation-{payload['environment']['commit'] or 'local'}.json")
+    write_results(out, payload)
+    print(f"\n--- Results written to {out} in {time.perf_counter() - started:.1f}s ---")
@@ -0,0 +1,124 @@
+"""
+SQL function calls vs prepared inline statements for the repository reads.
+
+Runs every read of AsyncBlogRepository twice against the benchmark database,
+once through the fn_get_* functions and once through the prepared
+statements of app/gateways/postgres/queries.py, and reports the speedup:
+
+    python -m benchmarks.query_layer --size 50000
+
+The database is grown to --size with the read_paths.py dataset first.
+Results keep the read_paths.py layout, so benchmarks.compare works on them.
+"""
+import argparse
+import asyncio
+import os
+import sys
+import time
+from typing import Any, Callable, Dict, List
+
+
+def scenarios(repository, sample: List[Dict[str, Any]], published: int, limit: int) -> Dict[str, Callable[[int], Any]]:
+    from app.enums.enums import BlogState
+    from app.utils.slugify import permalink_key
+
+    permalinks = [
+        permalink_key(row['dates']['published_at'], row['dates']['created_at'], row['title']).split("/", 3)
+        for row in sample
+    ]
+    cursors = [
+        {"published_at": row['dates']['published_at'], "created_at": row['dates']['created_at'], "id": row['id']}
+        for row in sample
+    ]
+    middle = max(1, published // limit // 2)
+
+    async def found(result) -> bool:
+        return bool(await result)
+
+    return {
+        "by_id": lambda i: found(repository.get_by_id(sample[i % len(sample)]['id'])),
+        "by_permalink": lambda i: found(repository.get_by_permalink(*permalinks[i % len(permalinks)])),
+        "render": lambda i: repository.get_render(sample[i % len(sample)]['id']),
+        "page_first": lambda i: repository.get_page(1, limit, BlogState.PUBLISHED),
+        "page_middle": lambda i: repository.get_page(middle, limit, BlogState.PUBLISHED),
+        "keyset_next": lambda i: repository.get_keyset_page(limit, BlogState.PUBLISHED, cursors[i % len(cursors)]),
+        "count": lambda i: repository.count(BlogState.PUBLISHED),
+    }
+
+
+async def run(args: argparse.Namespace) -> Dict[str, Any]:
+    from app.config import get_settings
+    from app.enums.enums import BlogState
+    from app.gateways.postgres.async_client import AsyncPostgresClient
+    from app.repositories.blog import AsyncBlogRepository
+    from benchmarks.dataset import BenchDataset
+    from benchmarks.stats import environment, measure_async, print_table
+
+    settings = get_settings()
+    dataset = BenchDataset(settings, args.content_dir, files=args.files)
+    dataset.prepare()
+    dataset.grow_to(args.size)
+    published = dataset.published_count()
+
+    client = AsyncPostgresClient(
+        dbname=settings.BLOGGER_DB_NAME,
+        user=settings.BLOGGER_DB_USER,
+        password=settings.BLOGGER_DB_PASS,
+        host=settings.BLOGGER_DB_HOST,
+        port=settings.BLOGGER_DB_PORT,
+    )
+    await client.open()
+    try:
+        sample = (await AsyncBlogRepository(client, prepared=False).get_page(1, args.sample, BlogState.PUBLISHED))["blogs"]
+        results = {}
+        for path in ("fn", "prepared"):
+            repository = AsyncBlogRepository(client, prepared=path == "prepared")
+            for name, call in scenarios(repository, sample, published, args.limit).items():
+                results[f"{path}/{name}"] = await measure_async(call, args.requests, warmup=args.warmup)
+    finally:
+        await client.close_all()
+
+    print_table(f"{args.size} posts ({published} published)", results)
+    speedup = {}
+    for key, summary in results.items():
+        path, name = key.split("/", 1)
+        if path == "prepared":
+            before = results[f"fn/{name}"]
+            speedup[name] = {metric: before[metric] / summary[metric] if summary[metric] else 0.0 for metric in ("p50_ms", "mean_ms")}
+    print(f"\n{'speedup':<24}{'p50':>10}{'mean':>10}")
+    for name, ratio in speedup.items():
+        print(f"{name:<24}{ratio['p50_ms']:>9.2f}x{ratio['mean_ms']:>9.2f}x")
+
+    return {
+        "environment": environment(),
+        "config": {key: value for key, value in vars(args).items() if key != "out"},
+        "sizes": {str(args.size): {"published": published, "scenarios": results}},
+        "speedup": speedup,
+    }
+
+
+def parse_args(argv: List[str]) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Compare the SQL function and prepared statement read paths.")
+    parser.add_argument("--size", type=int, default=50000, help="Total posts in the benchmark database.")
+    parser.add_argument("--requests", type=int, default=2000, help="Timed calls per scenario.")
+    parser.add_argument("--warmup", type=int, default=100, help="Untimed calls before each scenario.")
+    parser.add_argument("--limit", type=int, default=7, help="Page size of the listing scenarios.")
+    parser.add_argument("--sample", type=int, default=100, help="Published posts the lookups cycle through.")
+    parser.add_argument("--db", default="blogger_bench", help="Benchmark database, created if missing.")
+    parser.add_argument("--content-dir", default="/tmp/blogger_bench_posts", help="Generated markdown pool.")
+    parser.add_argument("--files", type=int, default=500, help="Distinct markdown files in the pool.")
+    parser.add_argument("--out", default=None, help="JSON results path (default: benchmarks/results/query_layer-<commit>.json).")
+    return parser.parse_args(argv)
+
+
+if __name__ == "__main__":
+    args = parse_args(sys.argv[1:])
+    os.environ["BLOGGER_DB_NAME"] = args.db
+
+    started = time.perf_counter()
+    payload = asyncio.run(run(args))
+
+    from benchmarks.stats import write_results
+    out = args.out or os.path.join("benchmarks", "results", f"query_layer-{payload['environment']['commit'] or 'local'}.json")
+    write_results(out, payload)
+    print(f"\n--- Results written to {out} in {time.perf_counter() - started:.1f}s ---")
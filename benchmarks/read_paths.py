@@ -0,0 +1,140 @@
+"""
+Read-path benchmarks at several dataset sizes.
+
+Seeds a dedicated database (BLOGGER_DB_NAME is overridden, default
+"blogger_bench") with the populate_database.py generators, then drives the
+app in-process through httpx's ASGI transport:
+
+    python -m benchmarks.read_paths --sizes 5000 50000 500000 \\
+        --out benchmarks/results/$(git rev-parse --short HEAD).json
+    python -m benchmarks.compare benchmarks/results/OLD.json benchmarks/results/NEW.json
+
+Connection settings (host, user, password) come from the usual BLOGGER_DB_*
+environment variables / .env file.
+"""
+import argparse
+import asyncio
+import os
+import sys
+import time
+from typing import Any, Dict, List
+
+
+async def bench_size(app, dataset, args: argparse.Namespace) -> Dict[str, Any]:
+    import httpx
+    from app.utils.http_cache import get_validator_cache
+    from app.utils.page_cache import get_page_cache
+    from app.utils.render_cache import get_render_cache
+
+    published = dataset.published_count()
+    last_page = max(1, (published + args.limit - 1) // args.limit)
+    hot_permalink = dataset.sample_permalinks(1)[0]
+    cold_permalinks = dataset.sample_permalinks(args.requests + args.warmup, unrendered=True)
+    headers = {"accept": "text/html"} if args.html else {}
+
+    def drop_caches(_: int) -> None:
+        get_render_cache().clear()
+        get_validator_cache().clear()
+        get_page_cache().clear()
+
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        async def get(url: str) -> bool:
+            response = await client.get(url, headers=headers)
+            return response.status_code == 200
+
+        def page(number: int):
+            return lambda _: get(f"/blogs/?page={number}&limit={args.limit}")
+
+        scenarios = {
+            "page_first": page(1),
+            "page_middle": page(max(1, last_page // 2)),
+            "page_last": page(last_page),
+            "permalink_hot": lambda _: get(f"/blogs/{hot_permalink}"),
+        }
+
+        from benchmarks.stats import measure_async
+        results = {}
+        for name, call in scenarios.items():
+            results[name] = await measure_async(call, args.requests, warmup=args.warmup)
+
+        if len(cold_permalinks) >= args.requests + args.warmup:
+            results["permalink_cold"] = await measure_async(
+                lambda i: get(f"/blogs/{cold_permalinks[i % len(cold_permalinks)]}"),
+                args.requests, before=drop_caches,
+            )
+        else:
+            print(f"Skipping permalink_cold: only {len(cold_permalinks)} unrendered posts left, use --reset")
+
+    return {"published": published, "pages": last_page, "scenarios": results}
+
+
+def bench_markdown(dataset, args: argparse.Namespace) -> Dict[str, Any]:
+    from app.utils.markdown import MarkdownRenderer
+    from benchmarks.stats import measure
+
+    sources = []
+    for path in dataset.content_files():
+        with open(path, "r", encoding="utf-8") as f:
+            sources.append(f.read())
+    return measure(lambda i: MarkdownRenderer.render(sources[i % len(sources)]), args.requests, warmup=args.warmup)
+
+
+async def run(args: argparse.Namespace) -> Dict[str, Any]:
+    from app.config import get_settings
+    from benchmarks.dataset import BenchDataset
+    from benchmarks.stats import environment, print_table
+    import main
+
+    settings = get_settings()
+    dataset = BenchDataset(settings, args.content_dir, files=args.files)
+    dataset.prepare(reset=args.reset)
+
+    payload = {
+        "environment": environment(),
+        "config": {key: value for key, value in vars(args).items() if key != "out"},
+        "markdown_render": bench_markdown(dataset, args),
+        "sizes": {},
+    }
+    print_table("MarkdownRenderer.render", {"render": payload["markdown_render"]})
+
+    for size in sorted(args.sizes):
+        seeded = dataset.grow_to(size)
+        async with main.lifespan(main.app):
+            result = await bench_size(main.app, dataset, args)
+        result["seed_seconds"] = seeded
+        payload["sizes"][str(size)] = result
+        print_table(f"{size} posts ({result['published']} published, seeded in {seeded:.1f}s)", result["scenarios"])
+
+    return payload
+
+
+def parse_args(argv: List[str]) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Benchmark the blog read paths at several dataset sizes.")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[5000, 50000, 500000], help="Total posts per round.")
+    parser.add_argument("--requests", type=int, default=200, help="Timed requests per scenario.")
+    parser.add_argument("--warmup", type=int, default=20, help="Untimed requests before each scenario.")
+    parser.add_argument("--limit", type=int, default=7, help="Page size of the listing scenarios.")
+    parser.add_argument("--html", action="store_true", help="Request text/html instead of JSON.")
+    parser.add_argument("--db", default="blogger_bench", help="Benchmark database, created if missing.")
+    parser.add_argument("--content-dir", default="/tmp/blogger_bench_posts", help="Generated markdown pool.")
+    parser.add_argument("--files", type=int, default=500, help="Distinct markdown files in the pool.")
+    parser.add_argument("--reset", action="store_true", help="Truncate the benchmark database first.")
+    parser.add_argument("--out", default=None, help="JSON results path (default: benchmarks/results/<commit>.json).")
+    return parser.parse_args(argv)
+
+
+if __name__ == "__main__":
+    args = parse_args(sys.argv[1:])
+
+    # Settings are read once, so the overrides go in before the app is imported.
+    os.environ["BLOGGER_DB_NAME"] = args.db
+    os.environ["BLOGGER_RENDER_CACHE_DIR"] = ""
+
+    started = time.perf_counter()
+    payload = asyncio.run(run(args))
+
+    from benchmarks.stats import write_results
+    out = args.out or os.path.join("benchmarks", "results", f"{payload['environment']['commit'] or 'local'}.json")
+    write_results(out, payload)
+    print(f"\n--- Results written to {out} in {time.perf_counter() - started:.1f}s ---")
@@ -0,0 +1,105 @@
+"""
+CPU per request of the JSON listing and by-id endpoints, with and without
+BLOGGER_FAST_JSON (rows encoded directly vs Blog.Schema + response model +
+FastAPI serialization):
+
+    python -m benchmarks.serialization --limits 7 100
+
+CPU is process time, so waiting on Postgres is left out and the difference
+between the two modes is what validation and encoding cost. Uses the
+read_paths.py benchmark database and results layout.
+"""
+import argparse
+import asyncio
+import os
+import sys
+import time
+from typing import Any, Dict, List
+
+
+async def bench(app, args: argparse.Namespace) -> Dict[str, Dict[str, Any]]:
+    import httpx
+    from app.config import get_settings
+    from benchmarks.stats import measure_async
+
+    settings = get_settings()
+    transport = httpx.ASGITransport(app=app)
+    results = {}
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        first = (await client.get("/blogs/?limit=1")).json()["blogs"][0]["id"]
+        urls = {f"page_{limit}": f"/blogs/?page=1&limit={limit}" for limit in args.limits}
+        urls.update({f"cursor_{limit}": f"/blogs/?cursor=&limit={limit}" for limit in args.limits})
+        urls["by_id"] = f"/blogs/{first}"
+
+        for mode in ("validated", "fast"):
+            settings.BLOGGER_FAST_JSON = mode == "fast"
+            for name, url in urls.items():
+                async def get(_: int) -> bool:
+                    return (await client.get(url)).status_code == 200
+
+                started = time.process_time()
+                summary = await measure_async(get, args.requests, warmup=args.warmup)
+                # Warmup calls are included in the process time, so divide by all of them.
+                summary["cpu_ms"] = (time.process_time() - started) / (args.requests + args.warmup) * 1000
+                results[f"{mode}/{name}"] = summary
+    return results
+
+
+async def run(args: argparse.Namespace) -> Dict[str, Any]:
+    from app.config import get_settings
+    from benchmarks.dataset import BenchDataset
+    from benchmarks.stats import environment, print_table
+    import main
+
+    dataset = BenchDataset(get_settings(), args.content_dir, files=args.files)
+    dataset.prepare()
+    dataset.grow_to(args.size)
+
+    async with main.lifespan(main.app):
+        results = await bench(main.app, args)
+
+    print_table(f"{args.size} posts", results)
+    saved = {}
+    print(f"\n{'cpu per request':<24}{'validated':>12}{'fast':>12}{'saved':>12}")
+    for key, summary in results.items():
+        mode, name = key.split("/", 1)
+        if mode == "fast":
+            before = results[f"validated/{name}"]["cpu_ms"]
+            saved[name] = {"validated_cpu_ms": before, "fast_cpu_ms": summary["cpu_ms"], "saved_cpu_ms": before - summary["cpu_ms"]}
+            print(f"{name:<24}{before:>10.3f}ms{summary['cpu_ms']:>10.3f}ms{before - summary['cpu_ms']:>10.3f}ms")
+
+    return {
+        "environment": environment(),
+        "config": {key: value for key, value in vars(args).items() if key != "out"},
+        "sizes": {str(args.size): {"scenarios": results}},
+        "cpu_saved": saved,
+    }
+
+
+def parse_args(argv: List[str]) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Measure CPU per request of the fast JSON path.")
+    parser.add_argument("--size", type=int, default=5000, help="Total posts in the benchmark database.")
+    parser.add_argument("--limits", type=int, nargs="+", default=[7, 100], help="Page sizes to request.")
+    parser.add_argument("--requests", type=int, default=500, help="Timed requests per scenario.")
+    parser.add_argument("--warmup", type=int, default=50, help="Untimed requests before each scenario.")
+    parser.add_argument("--db", default="blogger_bench", help="Benchmark database, created if missing.")
+    parser.add_argument("--content-dir", default="/tmp/blogger_bench_posts", help="Generated markdown pool.")
+    parser.add_argument("--files", type=int, default=500, help="Distinct markdown files in the pool.")
+    parser.add_argument("--out", default=None, help="JSON results path (default: benchmarks/results/serialization-<commit>.json).")
+    return parser.parse_args(argv)
+
+
+if __name__ == "__main__":
+    args = parse_args(sys.argv[1:])
+
+    # Settings are read once, so the overrides go in before the app is imported.
+    os.environ["BLOGGER_DB_NAME"] = args.db
+    os.environ["BLOGGER_RENDER_CACHE_DIR"] = ""
+
+    started = time.perf_counter()
+    payload = asyncio.run(run(args))
+
+    from benchmarks.stats import write_results
+    out = args.out or os.path.join("benchmarks", "results", f"serialization-{payload['environment']['commit'] or 'local'}.json")
+    write_results(out, payload)
+    print(f"\n--- Results written to {out} in {time.perf_counter() - started:.1f}s ---")
@@ -0,0 +1,94 @@
+import json
+import os
+import platform
+import subprocess
+import time
+from datetime import datetime, timezone
+from typing import Any, Callable, Dict, List, Optional
+
+
+def percentile(ordered: List[float], q: float) -> float:
+    # Linear interpolation between closest ranks, same as numpy's default.
+    if not ordered:
+        return 0.0
+    position = (len(ordered) - 1) * q
+    lower = int(position)
+    upper = min(lower + 1, len(ordered) - 1)
+    return ordered[lower] + (ordered[upper] - ordered[lower]) * (position - lower)
+
+
+def summarize(samples: List[float], errors: int = 0) -> Dict[str, Any]:
+    """Latency percentiles in milliseconds; rps is sequential throughput (n / busy time)."""
+    ordered = sorted(samples)
+    busy = sum(ordered)
+    return {
+        "n": len(ordered),
+        "errors": errors,
+        "p50_ms": percentile(ordered, 0.50) * 1000,
+        "p95_ms": percentile(ordered, 0.95) * 1000,
+        "p99_ms": percentile(ordered, 0.99) * 1000,
+        "mean_ms": busy / len(ordered) * 1000 if ordered else 0.0,
+        "max_ms": ordered[-1] * 1000 if ordered else 0.0,
+        "rps": len(ordered) / busy if busy > 0 else 0.0,
+    }
+
+
+def measure(call: Callable[[int], Any], n: int, warmup: int = 0, before: Optional[Callable[[int], None]] = None) -> Dict[str, Any]:
+    """Times n sequential calls; before(i) runs untimed ahead of each one (e.g. to drop caches)."""
+    for i in range(warmup):
+        call(i)
+
+    samples, errors = [], 0
+    for i in range(n):
+        if before:
+            before(i)
+        started = time.perf_counter()
+        ok = call(i)
+        samples.append(time.perf_counter() - started)
+        errors += ok is False
+    return summarize(samples, errors)
+
+
+async def measure_async(call: Callable[[int], Any], n: int, warmup: int = 0, before: Optional[Callable[[int], None]] = None) -> Dict[str, Any]:
+    for i in range(warmup):
+        await call(i)
+
+    samples, errors = [], 0
+    for i in range(n):
+        if before:
+            before(i)
+        started = time.perf_counter()
+        ok = await call(i)
+        samples.append(time.perf_counter() - started)
+        errors += ok is False
+    return summarize(samples, errors)
+
+
+def environment() -> Dict[str, Any]:
+    def git(*args: str) -> Optional[str]:
+        try:
+            return subprocess.run(["git", *args], capture_output=True, text=True, check=True).stdout.strip()
+        except (OSError, subprocess.CalledProcessError):
+            return None
+
+    return {
+        "commit": git("rev-parse", "--short", "HEAD"),
+        "dirty": bool(git("status", "--porcelain", "--untracked-files=no")),
+        "recorded_at": datetime.now(timezone.utc).isoformat(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "cpus": os.cpu_count(),
+    }
+
+
+def write_results(path: str, payload: Dict[str, Any]) -> None:
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(payload, f, indent=2)
+
+
+def print_table(title: str, scenarios: Dict[str, Dict[str, Any]]) -> None:
+    print(f"\n{title}")
+    print(f"{'scenario':<24}{'n':>6}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}{'rps':>10}{'errors':>8}")
+    for name, s in scenarios.items():
+        print(f"{name:<24}{s['n']:>6}{s['p50_ms']:>10.3f}{s['p95_ms']:>10.3f}{s['p99_ms']:>10.3f}{s['rps']:>10.0f}{s['errors']:>8}")
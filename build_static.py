@@ -0,0 +1,29 @@
+import argparse
+import time
+
+from app.config import get_settings
+from app.utils.compression import CODECS
+from app.utils.static_assets import StaticAssets
+
+
+def build_static(source_dir: str, build_dir: str) -> None:
+    assets = StaticAssets(directory=source_dir, build_dir=build_dir, max_age=get_settings().BLOGGER_STATIC_MAX_AGE)
+
+    started = time.perf_counter()
+    summary = assets.build()
+    elapsed = time.perf_counter() - started
+
+    print(f"--- {summary['files']} static files ({summary['built']} rebuilt) into {build_dir} in {elapsed:.2f}s ---")
+    print(f"Encodings: {', '.join(CODECS)}")
+    for encoding, size in summary["encoded"].items():
+        print(f"{encoding}: {summary['bytes']} -> {size} bytes ({size / summary['bytes']:.0%})")
+
+
+if __name__ == "__main__":
+    settings = get_settings()
+    parser = argparse.ArgumentParser(description="Hash and precompress static files ahead of a deploy; the app builds them at startup otherwise.")
+    parser.add_argument("--source", default=settings.BLOGGER_STATIC_DIR, help="Static files directory.")
+    parser.add_argument("--out", default=settings.BLOGGER_STATIC_BUILD_DIR, help="Build directory.")
+    args = parser.parse_args()
+
+    build_static(args.source, args.out)
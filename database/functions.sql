@@ -7,6 +7,27 @@ EXCEPTION
 END $$;
 
 
+-- Mirrors app/utils/slugify.py, keep both in sync.
+CREATE OR REPLACE FUNCTION fn_slugify(p_text TEXT)
+RETURNS TEXT AS $$
+    SELECT TRIM(BOTH '-' FROM REGEXP_REPLACE(
+        REGEXP_REPLACE(LOWER(p_text), '[^a-z0-9\s-]', '', 'g'),
+        '[-\s]+', '-', 'g'
+    ));
+$$ LANGUAGE sql IMMUTABLE;
+
+
+-- Mirrors Blog.Schema.permalink_key: "YYYY/MM/DD/slug".
+CREATE OR REPLACE FUNCTION fn_permalink_key(
+    p_published_at TIMESTAMP WITH TIME ZONE,
+    p_created_at TIMESTAMP WITH TIME ZONE,
+    p_title TEXT
+)
+RETURNS TEXT AS $$
+    SELECT TO_CHAR(COALESCE(p_published_at, p_created_at), 'YYYY/MM/DD') || '/' || fn_slugify(p_title);
+$$ LANGUAGE sql STABLE;
+
+
 CREATE OR REPLACE FUNCTION fn_enforce_published_date()
 RETURNS TRIGGER AS $$
 BEGIN
@@ -15,6 +36,7 @@ BEGIN
     END IF;
 
     NEW.last_update := CURRENT_TIMESTAMP;
+    NEW.permalink_key := fn_permalink_key(NEW.published_at, NEW.created_at, NEW.title);
 
     RETURN NEW;
 END;
@@ -37,7 +59,8 @@ RETURNS TABLE (
     id VARCHAR, title TEXT, category VARCHAR, keywords TEXT[], 
     created_at TIMESTAMP WITH TIME ZONE, published_at TIMESTAMP WITH TIME ZONE, 
     last_update TIMESTAMP WITH TIME ZONE, content_file TEXT, 
-    "references" TEXT[], state blog_state, total_count BIGINT
+    "references" TEXT[], state blog_state,
+    word_count INTEGER, reading_time INTEGER, content_size BIGINT, total_count BIGINT
 ) AS $$
 BEGIN
     RETURN QUERY
@@ -45,7 +68,8 @@ BEGIN
         SELECT 
             b.id, b.title, b.category, b.keywords, 
             b.created_at, b.published_at, b.last_update, 
-            b.content_file, b."references", b.state 
+            b.content_file, b."references", b.state,
+            b.word_count, b.reading_time, b.content_size
         FROM blogs b
         WHERE (p_state IS NULL OR b.state = p_state)
     ),
@@ -54,25 +78,171 @@ BEGIN
     )
     SELECT f.*, t.total
     FROM filtered f, total_count_val t
-    ORDER BY f.published_at DESC NULLS LAST, f.created_at DESC
+    ORDER BY f.published_at DESC NULLS LAST, f.created_at DESC, f.id DESC
     LIMIT p_limit OFFSET p_offset;
 END;
 $$ LANGUAGE plpgsql;
 
 
+CREATE OR REPLACE FUNCTION fn_count_blogs(p_state blog_state DEFAULT NULL)
+RETURNS BIGINT AS $$
+    SELECT count(*) FROM blogs b WHERE (p_state IS NULL OR b.state = p_state);
+$$ LANGUAGE sql STABLE;
+
+
+-- Every blog in listing order. A single-statement SQL function is inlined into
+-- the calling query, so a cursor over it streams rows instead of materializing
+-- the whole result first (as RETURN QUERY does).
+CREATE OR REPLACE FUNCTION fn_get_all_blogs(p_state blog_state DEFAULT NULL)
+RETURNS TABLE (
+    id VARCHAR, title TEXT, category VARCHAR, keywords TEXT[], 
+    created_at TIMESTAMP WITH TIME ZONE, published_at TIMESTAMP WITH TIME ZONE, 
+    last_update TIMESTAMP WITH TIME ZONE, content_file TEXT, 
+    "references" TEXT[], state blog_state,
+    word_count INTEGER, reading_time INTEGER, content_size BIGINT
+) AS $$
+    SELECT 
+        b.id, b.title, b.category, b.keywords, 
+        b.created_at, b.published_at, b.last_update, 
+        b.content_file, b."references", b.state,
+        b.word_count, b.reading_time, b.content_size
+    FROM blogs b
+    WHERE (p_state IS NULL OR b.state = p_state)
+    ORDER BY b.published_at DESC NULLS LAST, b.created_at DESC, b.id DESC;
+$$ LANGUAGE sql STABLE;
+
+
+-- Keyset pagination over (published_at DESC NULLS LAST, created_at DESC, id DESC).
+-- The cursor is the (published_at, created_at, id) of the boundary row; a NULL p_id
+-- returns the first page. With p_before the rows preceding the cursor are returned,
+-- still in listing order. p_category and p_keyword narrow it to one category or
+-- to posts tagged with a keyword (idx_blogs_category, idx_blogs_keywords).
+CREATE OR REPLACE FUNCTION fn_get_keyset_blogs(
+    p_state blog_state DEFAULT NULL,
+    p_limit INTEGER DEFAULT 10,
+    p_published_at TIMESTAMP WITH TIME ZONE DEFAULT NULL,
+    p_created_at TIMESTAMP WITH TIME ZONE DEFAULT NULL,
+    p_id VARCHAR DEFAULT NULL,
+    p_before BOOLEAN DEFAULT FALSE,
+    p_category VARCHAR DEFAULT NULL,
+    p_keyword TEXT DEFAULT NULL
+)
+RETURNS TABLE (
+    id VARCHAR, title TEXT, category VARCHAR, keywords TEXT[], 
+    created_at TIMESTAMP WITH TIME ZONE, published_at TIMESTAMP WITH TIME ZONE, 
+    last_update TIMESTAMP WITH TIME ZONE, content_file TEXT, 
+    "references" TEXT[], state blog_state,
+    word_count INTEGER, reading_time INTEGER, content_size BIGINT
+) AS $$
+BEGIN
+    IF p_id IS NULL THEN
+        RETURN QUERY
+        SELECT 
+            b.id, b.title, b.category, b.keywords, 
+            b.created_at, b.published_at, b.last_update, 
+            b.content_file, b."references", b.state,
+            b.word_count, b.reading_time, b.content_size
+        FROM blogs b
+        WHERE (p_state IS NULL OR b.state = p_state)
+          AND (p_category IS NULL OR b.category = p_category)
+          AND (p_keyword IS NULL OR b.keywords @> ARRAY[p_keyword])
+        ORDER BY b.published_at DESC NULLS LAST, b.created_at DESC, b.id DESC
+        LIMIT p_limit;
+
+    ELSIF NOT p_before THEN
+        -- Dated rows and undated (NULLS LAST) rows are scanned separately so
+        -- each branch stays a plain index range scan.
+        RETURN QUERY
+        SELECT page.* FROM (
+            (SELECT 
+                b.id, b.title, b.category, b.keywords, 
+                b.created_at, b.published_at, b.last_update, 
+                b.content_file, b."references", b.state,
+                b.word_count, b.reading_time, b.content_size
+            FROM blogs b
+            WHERE (p_state IS NULL OR b.state = p_state)
+              AND (p_category IS NULL OR b.category = p_category)
+              AND (p_keyword IS NULL OR b.keywords @> ARRAY[p_keyword])
+              AND p_published_at IS NOT NULL
+              AND (b.published_at, b.created_at, b.id) < (p_published_at, p_created_at, p_id)
+            ORDER BY b.published_at DESC, b.created_at DESC, b.id DESC
+            LIMIT p_limit)
+            UNION ALL
+            (SELECT 
+                b.id, b.title, b.category, b.keywords, 
+                b.created_at, b.published_at, b.last_update, 
+                b.content_file, b."references", b.state,
+                b.word_count, b.reading_time, b.content_size
+            FROM blogs b
+            WHERE (p_state IS NULL OR b.state = p_state)
+              AND (p_category IS NULL OR b.category = p_category)
+              AND (p_keyword IS NULL OR b.keywords @> ARRAY[p_keyword])
+              AND b.published_at IS NULL
+              AND (p_published_at IS NOT NULL OR (b.created_at, b.id) < (p_created_at, p_id))
+            ORDER BY b.created_at DESC, b.id DESC
+            LIMIT p_limit)
+        ) page
+        ORDER BY page.published_at DESC NULLS LAST, page.created_at DESC, page.id DESC
+        LIMIT p_limit;
+
+    ELSE
+        RETURN QUERY
+        SELECT nearest.* FROM (
+            SELECT page.* FROM (
+                (SELECT 
+                    b.id, b.title, b.category, b.keywords, 
+                    b.created_at, b.published_at, b.last_update, 
+                    b.content_file, b."references", b.state,
+                    b.word_count, b.reading_time, b.content_size
+                FROM blogs b
+                WHERE (p_state IS NULL OR b.state = p_state)
+                  AND (p_category IS NULL OR b.category = p_category)
+                  AND (p_keyword IS NULL OR b.keywords @> ARRAY[p_keyword])
+                  AND b.published_at IS NOT NULL
+                  AND (p_published_at IS NULL
+                       OR (b.published_at, b.created_at, b.id) > (p_published_at, p_created_at, p_id))
+                ORDER BY b.published_at ASC, b.created_at ASC, b.id ASC
+                LIMIT p_limit)
+                UNION ALL
+                (SELECT 
+                    b.id, b.title, b.category, b.keywords, 
+                    b.created_at, b.published_at, b.last_update, 
+                    b.content_file, b."references", b.state,
+                    b.word_count, b.reading_time, b.content_size
+                FROM blogs b
+                WHERE (p_state IS NULL OR b.state = p_state)
+                  AND (p_category IS NULL OR b.category = p_category)
+                  AND (p_keyword IS NULL OR b.keywords @> ARRAY[p_keyword])
+                  AND p_published_at IS NULL
+                  AND b.published_at IS NULL
+                  AND (b.created_at, b.id) > (p_created_at, p_id)
+                ORDER BY b.created_at ASC, b.id ASC
+                LIMIT p_limit)
+            ) page
+            ORDER BY page.published_at ASC NULLS FIRST, page.created_at ASC, page.id ASC
+            LIMIT p_limit
+        ) nearest
+        ORDER BY nearest.published_at DESC NULLS LAST, nearest.created_at DESC, nearest.id DESC;
+    END IF;
+END;
+$$ LANGUAGE plpgsql;
+
+
 CREATE OR REPLACE FUNCTION fn_get_blog_by_id(p_id VARCHAR)
 RETURNS TABLE (
     id VARCHAR, title TEXT, category VARCHAR, keywords TEXT[], 
     created_at TIMESTAMP WITH TIME ZONE, published_at TIMESTAMP WITH TIME ZONE, 
     last_update TIMESTAMP WITH TIME ZONE, content_file TEXT, 
-    "references" TEXT[], state blog_state
+    "references" TEXT[], state blog_state,
+    word_count INTEGER, reading_time INTEGER, content_size BIGINT
 ) AS $$
 BEGIN
     RETURN QUERY 
     SELECT 
         b.id, b.title, b.category, b.keywords, 
         b.created_at, b.published_at, b.last_update, 
-        b.content_file, b."references", b.state 
+        b.content_file, b."references", b.state,
+        b.word_count, b.reading_time, b.content_size
     FROM blogs b 
     WHERE b.id = p_id;
 END;
@@ -86,19 +256,18 @@ RETURNS TABLE (
     id VARCHAR, title TEXT, category VARCHAR, keywords TEXT[], 
     created_at TIMESTAMP WITH TIME ZONE, published_at TIMESTAMP WITH TIME ZONE, 
     last_update TIMESTAMP WITH TIME ZONE, content_file TEXT, 
-    "references" TEXT[], state blog_state
+    "references" TEXT[], state blog_state,
+    word_count INTEGER, reading_time INTEGER, content_size BIGINT
 ) AS $$
 BEGIN
     RETURN QUERY 
     SELECT 
         b.id, b.title, b.category, b.keywords, 
         b.created_at, b.published_at, b.last_update, 
-        b.content_file, b."references", b.state 
+        b.content_file, b."references", b.state,
+        b.word_count, b.reading_time, b.content_size
     FROM blogs b 
-    WHERE TO_CHAR(COALESCE(b.published_at, b.created_at), 'YYYY') = p_year
-      AND TO_CHAR(COALESCE(b.published_at, b.created_at), 'MM') = p_month
-      AND TO_CHAR(COALESCE(b.published_at, b.created_at), 'DD') = p_day
-      AND TRIM(BOTH '-' FROM LOWER(REGEXP_REPLACE(b.title, '[^a-zA-Z0-9]+', '-', 'g'))) = LOWER(p_slug);
+    WHERE b.permalink_key = p_year || '/' || p_month || '/' || p_day || '/' || LOWER(p_slug);
 END;
 $$ LANGUAGE plpgsql;
 
@@ -107,27 +276,72 @@ CREATE OR REPLACE FUNCTION fn_add_blog(
     p_id VARCHAR, p_title TEXT, p_category VARCHAR, p_keywords TEXT[],
     p_created_at TIMESTAMP WITH TIME ZONE, p_published_at TIMESTAMP WITH TIME ZONE,
     p_last_update TIMESTAMP WITH TIME ZONE, p_content_file TEXT,
-    p_references TEXT[], p_state blog_state
+    p_references TEXT[], p_state blog_state,
+    p_word_count INTEGER DEFAULT NULL, p_reading_time INTEGER DEFAULT NULL,
+    p_content_size BIGINT DEFAULT NULL
 ) RETURNS VOID AS $$
 BEGIN
     INSERT INTO blogs (
         id, title, category, keywords, 
         created_at, published_at, last_update, 
-        content_file, "references", state
+        content_file, "references", state,
+        word_count, reading_time, content_size
     )
     VALUES (
         p_id, p_title, p_category, p_keywords, 
         p_created_at, p_published_at, p_last_update, 
-        p_content_file, p_references, p_state
+        p_content_file, p_references, p_state,
+        p_word_count, p_reading_time, p_content_size
     );
 END;
 $$ LANGUAGE plpgsql;
 
 
+-- Multi-row insert of a JSON array of blogs in one statement/transaction.
+-- Existing ids are skipped and reported with inserted = FALSE.
+CREATE OR REPLACE FUNCTION fn_add_blogs_bulk(p_blogs JSONB)
+RETURNS TABLE (blog_id VARCHAR, inserted BOOLEAN) AS $$
+BEGIN
+    RETURN QUERY
+    WITH input AS (
+        SELECT * FROM jsonb_to_recordset(p_blogs) AS r(
+            id VARCHAR, title TEXT, category VARCHAR, keywords TEXT[],
+            created_at TIMESTAMP WITH TIME ZONE, published_at TIMESTAMP WITH TIME ZONE,
+            last_update TIMESTAMP WITH TIME ZONE, content_file TEXT,
+            "references" TEXT[], state blog_state,
+            word_count INTEGER, reading_time INTEGER, content_size BIGINT
+        )
+    ),
+    added AS (
+        INSERT INTO blogs (
+            id, title, category, keywords, 
+            created_at, published_at, last_update, 
+            content_file, "references", state,
+            word_count, reading_time, content_size
+        )
+        SELECT 
+            i.id, i.title, i.category, i.keywords,
+            COALESCE(i.created_at, CURRENT_TIMESTAMP), i.published_at,
+            COALESCE(i.last_update, CURRENT_TIMESTAMP),
+            i.content_file, i."references", COALESCE(i.state, 'drafted'),
+            i.word_count, i.reading_time, i.content_size
+        FROM input i
+        ON CONFLICT (id) DO NOTHING
+        RETURNING blogs.id
+    )
+    SELECT i.id, a.id IS NOT NULL
+    FROM input i
+    LEFT JOIN added a ON a.id = i.id;
+END;
+$$ LANGUAGE plpgsql;
+
+
 CREATE OR REPLACE FUNCTION fn_update_blog(
     p_id VARCHAR, p_title TEXT, p_category VARCHAR, p_keywords TEXT[],
     p_published_at TIMESTAMP WITH TIME ZONE, p_content_file TEXT,
-    p_references TEXT[], p_state blog_state
+    p_references TEXT[], p_state blog_state,
+    p_word_count INTEGER DEFAULT NULL, p_reading_time INTEGER DEFAULT NULL,
+    p_content_size BIGINT DEFAULT NULL
 ) RETURNS VOID AS $$
 BEGIN
     UPDATE blogs SET
@@ -137,15 +351,409 @@ BEGIN
         published_at = p_published_at,
         content_file = p_content_file,
         "references" = p_references,
-        state = p_state
+        state = p_state,
+        word_count = p_word_count,
+        reading_time = p_reading_time,
+        content_size = p_content_size
     WHERE id = p_id;
 END;
 $$ LANGUAGE plpgsql;
 
 
+-- Bulk counterpart of fn_update_blog; returns the ids that were found and updated.
+CREATE OR REPLACE FUNCTION fn_update_blogs_bulk(p_blogs JSONB)
+RETURNS TABLE (blog_id VARCHAR) AS $$
+BEGIN
+    RETURN QUERY
+    UPDATE blogs b SET
+        title = i.title,
+        category = i.category,
+        keywords = i.keywords,
+        -- A source without a publish date keeps the stored one (and with it the permalink).
+        published_at = COALESCE(i.published_at, b.published_at),
+        content_file = i.content_file,
+        "references" = i."references",
+        state = i.state,
+        word_count = i.word_count,
+        reading_time = i.reading_time,
+        content_size = i.content_size
+    FROM jsonb_to_recordset(p_blogs) AS i(
+        id VARCHAR, title TEXT, category VARCHAR, keywords TEXT[],
+        published_at TIMESTAMP WITH TIME ZONE, content_file TEXT,
+        "references" TEXT[], state blog_state,
+        word_count INTEGER, reading_time INTEGER, content_size BIGINT
+    )
+    WHERE b.id = i.id
+    RETURNING b.id;
+END;
+$$ LANGUAGE plpgsql;
+
+
+-- Hides blogs whose source is gone without deleting their metadata.
+CREATE OR REPLACE FUNCTION fn_retire_blogs(p_ids VARCHAR[])
+RETURNS TABLE (blog_id VARCHAR) AS $$
+BEGIN
+    RETURN QUERY
+    UPDATE blogs b SET state = 'drafted'
+    WHERE b.id = ANY(p_ids) AND b.state <> 'drafted'
+    RETURNING b.id;
+END;
+$$ LANGUAGE plpgsql;
+
+
+-- Maps source files back to the blogs registered from them.
+CREATE OR REPLACE FUNCTION fn_get_blog_ids_by_content_files(p_files TEXT[])
+RETURNS TABLE (blog_id VARCHAR, content_file TEXT) AS $$
+BEGIN
+    RETURN QUERY
+    SELECT b.id, b.content_file FROM blogs b
+    WHERE b.content_file = ANY(p_files)
+    ORDER BY b.created_at DESC;
+END;
+$$ LANGUAGE plpgsql;
+
+
 CREATE OR REPLACE FUNCTION fn_delete_blog(p_id VARCHAR)
 RETURNS VOID AS $$
 BEGIN
     DELETE FROM blogs WHERE id = p_id;
 END;
 $$ LANGUAGE plpgsql;
+
+
+CREATE OR REPLACE FUNCTION fn_get_blog_render(p_blog_id VARCHAR)
+RETURNS TABLE (
+    content_hash CHAR(64), html TEXT, reading_time INTEGER, word_count INTEGER,
+    source_size BIGINT, source_mtime_ns BIGINT
+) AS $$
+BEGIN
+    RETURN QUERY
+    SELECT 
+        r.content_hash, r.html, r.reading_time, r.word_count,
+        r.source_size, r.source_mtime_ns
+    FROM blog_renders r
+    WHERE r.blog_id = p_blog_id;
+END;
+$$ LANGUAGE plpgsql;
+
+
+CREATE OR REPLACE FUNCTION fn_upsert_blog_render(
+    p_blog_id VARCHAR, p_content_hash CHAR(64), p_html TEXT,
+    p_reading_time INTEGER, p_word_count INTEGER,
+    p_source_size BIGINT, p_source_mtime_ns BIGINT
+) RETURNS VOID AS $$
+BEGIN
+    INSERT INTO blog_renders (
+        blog_id, content_hash, html, reading_time, word_count,
+        source_size, source_mtime_ns, rendered_at
+    )
+    VALUES (
+        p_blog_id, p_content_hash, p_html, p_reading_time, p_word_count,
+        p_source_size, p_source_mtime_ns, CURRENT_TIMESTAMP
+    )
+    ON CONFLICT (blog_id) DO UPDATE SET
+        content_hash = EXCLUDED.content_hash,
+        html = EXCLUDED.html,
+        reading_time = EXCLUDED.reading_time,
+        word_count = EXCLUDED.word_count,
+        source_size = EXCLUDED.source_size,
+        source_mtime_ns = EXCLUDED.source_mtime_ns,
+        rendered_at = EXCLUDED.rendered_at;
+END;
+$$ LANGUAGE plpgsql;
+
+
+-- Weighted search document: title (A), category and keywords (B), body (D).
+CREATE OR REPLACE FUNCTION fn_blog_document(
+    p_title TEXT, p_category TEXT, p_keywords TEXT[], p_body TEXT
+)
+RETURNS TSVECTOR AS $$
+    SELECT
+        SETWEIGHT(TO_TSVECTOR('english', COALESCE(p_title, '')), 'A') ||
+        SETWEIGHT(TO_TSVECTOR('english', COALESCE(p_category, '')), 'B') ||
+        SETWEIGHT(TO_TSVECTOR('english', COALESCE(ARRAY_TO_STRING(p_keywords, ' '), '')), 'B') ||
+        SETWEIGHT(TO_TSVECTOR('english', COALESCE(p_body, '')), 'D');
+$$ LANGUAGE sql IMMUTABLE;
+
+
+CREATE OR REPLACE FUNCTION fn_set_search_document()
+RETURNS TRIGGER AS $$
+BEGIN
+    SELECT fn_blog_document(b.title, b.category, b.keywords, NEW.body)
+    INTO NEW.document
+    FROM blogs b
+    WHERE b.id = NEW.blog_id;
+
+    RETURN NEW;
+END;
+$$ LANGUAGE plpgsql;
+
+
+DROP TRIGGER IF EXISTS trg_set_search_document ON blog_search;
+CREATE TRIGGER trg_set_search_document
+BEFORE INSERT OR UPDATE OF body ON blog_search
+FOR EACH ROW
+EXECUTE FUNCTION fn_set_search_document();
+
+
+-- Keeps the document current when the metadata it is built from changes.
+CREATE OR REPLACE FUNCTION fn_refresh_search_document()
+RETURNS TRIGGER AS $$
+BEGIN
+    UPDATE blog_search s
+    SET document = fn_blog_document(NEW.title, NEW.category, NEW.keywords, s.body)
+    WHERE s.blog_id = NEW.id;
+
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+
+DROP TRIGGER IF EXISTS trg_refresh_search_document ON blogs;
+CREATE TRIGGER trg_refresh_search_document
+AFTER UPDATE OF title, category, keywords ON blogs
+FOR EACH ROW
+WHEN (OLD.title IS DISTINCT FROM NEW.title
+    OR OLD.category IS DISTINCT FROM NEW.category
+    OR OLD.keywords IS DISTINCT FROM NEW.keywords)
+EXECUTE FUNCTION fn_refresh_search_document();
+
+
+CREATE OR REPLACE FUNCTION fn_upsert_blog_search(p_blog_id VARCHAR, p_body TEXT)
+RETURNS VOID AS $$
+BEGIN
+    INSERT INTO blog_search (blog_id, body, document)
+    VALUES (p_blog_id, p_body, ''::TSVECTOR)
+    ON CONFLICT (blog_id) DO UPDATE SET body = EXCLUDED.body
+    WHERE blog_search.body IS DISTINCT FROM EXCLUDED.body;
+END;
+$$ LANGUAGE plpgsql;
+
+
+CREATE OR REPLACE FUNCTION fn_upsert_blog_search_bulk(p_bodies JSONB)
+RETURNS VOID AS $$
+BEGIN
+    INSERT INTO blog_search (blog_id, body, document)
+    SELECT i.id, i.body, ''::TSVECTOR
+    FROM jsonb_to_recordset(p_bodies) AS i(id VARCHAR, body TEXT)
+    WHERE EXISTS (SELECT 1 FROM blogs b WHERE b.id = i.id)
+    ON CONFLICT (blog_id) DO UPDATE SET body = EXCLUDED.body
+    WHERE blog_search.body IS DISTINCT FROM EXCLUDED.body;
+END;
+$$ LANGUAGE plpgsql;
+
+
+-- Ranked search, paged by (rank, id) keyset. Snippets are only built for the returned page.
+CREATE OR REPLACE FUNCTION fn_search_blogs(
+    p_query TEXT,
+    p_state blog_state DEFAULT NULL,
+    p_limit INTEGER DEFAULT 10,
+    p_rank DOUBLE PRECISION DEFAULT NULL,
+    p_id VARCHAR DEFAULT NULL
+)
+RETURNS TABLE (
+    id VARCHAR, title TEXT, category VARCHAR, keywords TEXT[],
+    created_at TIMESTAMP WITH TIME ZONE, published_at TIMESTAMP WITH TIME ZONE,
+    last_update TIMESTAMP WITH TIME ZONE, content_file TEXT,
+    "references" TEXT[], state blog_state,
+    word_count INTEGER, reading_time INTEGER, content_size BIGINT, rank REAL, snippet TEXT
+) AS $$
+DECLARE
+    v_query TSQUERY := WEBSEARCH_TO_TSQUERY('english', p_query);
+BEGIN
+    RETURN QUERY
+    SELECT
+        b.id, b.title, b.category, b.keywords,
+        b.created_at, b.published_at, b.last_update,
+        b.content_file, b."references", b.state,
+        b.word_count, b.reading_time, b.content_size, hits.rank,
+        TS_HEADLINE('english', hits.body, v_query,
+            'StartSel=<mark>, StopSel=</mark>, MaxWords=35, MinWords=15, MaxFragments=2, FragmentDelimiter=" … "')
+    FROM (
+        SELECT s.blog_id, s.body, TS_RANK_CD(s.document, v_query) AS rank
+        FROM blog_search s
+        JOIN blogs sb ON sb.id = s.blog_id
+        WHERE s.document @@ v_query
+          AND (p_state IS NULL OR sb.state = p_state)
+          AND (p_rank IS NULL OR (TS_RANK_CD(s.document, v_query), s.blog_id) < (p_rank::REAL, p_id))
+        ORDER BY rank DESC, s.blog_id DESC
+        LIMIT p_limit
+    ) hits
+    JOIN blogs b ON b.id = hits.blog_id
+    ORDER BY hits.rank DESC, b.id DESC;
+END;
+$$ LANGUAGE plpgsql;
+
+
+-- Published post counts per category and keyword, largest first, at most
+-- p_limit of each kind. Read from blog_facets, which the triggers below keep current.
+CREATE OR REPLACE FUNCTION fn_get_blog_facets(p_kind VARCHAR DEFAULT NULL, p_limit INTEGER DEFAULT 100)
+RETURNS TABLE (kind VARCHAR, name TEXT, post_count INTEGER) AS $$
+    SELECT ranked.kind, ranked.name, ranked.post_count FROM (
+        SELECT f.kind, f.name, f.post_count,
+               ROW_NUMBER() OVER (PARTITION BY f.kind ORDER BY f.post_count DESC, f.name) AS position
+        FROM blog_facets f
+        WHERE (p_kind IS NULL OR f.kind = p_kind) AND f.post_count > 0
+    ) ranked
+    WHERE ranked.position <= p_limit
+    ORDER BY ranked.kind, ranked.post_count DESC, ranked.name;
+$$ LANGUAGE sql STABLE;
+
+
+-- Applies one statement's net facet changes: +1 per added name, -1 per removed
+-- one, one upsert per facet whose count actually moved. Rows are written in key
+-- order so concurrent writers lock shared facets in the same order.
+CREATE OR REPLACE FUNCTION fn_adjust_blog_facets(
+    p_added_categories TEXT[], p_added_keywords TEXT[],
+    p_removed_categories TEXT[], p_removed_keywords TEXT[]
+)
+RETURNS VOID AS $$
+    INSERT INTO blog_facets AS f (kind, name, post_count)
+    SELECT changes.kind, changes.name, SUM(changes.delta)
+    FROM (
+        SELECT 'category' AS kind, UNNEST(p_added_categories) AS name, 1 AS delta
+        UNION ALL SELECT 'keyword', UNNEST(p_added_keywords), 1
+        UNION ALL SELECT 'category', UNNEST(p_removed_categories), -1
+        UNION ALL SELECT 'keyword', UNNEST(p_removed_keywords), -1
+    ) changes
+    GROUP BY changes.kind, changes.name
+    HAVING SUM(changes.delta) <> 0
+    ORDER BY changes.kind, changes.name
+    ON CONFLICT (kind, name) DO UPDATE SET post_count = f.post_count + EXCLUDED.post_count;
+
+    DELETE FROM blog_facets f
+    WHERE f.post_count <= 0
+      AND ((f.kind = 'category' AND f.name = ANY(p_removed_categories))
+           OR (f.kind = 'keyword' AND f.name = ANY(p_removed_keywords)));
+$$ LANGUAGE sql;
+
+
+-- Statement-level, like fn_notify_blogs_changed: only published rows count, and
+-- an update is its old rows removed plus its new rows added, so updates that do
+-- not touch state, category or keywords cancel out without writing.
+CREATE OR REPLACE FUNCTION fn_update_blog_facets()
+RETURNS TRIGGER AS $$
+DECLARE
+    v_added_categories TEXT[] := '{}';
+    v_added_keywords TEXT[] := '{}';
+    v_removed_categories TEXT[] := '{}';
+    v_removed_keywords TEXT[] := '{}';
+BEGIN
+    IF TG_OP IN ('INSERT', 'UPDATE') THEN
+        SELECT COALESCE(ARRAY_AGG(n.category), '{}') INTO v_added_categories
+        FROM new_rows n WHERE n.state = 'published';
+        SELECT COALESCE(ARRAY_AGG(k.keyword), '{}') INTO v_added_keywords
+        FROM (SELECT DISTINCT n.id, UNNEST(n.keywords) AS keyword FROM new_rows n WHERE n.state = 'published') k;
+    END IF;
+
+    IF TG_OP IN ('UPDATE', 'DELETE') THEN
+        SELECT COALESCE(ARRAY_AGG(o.category), '{}') INTO v_removed_categories
+        FROM old_rows o WHERE o.state = 'published';
+        SELECT COALESCE(ARRAY_AGG(k.keyword), '{}') INTO v_removed_keywords
+        FROM (SELECT DISTINCT o.id, UNNEST(o.keywords) AS keyword FROM old_rows o WHERE o.state = 'published') k;
+    END IF;
+
+    PERFORM fn_adjust_blog_facets(v_added_categories, v_added_keywords, v_removed_categories, v_removed_keywords);
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+
+DROP TRIGGER IF EXISTS trg_blog_facets_inserted ON blogs;
+CREATE TRIGGER trg_blog_facets_inserted
+AFTER INSERT ON blogs
+REFERENCING NEW TABLE AS new_rows
+FOR EACH STATEMENT
+EXECUTE FUNCTION fn_update_blog_facets();
+
+DROP TRIGGER IF EXISTS trg_blog_facets_updated ON blogs;
+CREATE TRIGGER trg_blog_facets_updated
+AFTER UPDATE ON blogs
+REFERENCING OLD TABLE AS old_rows NEW TABLE AS new_rows
+FOR EACH STATEMENT
+EXECUTE FUNCTION fn_update_blog_facets();
+
+DROP TRIGGER IF EXISTS trg_blog_facets_deleted ON blogs;
+CREATE TRIGGER trg_blog_facets_deleted
+AFTER DELETE ON blogs
+REFERENCING OLD TABLE AS old_rows
+FOR EACH STATEMENT
+EXECUTE FUNCTION fn_update_blog_facets();
+
+
+-- Sitemap shards: published posts per publication month ("YYYY/MM"), with the
+-- row count and newest last_update a cached shard document is checked against.
+CREATE OR REPLACE FUNCTION fn_get_sitemap_shards()
+RETURNS TABLE (shard TEXT, post_count BIGINT, last_update TIMESTAMP WITH TIME ZONE) AS $$
+    SELECT LEFT(b.permalink_key, 7), COUNT(*), MAX(b.last_update)
+    FROM blogs b
+    WHERE b.state = 'published'
+    GROUP BY LEFT(b.permalink_key, 7)
+    ORDER BY 1;
+$$ LANGUAGE sql STABLE;
+
+
+-- The URLs of one shard, in permalink order; months larger than a sitemap
+-- document allows are read in parts through p_limit/p_offset.
+CREATE OR REPLACE FUNCTION fn_get_sitemap_entries(
+    p_shard TEXT,
+    p_limit INTEGER DEFAULT 50000,
+    p_offset INTEGER DEFAULT 0
+)
+RETURNS TABLE (permalink_key TEXT, last_update TIMESTAMP WITH TIME ZONE) AS $$
+    SELECT b.permalink_key, b.last_update
+    FROM blogs b
+    WHERE b.state = 'published' AND LEFT(b.permalink_key, 7) = p_shard
+    ORDER BY LEFT(b.permalink_key, 7), b.permalink_key, b.id
+    LIMIT p_limit OFFSET p_offset;
+$$ LANGUAGE sql STABLE;
+
+
+-- Broadcasts the ids changed by each statement on 'blogs_changed', so every app
+-- process can drop its cached copies (app/gateways/postgres/listener.py).
+CREATE OR REPLACE FUNCTION fn_notify_blogs_changed()
+RETURNS TRIGGER AS $$
+DECLARE
+    v_ids TEXT[];
+BEGIN
+    IF TG_OP = 'DELETE' THEN
+        SELECT ARRAY_AGG(o.id) INTO v_ids FROM old_rows o;
+    ELSE
+        SELECT ARRAY_AGG(n.id) INTO v_ids FROM new_rows n;
+    END IF;
+
+    IF v_ids IS NULL THEN
+        RETURN NULL;
+    END IF;
+
+    -- Payloads are capped at 8000 bytes; large batches ask listeners to flush instead.
+    IF CARDINALITY(v_ids) > 100 THEN
+        PERFORM pg_notify('blogs_changed', '{"flush": true}');
+    ELSE
+        PERFORM pg_notify('blogs_changed', JSON_BUILD_OBJECT('ids', v_ids)::TEXT);
+    END IF;
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+
+DROP TRIGGER IF EXISTS trg_notify_blogs_inserted ON blogs;
+CREATE TRIGGER trg_notify_blogs_inserted
+AFTER INSERT ON blogs
+REFERENCING NEW TABLE AS new_rows
+FOR EACH STATEMENT
+EXECUTE FUNCTION fn_notify_blogs_changed();
+
+DROP TRIGGER IF EXISTS trg_notify_blogs_updated ON blogs;
+CREATE TRIGGER trg_notify_blogs_updated
+AFTER UPDATE ON blogs
+REFERENCING NEW TABLE AS new_rows
+FOR EACH STATEMENT
+EXECUTE FUNCTION fn_notify_blogs_changed();
+
+DROP TRIGGER IF EXISTS trg_notify_blogs_deleted ON blogs;
+CREATE TRIGGER trg_notify_blogs_deleted
+AFTER DELETE ON blogs
+REFERENCING OLD TABLE AS old_rows
+FOR EACH STATEMENT
+EXECUTE FUNCTION fn_notify_blogs_changed();
@@ -0,0 +1,32 @@
+-- Adds the stored permalink key used by fn_get_blog_by_permalink.
+--
+-- Upgrading an existing database (every migration follows this order): apply
+-- the pending migrations in number order and then database/functions.sql, all
+-- in one transaction. functions.sql needs every table and column the
+-- migrations add, so it comes last; the migrations never call it, and 007
+-- holds its lock until functions.sql has created the facet triggers.
+--   psql -v ON_ERROR_STOP=1 -1 -U blogger_user -d blogger_db \
+--     -f database/migrations/001_permalink_key.sql ... -f database/functions.sql
+
+ALTER TABLE blogs ADD COLUMN IF NOT EXISTS permalink_key TEXT;
+
+-- Backfill without going through trg_set_published_date, which would bump last_update.
+ALTER TABLE blogs DISABLE TRIGGER trg_set_published_date;
+
+-- fn_permalink_key as of this migration, spelled out since functions.sql is loaded after it.
+UPDATE blogs b
+SET permalink_key = k.permalink_key
+FROM (
+    SELECT id, TO_CHAR(COALESCE(published_at, created_at), 'YYYY/MM/DD') || '/' || TRIM(BOTH '-' FROM REGEXP_REPLACE(
+        REGEXP_REPLACE(LOWER(title), '[^a-z0-9\s-]', '', 'g'),
+        '[-\s]+', '-', 'g'
+    )) AS permalink_key
+    FROM blogs
+) k
+WHERE k.id = b.id AND b.permalink_key IS DISTINCT FROM k.permalink_key;
+
+ALTER TABLE blogs ENABLE TRIGGER trg_set_published_date;
+
+CREATE INDEX IF NOT EXISTS idx_blogs_permalink_key ON blogs (permalink_key);
+
+ANALYZE blogs;
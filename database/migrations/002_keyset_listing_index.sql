@@ -0,0 +1,9 @@
+-- Rebuilds idx_blogs_state_published to match the listing order used by
+-- fn_get_paged_blogs and fn_get_keyset_blogs.
+-- Upgrade order as in 001_permalink_key.sql: pending migrations, then functions.sql, in one transaction.
+
+DROP INDEX IF EXISTS idx_blogs_state_published;
+
+CREATE INDEX idx_blogs_state_published ON blogs (state, published_at DESC NULLS LAST, created_at DESC, id DESC);
+
+ANALYZE blogs;
@@ -0,0 +1,14 @@
+-- Adds the table holding rendered posts (render-on-write).
+-- Upgrade order as in 001_permalink_key.sql: pending migrations, then functions.sql, in one transaction.
+-- Posts registered earlier are rendered and stored on their first view.
+
+CREATE TABLE IF NOT EXISTS blog_renders (
+    blog_id VARCHAR(50) PRIMARY KEY REFERENCES blogs (id) ON DELETE CASCADE,
+    content_hash CHAR(64) NOT NULL,
+    html TEXT NOT NULL,
+    reading_time INTEGER NOT NULL,
+    word_count INTEGER NOT NULL,
+    source_size BIGINT NOT NULL,
+    source_mtime_ns BIGINT NOT NULL,
+    rendered_at TIMESTAMP WITH TIME ZONE DEFAULT CURRENT_TIMESTAMP NOT NULL
+);
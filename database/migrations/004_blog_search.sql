@@ -0,0 +1,14 @@
+-- Adds the full-text search table and its GIN index.
+-- Upgrade order as in 001_permalink_key.sql: pending migrations, then functions.sql, in one transaction.
+-- Bodies are captured from content files by the app, so index posts registered
+-- earlier by updating them, or by removing the sync manifest
+-- (.blogger/_sync_manifest.json) and re-running sync_content.py; with the
+-- manifest in place unchanged files are skipped.
+
+CREATE TABLE IF NOT EXISTS blog_search (
+    blog_id VARCHAR(50) PRIMARY KEY REFERENCES blogs (id) ON DELETE CASCADE,
+    body TEXT NOT NULL,
+    document TSVECTOR NOT NULL
+);
+
+CREATE INDEX IF NOT EXISTS idx_blog_search_document ON blog_search USING GIN (document);
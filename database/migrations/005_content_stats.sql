@@ -0,0 +1,33 @@
+-- Adds word count, reading time and source size to blogs, so listings can show
+-- them without opening content files.
+-- Upgrade order as in 001_permalink_key.sql: pending migrations, then functions.sql, in one transaction.
+-- The functions below return or accept the new columns, so they are dropped
+-- here and recreated by functions.sql.
+-- Posts with a stored render are backfilled from it; the rest get their stats
+-- the next time they are updated or synced (remove the sync manifest and re-run
+-- sync_content.py to refresh every post).
+
+ALTER TABLE blogs ADD COLUMN IF NOT EXISTS word_count INTEGER;
+ALTER TABLE blogs ADD COLUMN IF NOT EXISTS reading_time INTEGER;
+ALTER TABLE blogs ADD COLUMN IF NOT EXISTS content_size BIGINT;
+
+DROP FUNCTION IF EXISTS fn_get_paged_blogs(blog_state, INTEGER, INTEGER);
+DROP FUNCTION IF EXISTS fn_get_all_blogs(blog_state);
+DROP FUNCTION IF EXISTS fn_get_keyset_blogs(blog_state, INTEGER, TIMESTAMP WITH TIME ZONE, TIMESTAMP WITH TIME ZONE, VARCHAR, BOOLEAN);
+DROP FUNCTION IF EXISTS fn_get_blog_by_id(VARCHAR);
+DROP FUNCTION IF EXISTS fn_get_blog_by_permalink(TEXT, TEXT, TEXT, TEXT);
+DROP FUNCTION IF EXISTS fn_search_blogs(TEXT, blog_state, INTEGER, DOUBLE PRECISION, VARCHAR);
+DROP FUNCTION IF EXISTS fn_add_blog(VARCHAR, TEXT, VARCHAR, TEXT[], TIMESTAMP WITH TIME ZONE, TIMESTAMP WITH TIME ZONE, TIMESTAMP WITH TIME ZONE, TEXT, TEXT[], blog_state);
+DROP FUNCTION IF EXISTS fn_update_blog(VARCHAR, TEXT, VARCHAR, TEXT[], TIMESTAMP WITH TIME ZONE, TEXT, TEXT[], blog_state);
+
+-- Backfill without going through trg_set_published_date, which would bump last_update.
+ALTER TABLE blogs DISABLE TRIGGER trg_set_published_date;
+
+UPDATE blogs b
+SET word_count = r.word_count, reading_time = r.reading_time, content_size = r.source_size
+FROM blog_renders r
+WHERE r.blog_id = b.id AND b.word_count IS NULL;
+
+ALTER TABLE blogs ENABLE TRIGGER trg_set_published_date;
+
+ANALYZE blogs;
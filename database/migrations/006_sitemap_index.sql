@@ -0,0 +1,10 @@
+-- Adds the index behind the sharded sitemap: published posts by publication
+-- month (the "YYYY/MM" prefix of permalink_key), so fn_get_sitemap_shards and
+-- fn_get_sitemap_entries are index-only scans instead of full table scans.
+-- Upgrade order as in 001_permalink_key.sql: pending migrations, then functions.sql, in one transaction.
+
+CREATE INDEX IF NOT EXISTS idx_blogs_sitemap
+    ON blogs (LEFT(permalink_key, 7), permalink_key, id) INCLUDE (last_update)
+    WHERE state = 'published';
+
+ANALYZE blogs;
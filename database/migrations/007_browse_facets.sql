@@ -0,0 +1,42 @@
+-- Adds category/keyword browsing: the indexes behind the filtered keyset
+-- pages, and blog_facets with the published post count per category and
+-- keyword, backfilled here and maintained by the trg_blog_facets_* triggers
+-- of database/functions.sql from then on.
+-- Upgrade order as in 001_permalink_key.sql: pending migrations, then functions.sql, in one transaction.
+-- fn_get_keyset_blogs gains the filter parameters, so the old signature is
+-- dropped here.
+
+DROP FUNCTION IF EXISTS fn_get_keyset_blogs(blog_state, INTEGER, TIMESTAMP WITH TIME ZONE, TIMESTAMP WITH TIME ZONE, VARCHAR, BOOLEAN);
+
+CREATE INDEX IF NOT EXISTS idx_blogs_category ON blogs (category, state, published_at DESC NULLS LAST, created_at DESC, id DESC);
+CREATE INDEX IF NOT EXISTS idx_blogs_keywords ON blogs USING GIN (keywords);
+
+CREATE TABLE IF NOT EXISTS blog_facets (
+    kind VARCHAR(10) NOT NULL CHECK (kind IN ('category', 'keyword')),
+    name TEXT NOT NULL,
+    post_count INTEGER NOT NULL,
+    PRIMARY KEY (kind, name)
+);
+
+CREATE INDEX IF NOT EXISTS idx_blog_facets_count ON blog_facets (kind, post_count DESC, name);
+
+-- Writes are blocked (the mode CREATE TRIGGER takes; reads go on) from the
+-- counts below until the transaction commits, after functions.sql has created
+-- the triggers, so no write lands uncounted. LOCK TABLE outside a transaction
+-- fails, which keeps this from being run on its own.
+LOCK TABLE blogs IN SHARE ROW EXCLUSIVE MODE;
+
+TRUNCATE blog_facets;
+INSERT INTO blog_facets (kind, name, post_count)
+SELECT 'category', b.category, COUNT(*)
+FROM blogs b
+WHERE b.state = 'published'
+GROUP BY b.category;
+INSERT INTO blog_facets (kind, name, post_count)
+SELECT 'keyword', k.keyword, COUNT(DISTINCT b.id)
+FROM blogs b, UNNEST(b.keywords) AS k(keyword)
+WHERE b.state = 'published'
+GROUP BY k.keyword;
+
+ANALYZE blogs;
+ANALYZE blog_facets;
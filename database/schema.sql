@@ -17,8 +17,57 @@ CREATE TABLE IF NOT EXISTS blogs (
     last_update TIMESTAMP WITH TIME ZONE DEFAULT CURRENT_TIMESTAMP NOT NULL,
     content_file TEXT NOT NULL,
     "references" TEXT[],
-    state blog_state DEFAULT 'drafted' NOT NULL
+    state blog_state DEFAULT 'drafted' NOT NULL,
+    permalink_key TEXT,
+    -- Content stats, computed from the source file on register, update and sync.
+    word_count INTEGER,
+    reading_time INTEGER,
+    content_size BIGINT
 );
 
 
-CREATE INDEX IF NOT EXISTS idx_blogs_state_published ON blogs (state, published_at DESC);
+-- Matches the listing order so both offset and keyset pages are index scans.
+CREATE INDEX IF NOT EXISTS idx_blogs_state_published ON blogs (state, published_at DESC NULLS LAST, created_at DESC, id DESC);
+CREATE INDEX IF NOT EXISTS idx_blogs_permalink_key ON blogs (permalink_key);
+-- Browsing by category (in listing order, so keyset pages are ordered range scans) and by keyword.
+CREATE INDEX IF NOT EXISTS idx_blogs_category ON blogs (category, state, published_at DESC NULLS LAST, created_at DESC, id DESC);
+CREATE INDEX IF NOT EXISTS idx_blogs_keywords ON blogs USING GIN (keywords);
+-- Sitemap shards are publication months, the "YYYY/MM" prefix of permalink_key.
+CREATE INDEX IF NOT EXISTS idx_blogs_sitemap
+    ON blogs (LEFT(permalink_key, 7), permalink_key, id) INCLUDE (last_update)
+    WHERE state = 'published';
+
+
+-- Published posts per category and per keyword, kept current by the
+-- trg_blog_facets_* triggers (database/functions.sql) instead of counted on read.
+CREATE TABLE IF NOT EXISTS blog_facets (
+    kind VARCHAR(10) NOT NULL CHECK (kind IN ('category', 'keyword')),
+    name TEXT NOT NULL,
+    post_count INTEGER NOT NULL,
+    PRIMARY KEY (kind, name)
+);
+
+CREATE INDEX IF NOT EXISTS idx_blog_facets_count ON blog_facets (kind, post_count DESC, name);
+
+
+-- Rendered content, written on register/update and reused until the source hash changes.
+CREATE TABLE IF NOT EXISTS blog_renders (
+    blog_id VARCHAR(50) PRIMARY KEY REFERENCES blogs (id) ON DELETE CASCADE,
+    content_hash CHAR(64) NOT NULL,
+    html TEXT NOT NULL,
+    reading_time INTEGER NOT NULL,
+    word_count INTEGER NOT NULL,
+    source_size BIGINT NOT NULL,
+    source_mtime_ns BIGINT NOT NULL,
+    rendered_at TIMESTAMP WITH TIME ZONE DEFAULT CURRENT_TIMESTAMP NOT NULL
+);
+
+
+-- Full-text search document: weighted title/category/keywords plus the markdown body.
+CREATE TABLE IF NOT EXISTS blog_search (
+    blog_id VARCHAR(50) PRIMARY KEY REFERENCES blogs (id) ON DELETE CASCADE,
+    body TEXT NOT NULL,
+    document TSVECTOR NOT NULL
+);
+
+CREATE INDEX IF NOT EXISTS idx_blog_search_document ON blog_search USING GIN (document);
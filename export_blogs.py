@@ -0,0 +1,49 @@
+import argparse
+import sys
+import time
+
+from app.config import get_settings
+from app.enums.enums import BlogState
+from app.gateways.postgres.client import PostgresClient
+from app.models.blog import Blog
+from app.repositories.blog import BlogRepository
+from app.services.blog import BlogService
+
+
+def export_blogs(out_path: str, fmt: str, state: str, batch_size: int) -> None:
+    settings = get_settings()
+    client = PostgresClient(
+        dbname=settings.BLOGGER_DB_NAME,
+        user=settings.BLOGGER_DB_USER,
+        password=settings.BLOGGER_DB_PASS,
+        host=settings.BLOGGER_DB_HOST,
+        port=settings.BLOGGER_DB_PORT,
+    )
+    service = BlogService(Blog(BlogRepository(client)))
+
+    started = time.perf_counter()
+    written = 0
+    out = sys.stdout.buffer if out_path == "-" else open(out_path, "wb")
+    try:
+        for chunk in service.export(fmt, state=BlogState(state) if state else None, batch_size=batch_size):
+            out.write(chunk)
+            written += len(chunk)
+    finally:
+        if out is not sys.stdout.buffer:
+            out.close()
+        client.close_all()
+
+    # The summary goes to stderr so it never ends up in a piped export.
+    target = "stdout" if out_path == "-" else out_path
+    print(f"--- Wrote {written} bytes of {fmt} to {target} in {time.perf_counter() - started:.2f}s ---", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Stream every blog as an NDJSON or CSV manifest, loadable again through /blogs/bulk.")
+    parser.add_argument("--format", choices=["ndjson", "csv"], default="ndjson", help="Manifest format.")
+    parser.add_argument("--out", default="-", help="Output path, '-' for stdout.")
+    parser.add_argument("--state", choices=[state.value for state in BlogState], default=None, help="Only blogs in this state.")
+    parser.add_argument("--batch", type=int, default=1000, help="Rows fetched from the server-side cursor per round trip.")
+    args = parser.parse_args()
+
+    export_blogs(args.out, args.format, args.state, args.batch)
@@ -0,0 +1,230 @@
+import argparse
+import hashlib
+import json
+import os
+import shutil
+import time
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, Dict, List, Optional
+
+from jinja2 import Environment, FileSystemLoader
+
+from app.config import get_settings
+from app.gateways.postgres.client import PostgresClient
+from app.repositories.blog import BlogRepository
+from app.models.blog import Blog
+from app.enums.enums import BlogState
+from app.utils.render_cache import get_render_cache
+from app.utils.static_assets import get_static_assets
+
+
+MANIFEST_NAME = ".export-manifest.json"
+
+_env: Optional[Environment] = None
+
+
+def _url_for(name: str, **params) -> str:
+    # Static counterpart of the routes the templates link to.
+    if name == "static":
+        return "/static" + get_static_assets().url_path(params.get("path", ""))
+    if name == "page_blogs":
+        return "/blogs/"
+    raise ValueError(f"No static route for '{name}'")
+
+
+def _init_worker(template_dir: str) -> None:
+    global _env
+    _env = Environment(loader=FileSystemLoader(template_dir), autoescape=True)
+    _env.globals["url_for"] = _url_for
+    get_static_assets().load()
+
+
+def _write(out_dir: str, rel_dir: str, html: str) -> None:
+    target_dir = os.path.join(out_dir, rel_dir)
+    os.makedirs(target_dir, exist_ok=True)
+    tmp_path = os.path.join(target_dir, f".index.html.{os.getpid()}.tmp")
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        f.write(html)
+    os.replace(tmp_path, os.path.join(target_dir, "index.html"))
+
+
+def _export_post(blog: Blog.Schema, out_dir: str) -> str:
+    # Shares the on-disk render tier with the app, so posts it already rendered are reused.
+    render = get_render_cache().get_or_render(blog.content_file)
+    html = _env.get_template("post.html").render(
+        request=None,
+        blog=blog,
+        content=render.get("html"),
+        reading_time=render.get("reading_time"),
+        word_count=render.get("word_count"),
+    )
+    _write(out_dir, os.path.join("blogs", blog.permalink_key), html)
+    return blog.id
+
+
+def _export_index(page: int, blogs: List[Blog.Schema], total_pages: int, out_dir: str) -> int:
+    page_data = {
+        "page": page,
+        "total_pages": total_pages,
+        "has_previous": page > 1,
+        "has_next": page < total_pages,
+        "prev_url": _index_url(page - 1),
+        "next_url": _index_url(page + 1),
+    }
+    html = _env.get_template("index.html").render(request=None, blogs=blogs, page_data=page_data)
+    _write(out_dir, _index_dir(page), html)
+    return page
+
+
+def _index_dir(page: int) -> str:
+    return "blogs" if page == 1 else os.path.join("blogs", "page", str(page))
+
+
+def _index_url(page: int) -> str:
+    return "/blogs/" if page == 1 else f"/blogs/page/{page}/"
+
+
+def _post_signature(blog: Blog.Schema, static_version: str) -> Optional[Dict[str, Any]]:
+    try:
+        st = os.stat(blog.content_file)
+    except OSError:
+        return None
+    return {
+        "path": blog.permalink_key,
+        "static": static_version,
+        "metadata": blog.model_dump_json(),
+        "size": st.st_size,
+        "mtime_ns": st.st_mtime_ns,
+    }
+
+
+def _load_manifest(out_dir: str) -> Dict[str, Any]:
+    try:
+        with open(os.path.join(out_dir, MANIFEST_NAME), "r", encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {"posts": {}, "pages": {}}
+
+
+def _save_manifest(out_dir: str, manifest: Dict[str, Any]) -> None:
+    path = os.path.join(out_dir, MANIFEST_NAME)
+    with open(f"{path}.tmp", "w", encoding="utf-8") as f:
+        json.dump(manifest, f)
+    os.replace(f"{path}.tmp", path)
+
+
+def export_static(out_dir: str, per_page: int, batch_size: int, workers: int, force: bool) -> None:
+    settings = get_settings()
+    client = PostgresClient(
+        dbname=settings.BLOGGER_DB_NAME,
+        user=settings.BLOGGER_DB_USER,
+        password=settings.BLOGGER_DB_PASS,
+        host=settings.BLOGGER_DB_HOST,
+        port=settings.BLOGGER_DB_PORT,
+    )
+    model = Blog(BlogRepository(client))
+
+    os.makedirs(out_dir, exist_ok=True)
+    # Hashed names and their .gz/.br/.zst variants next to the originals, ready for gzip_static-style serving.
+    assets = get_static_assets()
+    assets.build()
+    # Pages link the hashed names, so they are rewritten when those change.
+    static_version = hashlib.sha256(
+        "\n".join(sorted(entry["fingerprinted"] for entry in assets.manifest.values())).encode("utf-8")
+    ).hexdigest()[:12]
+    shutil.copytree(assets.source_dir, os.path.join(out_dir, "static"), dirs_exist_ok=True)
+    shutil.copytree(
+        assets.build_dir, os.path.join(out_dir, "static"), dirs_exist_ok=True,
+        ignore=shutil.ignore_patterns("manifest.json*"),
+    )
+
+    previous = {"posts": {}, "pages": {}} if force else _load_manifest(out_dir)
+    manifest = {"posts": {}, "pages": {}}
+
+    total_count = model.count(state=BlogState.PUBLISHED)
+    total_pages = max(1, (total_count + per_page - 1) // per_page)
+    # Whole index pages per batch, so each batch maps onto complete listing pages.
+    batch_size = max(per_page, batch_size - batch_size % per_page)
+
+    print(f"--- Exporting {total_count} published blogs ({total_pages} index pages) to {out_dir} ---")
+    started = time.perf_counter()
+    posts_written = pages_written = skipped = missing = 0
+    futures = []
+
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker, initargs=("templates", )) as pool:
+        cursor = None
+        page = 1
+        while True:
+            blogs = model.get_keyset_page(batch_size, state=BlogState.PUBLISHED, cursor=cursor)["blogs"]
+            if not blogs:
+                break
+
+            for blog in blogs:
+                signature = _post_signature(blog, static_version)
+                if signature is None:
+                    missing += 1
+                    print(f"Skipping {blog.id}: source file missing ({blog.content_file})")
+                    continue
+
+                manifest["posts"][blog.id] = signature
+                if previous["posts"].get(blog.id) == signature:
+                    skipped += 1
+                    continue
+                futures.append(pool.submit(_export_post, blog, out_dir))
+                posts_written += 1
+
+            for start in range(0, len(blogs), per_page):
+                page_blogs = blogs[start:start + per_page]
+                signature = [manifest["posts"].get(b.id) or b.id for b in page_blogs] + [total_pages]
+                manifest["pages"][str(page)] = signature
+                if previous["pages"].get(str(page)) != signature:
+                    futures.append(pool.submit(_export_index, page, page_blogs, total_pages, out_dir))
+                    pages_written += 1
+                page += 1
+
+            last = blogs[-1]
+            cursor = {
+                "published_at": last.dates.published_at,
+                "created_at": last.dates.created_at,
+                "id": last.id,
+            }
+
+        if total_count == 0:
+            futures.append(pool.submit(_export_index, 1, [], 1, out_dir))
+            pages_written += 1
+
+        for future in futures:
+            future.result()
+
+    # Drop output of posts and pages that are gone since the last export, and of permalinks
+    # that moved (new title or publish date), unless another post lives there now.
+    current_paths = {signature["path"] for signature in manifest["posts"].values()}
+    for blog_id, signature in previous["posts"].items():
+        if signature["path"] not in current_paths:
+            shutil.rmtree(os.path.join(out_dir, "blogs", signature["path"]), ignore_errors=True)
+    for stale_page in set(previous["pages"]) - set(manifest["pages"]):
+        if stale_page != "1":
+            shutil.rmtree(os.path.join(out_dir, _index_dir(int(stale_page))), ignore_errors=True)
+
+    _save_manifest(out_dir, manifest)
+    client.close_all()
+
+    elapsed = time.perf_counter() - started
+    written = posts_written + pages_written
+    print(
+        f"Posts: {posts_written} written, {skipped} unchanged, {missing} missing source | "
+        f"Index pages: {pages_written} written"
+    )
+    print(f"--- Export complete in {elapsed:.2f}s ({written / elapsed if elapsed else 0:.0f} pages/s) ---")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Export published blogs as a static site.")
+    parser.add_argument("--out", default="public", help="Output directory.")
+    parser.add_argument("--per-page", type=int, default=7, help="Blogs per index page.")
+    parser.add_argument("--batch", type=int, default=700, help="Blogs fetched per database round trip.")
+    parser.add_argument("--workers", type=int, default=os.cpu_count(), help="Render processes.")
+    parser.add_argument("--force", action="store_true", help="Ignore the manifest and rewrite everything.")
+    args = parser.parse_args()
+
+    export_static(args.out, args.per_page, args.batch, args.workers, args.force)
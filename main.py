@@ -1,18 +1,25 @@
+import asyncio
 import os
-from fastapi import FastAPI, Request
-from fastapi.responses import HTMLResponse
-from fastapi.staticfiles import StaticFiles
+from fastapi import FastAPI, Request, Response
+from fastapi.responses import HTMLResponse, JSONResponse
 from fastapi.templating import Jinja2Templates
 from fastapi.middleware.cors import CORSMiddleware
 
 from contextlib import asynccontextmanager
+from psycopg_pool import PoolTimeout
 
 from app.config import get_settings
-from app.gateways.postgres.client import PostgresClient
+from app.container import Container
+from app.gateways.postgres.listener import PostgresListener
+from app.utils.invalidation import notify_write
+from app.utils.metadata_cache import get_metadata_cache
+from app.utils.metrics import CONTENT_TYPE, REGISTRY, MetricsMiddleware
+from app.utils.static_assets import get_static_assets, install_url_for
 from app.controllers.blog import (
     public as blog_public,
     admin as blog_admin,
 )
+from app.controllers.feeds import feeds
 
 
 settings = get_settings()
@@ -20,24 +27,47 @@ API_VERSION = "v1.0.0"
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
-    app.state.db_client = PostgresClient(
-        dbname=settings.BLOGGER_DB_NAME,
-        user=settings.BLOGGER_DB_USER,
-        password=settings.BLOGGER_DB_PASS,
-        host=settings.BLOGGER_DB_HOST,
-        port=settings.BLOGGER_DB_PORT,
+    # Hashes and precompresses what changed in static/ since the last build (nothing, after build_static.py).
+    await asyncio.to_thread(get_static_assets().build)
+
+    app.state.container = Container(settings)
+    await app.state.container.start()
+
+    # Writes made by other workers (or scripts) reach this process's caches through NOTIFY.
+    listener = PostgresListener(
+        app.state.container.db_client.conninfo, "blogs_changed",
+        on_notify=on_blogs_changed, on_state=on_listener_state,
     )
+    await listener.start()
+
     yield
-    app.state.db_client.close_all()
+
+    await listener.stop()
+    await app.state.container.stop()
+
+
+def on_blogs_changed(payload: str) -> None:
+    # Replicas may lag the NOTIFY; reads go to the primary until they catch up.
+    app.state.container.db_client.note_write()
+    get_metadata_cache().apply_notification(payload)
+    notify_write()
+
+
+def on_listener_state(listening: bool) -> None:
+    # The metadata cache is only trusted while invalidations can reach it.
+    get_metadata_cache().set_active(listening and settings.BLOGGER_METADATA_CACHE_SIZE > 0)
+    notify_write()
+
 
 templates = Jinja2Templates(directory="templates")
+install_url_for(templates)
 
 app = FastAPI(
     title="Blog Management Tool API",
     version=API_VERSION,
     lifespan=lifespan,
 )
-app.mount("/static", StaticFiles(directory="static"), name="static")
+app.mount("/static", get_static_assets(), name="static")
 
 origins = [
     "*",
@@ -51,11 +81,15 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Outermost, so Server-Timing and the request histogram cover CORS and routing too.
+app.add_middleware(MetricsMiddleware)
+
 
 if settings.BLOGGER_IS_ADMIN:
     app.include_router(blog_admin)
 
 app.include_router(blog_public)
+app.include_router(feeds)
 
 @app.get("/", include_in_schema=False)
 async def root():
@@ -63,7 +97,16 @@ async def root():
 
 @app.get("/health")
 def health_check():
-    return {"status": "online", "user": "admin" if settings.BLOGGER_IS_ADMIN else "public"}
+    return {
+        "status": "online",
+        "user": "admin" if settings.BLOGGER_IS_ADMIN else "public",
+        "metadata_cache": get_metadata_cache().stats(),
+    }
+
+@app.get("/metrics", include_in_schema=False)
+def metrics():
+    # Prometheus text format: request/stage histograms, cache counters, pool gauges.
+    return Response(REGISTRY.render(), media_type=CONTENT_TYPE)
 
 @app.exception_handler(404)
 async def custom_404_handler(request: Request, exc: Exception):
@@ -77,5 +120,10 @@ async def custom_404_handler(request: Request, exc: Exception):
         status_code=404,
     )
 
+@app.exception_handler(PoolTimeout)
+async def pool_timeout_handler(request: Request, exc: Exception):
+    # Every connection stayed busy for BLOGGER_DB_POOL_TIMEOUT: shed the request rather than 500.
+    return JSONResponse({"detail": "DATABASE_BUSY"}, status_code=503, headers={"Retry-After": "1"})
+
 # To run the application, use the command: 
 # uvicorn main:app --reload --port 6969
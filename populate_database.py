@@ -1,13 +1,16 @@
 import os
 import random
+import time
 from datetime import datetime, timedelta
-from typing import List
+from functools import lru_cache
+from typing import Dict, List, Optional
 
 from app.gateways.postgres.client import PostgresClient
 from app.repositories.blog import BlogRepository
 from app.models.blog import Blog
 from app.models.dates import DatesModel
 from app.enums.enums import BlogState
+from app.utils.markdown import MarkdownRenderer
 
 
 SUBJECTS = ["Memory management", "The borrow checker", "Interrupt handling", "BGP peering", "Cache invalidation", 
@@ -17,6 +20,11 @@ OBJECTS = ["distributed state", "kernel space", "atomic operations", "user-land
            "side-channel attacks", "L3 cache hits", "concurrency primitives"]
 CONNECTORS = ["Furthermore,", "In contrast,", "Consequently,", "From a systems perspective,", "Historically,", "Under heavy load,"]
 
+CATEGORIES = ["Security", "Systems", "Networking", "Kernel", "Cryptography"]
+TOPICS = ["Rust", "eBPF", "Postgres", "WASM", "QUIC", "Linux", "Docker"]
+
+BATCH_SIZE = 500
+
 def generate_random_paragraph(min_sentences=3, max_sentences=8):
     sentences = []
     for _ in range(random.randint(min_sentences, max_sentences)):
@@ -39,6 +47,36 @@ def generate_devastating_markdown(topic, index):
     
     return "\n\n".join(content)
 
+@lru_cache(maxsize=None)
+def content_stats(file_path: str) -> Dict[str, int]:
+    # benchmarks/ points many posts at one file, so each file is only counted once.
+    with open(file_path, "rb") as f:
+        raw = f.read()
+    return {**MarkdownRenderer.content_stats(raw.decode("utf-8")), "content_size": len(raw)}
+
+def generate_blog(model: Blog, index: int, file_path: str, now: datetime, topic: Optional[str] = None) -> Blog.Schema:
+    """Random metadata for the post at file_path, as seeded by seed_random_blogs and benchmarks/."""
+    topic = topic or random.choice(TOPICS)
+    state = random.choice([BlogState.PUBLISHED, BlogState.DRAFTED])
+    creation_dt = now - timedelta(days=random.randint(1, 365))
+    pub_date = creation_dt + timedelta(hours=2) if state == BlogState.PUBLISHED else None
+
+    return model.Schema(
+        id=f"{int(now.timestamp())}{index}",
+        title=f"{random.choice(['Analysis of', 'Guide to', 'Internal:'])} {topic} {index}",
+        category=random.choice(CATEGORIES),
+        keywords=[topic.lower(), "performance_test"],
+        dates=DatesModel(
+            created_at=creation_dt,
+            published_at=pub_date,
+            last_update=now
+        ),
+        content_file=file_path,
+        references=[f"https://docs.local/ref_{index}"],
+        state=state.value,
+        **content_stats(file_path)
+    )
+
 def seed_random_blogs():
     client = PostgresClient(
         dbname="blogger_db",
@@ -50,48 +88,36 @@ def seed_random_blogs():
     repo = BlogRepository(client)
     model = Blog(repo)
 
-    categories = ["Security", "Systems", "Networking", "Kernel", "Cryptography"]
-    topics = ["Rust", "eBPF", "Postgres", "WASM", "QUIC", "Linux", "Docker"]
-    
     tmp_dir = "/tmp/dummy_posts"
     os.makedirs(tmp_dir, exist_ok=True)
 
     print(f"--- Generating 5000 high-entropy entries ---")
 
+    batch = []
+    inserted = failed = 0
+    started = time.perf_counter()
+
     for i in range(5000):
-        topic = random.choice(topics)
+        topic = random.choice(TOPICS)
         file_path = os.path.join(tmp_dir, f"post_{i}.md")
         
         with open(file_path, "w", encoding="utf-8") as f:
             f.write(generate_devastating_markdown(topic, i))
 
-        state = random.choice([BlogState.PUBLISHED, BlogState.DRAFTED])
-        now = datetime.now()
-        creation_dt = now - timedelta(days=random.randint(1, 365))
-        
-        pub_date = creation_dt + timedelta(hours=2) if state == BlogState.PUBLISHED else None
-
-        blog_data = model.Schema(
-            id=f"{int(now.timestamp())}{i}",
-            title=f"{random.choice(['Analysis of', 'Guide to', 'Internal:'])} {topic} {i}",
-            category=random.choice(categories),
-            keywords=[topic.lower(), "performance_test"],
-            dates=DatesModel(
-                created_at=creation_dt,
-                published_at=pub_date,
-                last_update=now
-            ),
-            content_file=file_path,
-            references=[f"https://docs.local/ref_{i}"],
-            state=state.value
-        )
-
-        try:
-            model.save(blog_data)
-            if (i + 1) % 100 == 0:
-                print(f"Progress: {i + 1}/5000 seeded.")
-        except Exception as e:
-            print(f"Error on blog {i}: {e}")
+        batch.append(generate_blog(model, i, file_path, datetime.now(), topic))
+
+        if len(batch) == BATCH_SIZE or i == 4999:
+            summary = model.save_many(batch, batch_size=BATCH_SIZE)
+            inserted += summary["inserted"]
+            failed += summary["failed"] + summary["duplicates"]
+            for result in summary["results"]:
+                if result["status"] != "inserted":
+                    print(f"Error on blog {result['id']}: {result['message']}")
+            batch = []
+            print(f"Progress: {i + 1}/5000 seeded ({summary['rows_per_second']:.0f} rows/s).")
+
+    elapsed = time.perf_counter() - started
+    print(f"Inserted {inserted}, failed {failed} in {elapsed:.2f}s ({inserted / elapsed:.0f} rows/s incl. file generation).")
 
     client.close_all()
     print("--- Seeding Complete ---")
@@ -0,0 +1,45 @@
+import argparse
+import time
+
+from app.config import get_settings
+from app.gateways.postgres.client import PostgresClient
+from app.repositories.blog import BlogRepository
+from app.repositories.memory import write_snapshot
+
+
+def snapshot_blogs(out_path: str, batch_size: int) -> None:
+    settings = get_settings()
+    client = PostgresClient(
+        dbname=settings.BLOGGER_DB_NAME,
+        user=settings.BLOGGER_DB_USER,
+        password=settings.BLOGGER_DB_PASS,
+        host=settings.BLOGGER_DB_HOST,
+        port=settings.BLOGGER_DB_PORT,
+    )
+    repository = BlogRepository(client)
+
+    started = time.perf_counter()
+    rows, cursor = [], None
+    try:
+        while True:
+            batch = repository.get_keyset_page(batch_size, cursor=cursor)["blogs"]
+            rows.extend(batch)
+            if len(batch) < batch_size:
+                break
+            last = batch[-1]
+            cursor = {"published_at": last['dates']['published_at'], "created_at": last['dates']['created_at'], "id": last['id']}
+    finally:
+        client.close_all()
+
+    write_snapshot(out_path, rows)
+    print(f"--- Wrote {len(rows)} blogs to {out_path} in {time.perf_counter() - started:.2f}s ---")
+
+
+if __name__ == "__main__":
+    settings = get_settings()
+    parser = argparse.ArgumentParser(description="Write blog metadata to the snapshot file read by BLOGGER_MEMORY_SOURCE=snapshot.")
+    parser.add_argument("--out", default=settings.BLOGGER_MEMORY_SNAPSHOT, help="Snapshot path.")
+    parser.add_argument("--batch", type=int, default=5000, help="Blogs fetched per database round trip.")
+    args = parser.parse_args()
+
+    snapshot_blogs(args.out, args.batch)
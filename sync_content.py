@@ -0,0 +1,47 @@
+import argparse
+import os
+
+from app.config import get_settings
+from app.gateways.postgres.client import PostgresClient
+from app.repositories.blog import BlogRepository
+from app.models.blog import Blog
+from app.services.sync import ContentSyncService
+
+
+def sync_content(content_dir: str, manifest_path: str, workers: int, dry_run: bool) -> None:
+    settings = get_settings()
+    client = PostgresClient(
+        dbname=settings.BLOGGER_DB_NAME,
+        user=settings.BLOGGER_DB_USER,
+        password=settings.BLOGGER_DB_PASS,
+        host=settings.BLOGGER_DB_HOST,
+        port=settings.BLOGGER_DB_PORT,
+    )
+    service = ContentSyncService(Blog(BlogRepository(client)), content_dir, manifest_path, workers=workers)
+
+    print(f"--- Syncing {content_dir}{' (dry run)' if dry_run else ''} ---")
+    try:
+        summary = service.run(dry_run=dry_run)
+    finally:
+        client.close_all()
+
+    for error in summary["errors"]:
+        print(f"Error on {error['path']}: {error['message']}")
+    print(
+        f"Scanned {summary['scanned']}: {summary['unchanged']} unchanged, {summary['touched']} touched, "
+        f"{summary['added']} added, {summary['updated']} updated, {summary['retired']} retired, "
+        f"{summary['failed']} failed"
+    )
+    print(f"--- Sync complete in {summary['elapsed']:.3f}s ---")
+
+
+if __name__ == "__main__":
+    settings = get_settings()
+    parser = argparse.ArgumentParser(description="Register, update and retire blogs from a content directory.")
+    parser.add_argument("--root", default=settings.BLOGGER_CONTENT_DIR, help="Content directory to scan.")
+    parser.add_argument("--manifest", default=settings.BLOGGER_SYNC_MANIFEST, help="Sync manifest path.")
+    parser.add_argument("--workers", type=int, default=min(32, (os.cpu_count() or 1) * 4), help="Scan/hash threads.")
+    parser.add_argument("--dry-run", action="store_true", help="Report changes without writing them.")
+    args = parser.parse_args()
+
+    sync_content(args.root, args.manifest, args.workers, args.dry_run)